@@ -2,13 +2,48 @@
  * Bingo Game - Arduino Uno Bridge
  * This script serves as a bridge between the Arduino Mega (physical board) 
  * and the Python/Pygame game interface
+ *
+ * Two protocols are spoken on the USB side:
+ *  - Legacy ASCII: single command bytes in, println() lines out
+ *  - Framed v1 (see serial_protocol.py): offered by the computer with a HELLO
+ *    frame, using SOF | VERSION | TYPE | SEQ | LEN | PAYLOAD | CRC16 frames,
+ *    a higher baud rate and ACK/retransmit for ball events
  */
 
 // Constants
 #define BAUD_RATE 9600
+#define MAX_BAUD_RATE 115200
 #define MEGA_RX 10
 #define MEGA_TX 11
 
+// Framed protocol constants (must match serial_protocol.py)
+#define FRAME_SOF 0xA5
+#define FRAME_VERSION 1
+#define FRAME_MAX_PAYLOAD 64
+#define FRAME_HELLO 0x01
+#define FRAME_HELLO_ACK 0x02
+#define FRAME_ACK 0x03
+#define FRAME_COMMAND 0x10
+#define FRAME_BALL 0x20
+#define FRAME_EVENT 0x21
+#define FRAME_RAW 0x22
+
+// Event codes carried by FRAME_EVENT
+#define EVENT_BRIDGE_READY 1
+#define EVENT_GAME_STARTED 2
+#define EVENT_GAME_ENDED 3
+#define EVENT_BALL_REQUESTED 4
+#define EVENT_GAME_NOT_ACTIVE 5
+#define EVENT_BALL_RELEASED 6
+#define EVENT_BALL_RETURNED 7
+
+#define ACK_TIMEOUT 250          // ms before an unacknowledged ball frame is resent
+#define MAX_RETRIES 5
+#define CONFIRM_TIMEOUT 1000     // ms to wait for the computer to confirm framing
+#define FRAME_BYTE_TIMEOUT 100   // ms of silence that abandons a partial frame
+#define PENDING_SLOTS 4
+#define SEEN_SLOTS 16
+
 #include <SoftwareSerial.h>
 
 // Setup software serial for communication with Mega
@@ -20,6 +55,28 @@ bool gameActive = false;
 unsigned long lastCommandTime = 0;
 const unsigned long COMMAND_DEBOUNCE_TIME = 500; // 500ms debounce for commands
 
+// Framed protocol state
+bool framedMode = false;
+bool awaitingConfirm = false;
+unsigned long confirmDeadline = 0;
+byte rxFrame[5 + FRAME_MAX_PAYLOAD + 2];
+byte rxLen = 0;
+unsigned long lastFrameByteTime = 0;
+byte txSeq = 0;
+byte seenSeqs[SEEN_SLOTS];
+byte seenCount = 0;
+byte seenNext = 0;
+
+struct PendingFrame {
+  bool used;
+  byte seq;
+  byte len;
+  byte attempts;
+  unsigned long sentAt;
+  byte data[8];
+};
+PendingFrame pending[PENDING_SLOTS];
+
 void setup() {
   // Initialize serial communications
   Serial.begin(BAUD_RATE);     // USB connection to computer
@@ -32,61 +89,40 @@ void setup() {
 void loop() {
   // Check for messages from the computer
   if (Serial.available() > 0) {
-    char command = Serial.read();
+    byte incoming = Serial.read();
     
-    // Pass commands to the Mega
-    megaSerial.write(command);
-    
-    // Process specific commands locally if needed
-    unsigned long currentTime = millis();
-    if (currentTime - lastCommandTime >= COMMAND_DEBOUNCE_TIME) {
-      lastCommandTime = currentTime;
-      
-      switch(command) {
-        case 'N': // New game
-          gameActive = true;
-          Serial.println("GAME_STARTED");
-          break;
-        case 'E': // End game
-          gameActive = false;
-          Serial.println("GAME_ENDED");
-          break;
-        case 'D': // Draw ball - send lift ball command to Mega
-          if (gameActive) {
-            // Send lift ball command to Mega
-            megaSerial.write('l');
-            Serial.println("BALL_REQUESTED");
-          } else {
-            Serial.println("GAME_NOT_ACTIVE");
-          }
-          break;
+    if (rxLen > 0 || incoming == FRAME_SOF) {
+      handleFrameByte(incoming);
+    } else {
+      // A bare command byte means the computer is speaking ASCII
+      if (framedMode) {
+        revertToAscii();
       }
+      handleCommand((char)incoming);
     }
   }
+    
+  // Abandon a frame that stopped arriving part way through
+  if (rxLen > 0 && millis() - lastFrameByteTime > FRAME_BYTE_TIMEOUT) {
+    rxLen = 0;
+  }
   
   // Check for messages from the Mega
   if (megaSerial.available() > 0) {
     char message = megaSerial.read();
     
-    // Forward to computer
-    Serial.write(message);
-    
-    // Process specific messages if needed
-    if (message >= 'A' && message <= 'Y') {
-      lastBall = message;
-      // Send formatted ball data to the computer
-      Serial.print("BALL:");
-      Serial.println(message);
-    }
-    
-    // Ball through gate message
-    if (message == 'z') {
-      Serial.println("BALL_RELEASED");
+    if (framedMode) {
+      forwardFramed(message);
+    } else {
+      forwardAscii(message);
     }
+  }
     
-    // Ball returned message
-    if (message == 'Z') {
-      Serial.println("BALL_RETURNED");
+  if (framedMode) {
+    serviceRetransmits();
+    if (awaitingConfirm && (long)(millis() - confirmDeadline) > 0) {
+      // The computer never confirmed the switch
+      revertToAscii();
     }
   }
   
@@ -94,6 +130,245 @@ void loop() {
   delay(10);
 }
 
+// Handle a command byte from the computer
+void handleCommand(char command) {
+  // Pass commands to the Mega
+  megaSerial.write(command);
+
+  // Process specific commands locally if needed
+  unsigned long currentTime = millis();
+  if (currentTime - lastCommandTime >= COMMAND_DEBOUNCE_TIME) {
+    lastCommandTime = currentTime;
+
+    switch(command) {
+      case 'N': // New game
+        gameActive = true;
+        sendEvent(EVENT_GAME_STARTED, "GAME_STARTED");
+        break;
+      case 'E': // End game
+        gameActive = false;
+        sendEvent(EVENT_GAME_ENDED, "GAME_ENDED");
+        break;
+      case 'D': // Draw ball - send lift ball command to Mega
+        if (gameActive) {
+          // Send lift ball command to Mega
+          megaSerial.write('l');
+          sendEvent(EVENT_BALL_REQUESTED, "BALL_REQUESTED");
+        } else {
+          sendEvent(EVENT_GAME_NOT_ACTIVE, "GAME_NOT_ACTIVE");
+        }
+        break;
+    }
+  }
+}
+
+// Forward a Mega byte using the legacy ASCII lines
+void forwardAscii(char message) {
+  // Forward to computer
+  Serial.write(message);
+
+  // Process specific messages if needed
+  if (message >= 'A' && message <= 'Y') {
+    lastBall = message;
+    // Send formatted ball data to the computer
+    Serial.print("BALL:");
+    Serial.println(message);
+  }
+
+  // Ball through gate message
+  if (message == 'z') {
+    Serial.println("BALL_RELEASED");
+  }
+
+  // Ball returned message
+  if (message == 'Z') {
+    Serial.println("BALL_RETURNED");
+  }
+}
+
+// Forward a Mega byte as a frame
+void forwardFramed(char message) {
+  if (message >= 'A' && message <= 'Y') {
+    lastBall = message;
+    byte code = (byte)message;
+    sendReliable(FRAME_BALL, &code, 1);
+  } else if (message == 'z') {
+    sendEvent(EVENT_BALL_RELEASED, "BALL_RELEASED");
+  } else if (message == 'Z') {
+    sendEvent(EVENT_BALL_RETURNED, "BALL_RETURNED");
+  } else if (message != '\r' && message != '\n') {
+    byte raw = (byte)message;
+    sendFrame(FRAME_RAW, 0, &raw, 1, NULL);
+  }
+}
+
+// Send an event as a frame or as its legacy line
+void sendEvent(byte code, const char* line) {
+  if (framedMode) {
+    sendFrame(FRAME_EVENT, 0, &code, 1, NULL);
+  } else {
+    Serial.println(line);
+  }
+}
+
+// CRC-16/CCITT-FALSE, as used by serial_protocol.py
+uint16_t crc16(const byte* data, byte len) {
+  uint16_t crc = 0xFFFF;
+  for (byte i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (byte bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Build and send a frame; optionally keep a copy for retransmission
+byte sendFrame(byte type, byte seq, const byte* payload, byte len, byte* copy) {
+  byte frame[5 + FRAME_MAX_PAYLOAD + 2];
+  frame[0] = FRAME_SOF;
+  frame[1] = FRAME_VERSION;
+  frame[2] = type;
+  frame[3] = seq;
+  frame[4] = len;
+  for (byte i = 0; i < len; i++) {
+    frame[5 + i] = payload[i];
+  }
+  uint16_t crc = crc16(frame + 1, 4 + len);
+  frame[5 + len] = crc >> 8;
+  frame[6 + len] = crc & 0xFF;
+
+  byte total = 7 + len;
+  Serial.write(frame, total);
+  if (copy != NULL) {
+    for (byte i = 0; i < total; i++) {
+      copy[i] = frame[i];
+    }
+  }
+  return total;
+}
+
+// Send a frame that is retransmitted until the computer acknowledges it
+void sendReliable(byte type, const byte* payload, byte len) {
+  txSeq++;
+  byte slot = 0;
+  for (byte i = 0; i < PENDING_SLOTS; i++) {
+    if (!pending[i].used) {
+      slot = i;
+      break;
+    }
+    // All slots busy: overwrite the oldest
+    if (pending[i].sentAt < pending[slot].sentAt) {
+      slot = i;
+    }
+  }
+  pending[slot].used = true;
+  pending[slot].seq = txSeq;
+  pending[slot].attempts = 1;
+  pending[slot].sentAt = millis();
+  pending[slot].len = sendFrame(type, txSeq, payload, len, pending[slot].data);
+}
+
+void serviceRetransmits() {
+  unsigned long now = millis();
+  for (byte i = 0; i < PENDING_SLOTS; i++) {
+    if (!pending[i].used || now - pending[i].sentAt < ACK_TIMEOUT) {
+      continue;
+    }
+    if (pending[i].attempts > MAX_RETRIES) {
+      pending[i].used = false;
+      continue;
+    }
+    Serial.write(pending[i].data, pending[i].len);
+    pending[i].sentAt = now;
+    pending[i].attempts++;
+  }
+}
+
+// Remember a received sequence number; returns true if it was a repeat
+bool alreadySeen(byte seq) {
+  for (byte i = 0; i < seenCount; i++) {
+    if (seenSeqs[i] == seq) {
+      return true;
+    }
+  }
+  seenSeqs[seenNext] = seq;
+  seenNext = (seenNext + 1) % SEEN_SLOTS;
+  if (seenCount < SEEN_SLOTS) {
+    seenCount++;
+  }
+  return false;
+}
+
+// Collect a frame byte from the computer and act on complete frames
+void handleFrameByte(byte incoming) {
+  lastFrameByteTime = millis();
+  rxFrame[rxLen++] = incoming;
+
+  if (rxLen < 5) {
+    return;
+  }
+  byte len = rxFrame[4];
+  if (len > FRAME_MAX_PAYLOAD) {
+    rxLen = 0;
+    return;
+  }
+  if (rxLen < 7 + len) {
+    return;
+  }
+  rxLen = 0;
+
+  uint16_t crc = ((uint16_t)rxFrame[5 + len] << 8) | rxFrame[6 + len];
+  if (crc != crc16(rxFrame + 1, 4 + len) || rxFrame[1] != FRAME_VERSION) {
+    return;
+  }
+  processFrame(rxFrame[2], rxFrame[3], rxFrame + 5, len);
+}
+
+void processFrame(byte type, byte seq, const byte* payload, byte len) {
+  if (type == FRAME_HELLO && len >= 5) {
+    unsigned long requested = ((unsigned long)payload[1] << 24) | ((unsigned long)payload[2] << 16) |
+                              ((unsigned long)payload[3] << 8) | payload[4];
+    unsigned long agreed = requested < MAX_BAUD_RATE ? requested : MAX_BAUD_RATE;
+    byte ack[5] = {FRAME_VERSION, (byte)(agreed >> 24), (byte)(agreed >> 16), (byte)(agreed >> 8), (byte)agreed};
+    sendFrame(FRAME_HELLO_ACK, 0, ack, 5, NULL);
+    Serial.flush();
+    Serial.begin(agreed);
+    framedMode = true;
+    awaitingConfirm = true;
+    confirmDeadline = millis() + CONFIRM_TIMEOUT;
+    return;
+  }
+
+  // Any other valid frame confirms the computer switched over
+  awaitingConfirm = false;
+
+  if (type == FRAME_ACK && len >= 1) {
+    for (byte i = 0; i < PENDING_SLOTS; i++) {
+      if (pending[i].used && pending[i].seq == payload[0]) {
+        pending[i].used = false;
+      }
+    }
+  } else if (type == FRAME_COMMAND && len >= 1) {
+    byte acked = seq;
+    sendFrame(FRAME_ACK, 0, &acked, 1, NULL);
+    if (!alreadySeen(seq)) {
+      handleCommand((char)payload[0]);
+    }
+  }
+}
+
+// Fall back to ASCII lines at the power-on baud rate
+void revertToAscii() {
+  framedMode = false;
+  awaitingConfirm = false;
+  for (byte i = 0; i < PENDING_SLOTS; i++) {
+    pending[i].used = false;
+  }
+  Serial.flush();
+  Serial.begin(BAUD_RATE);
+}
+
 // Helper function to send formatted messages to the computer
 void sendMessage(const char* type, const char* value) {
   Serial.print(type);
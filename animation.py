@@ -0,0 +1,89 @@
+"""
+Animation
+---------
+Time-based tweens for the game screen.
+
+A tween only records when it started and how long it lasts; its progress is
+read from the clock every frame. A slow or dropped frame therefore skips
+ahead instead of stretching the animation, and the same animation takes the
+same time at any frame rate.
+"""
+
+import math
+from typing import Dict, Hashable, Optional
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_out_cubic(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_sine(t: float) -> float:
+    return -(math.cos(math.pi * t) - 1) / 2
+
+
+def ease_out_bounce(t: float) -> float:
+    """Fall and bounce twice before settling."""
+    if t < 1 / 2.75:
+        return 7.5625 * t * t
+    if t < 2 / 2.75:
+        t -= 1.5 / 2.75
+        return 7.5625 * t * t + 0.75
+    if t < 2.5 / 2.75:
+        t -= 2.25 / 2.75
+        return 7.5625 * t * t + 0.9375
+    t -= 2.625 / 2.75
+    return 7.5625 * t * t + 0.984375
+
+
+def lerp(start: float, end: float, t: float) -> float:
+    return start + (end - start) * t
+
+
+def frame_index(t: float, count: int) -> int:
+    """Pick one of count pre-rendered frames for progress t (0 to 1)."""
+    return min(count - 1, max(0, int(t * count)))
+
+
+class Tween:
+    """One running animation: a start time and a duration."""
+
+    __slots__ = ("start", "duration")
+
+    def __init__(self, start: float, duration: float):
+        self.start = start
+        self.duration = duration
+
+    def progress(self, now: float) -> float:
+        """Linear progress from 0 to 1; apply an easing function to shape it."""
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.start) / self.duration))
+
+
+class Animator:
+    """Named tweens; a finished tween is dropped the next time it is read."""
+
+    def __init__(self):
+        self.tweens: Dict[Hashable, Tween] = {}
+
+    def start(self, key: Hashable, now: float, duration: float, delay: float = 0.0) -> Tween:
+        """Start (or restart) the tween called key."""
+        tween = self.tweens[key] = Tween(now + delay, duration)
+        return tween
+
+    def progress(self, key: Hashable, now: float) -> Optional[float]:
+        """Return the progress of a running tween, or None if it isn't running."""
+        tween = self.tweens.get(key)
+        if tween is None:
+            return None
+        if now >= tween.start + tween.duration:
+            del self.tweens[key]
+            return None
+        return tween.progress(now)
+
+    def clear(self) -> None:
+        self.tweens.clear()
@@ -0,0 +1,344 @@
+"""
+Benchmark Suite
+---------------
+Repeatable micro-benchmarks for the game core and the rendering path.
+
+Results are written as JSON so runs from different commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+
+Rendering runs under the SDL dummy video driver, so no display is needed.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import main
+import win_patterns
+from odds import OddsTracker
+
+PATTERNS = ["horizontal", "vertical", "diagonal", "four_corners", "full_card", "any"]
+
+
+class Benchmark:
+    """A named function timed over repeated batches of calls."""
+
+    def __init__(self, name: str, func: Callable[[], None], number: int,
+                 setup: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.func = func
+        self.number = number        # calls per timed batch
+        self.setup = setup          # run before each batch, outside the timing
+
+    def run(self, repeat: int, warmup: int = 1) -> Dict:
+        """Time the benchmark and return per-call statistics in microseconds."""
+        for _ in range(warmup):
+            if self.setup:
+                self.setup()
+            for _ in range(self.number):
+                self.func()
+
+        samples = []
+        for _ in range(repeat):
+            if self.setup:
+                self.setup()
+            func = self.func
+            start = time.perf_counter()
+            for _ in range(self.number):
+                func()
+            samples.append((time.perf_counter() - start) / self.number * 1e6)
+
+        median = statistics.median(samples)
+        return {
+            "calls_per_sample": self.number,
+            "samples": repeat,
+            "min_us": round(min(samples), 3),
+            "median_us": round(median, 3),
+            "mean_us": round(statistics.fmean(samples), 3),
+            "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+            "ops_per_s": round(1e6 / median, 1) if median else None,
+        }
+
+
+def setup_game(width: int, height: int, seed: int) -> pygame.Surface:
+    """Load settings, silence audio and open a dummy display."""
+    random.seed(seed)
+    main.settings = main.load_settings()
+    main.settings['audio']['enabled'] = False
+    main.settings['serial']['emulate'] = False
+    main.sound_manager = main.SoundManager()
+    main.arduino_bridge = None
+    main.session = main.GameSession()
+    return pygame.display.set_mode((width, height))
+
+
+def build_benchmarks(screen: pygame.Surface, seed: int, scale: float) -> List[Benchmark]:
+    """Create the benchmark list."""
+    rng = random.Random(seed)
+    benchmarks = []
+
+    def n(count: int) -> int:
+        return max(1, int(count * scale))
+
+    # Card generation
+    benchmarks.append(Benchmark("card.generate", main.BingoCard, n(2000)))
+
+    # Marking numbers: a fresh card each batch, marking every number once
+    card_holder = {}
+    numbers = list(range(1, 76))
+    rng.shuffle(numbers)
+    number_iter = {"i": 0}
+
+    def mark_setup():
+        card_holder["card"] = main.BingoCard()
+        number_iter["i"] = 0
+
+    def mark_one():
+        card_holder["card"].mark_number(numbers[number_iter["i"] % 75])
+        number_iter["i"] += 1
+
+    benchmarks.append(Benchmark("card.mark_number", mark_one, 75, setup=mark_setup))
+
+    # Win checks on a half-marked card (the common mid-game case)
+    checked_card = main.BingoCard()
+    for number in rng.sample(range(1, 76), 30):
+        checked_card.mark_number(number)
+    for pattern in PATTERNS:
+        benchmarks.append(Benchmark(
+            f"card.check_for_win.{pattern}",
+            lambda pattern=pattern: checked_card.check_for_win(pattern),
+            n(20000)
+        ))
+
+    # Whole-session winner resolution for a known draw order
+    session_cards = [main.BingoCard() for _ in range(n(1000))]
+    session_order = rng.sample(range(1, 76), 75)
+    benchmarks.append(Benchmark(
+        "session.resolve_winners",
+        lambda: win_patterns.resolve_winners(session_order, session_cards),
+        5
+    ))
+
+    # A headless room playing a whole game, as the room server does
+    room = main.GameSession(ball_factory=int)
+
+    def play_room_game():
+        room.new_game()
+        while room.draw() is not None:
+            if room.check_for_bingo():
+                break
+        room.end_game(room.winner is not None)
+
+    benchmarks.append(Benchmark("session.headless_game", play_room_game, n(200)))
+
+    # Win odds after each draw for a big paper session, from 20 to 40 balls drawn
+    odds_cards = [win_patterns.random_card_numbers(rng) for _ in range(n(3000))]
+    odds_order = rng.sample(range(1, 76), 75)
+    odds_state = {}
+
+    def odds_setup():
+        tracker = odds_state["tracker"] = OddsTracker(odds_cards, "any")
+        for number in odds_order[:20]:
+            tracker.mark(number)
+        odds_state["i"] = 20
+
+    def odds_after_draw():
+        tracker = odds_state["tracker"]
+        tracker.mark(odds_order[odds_state["i"]])
+        odds_state["i"] += 1
+        tracker.odds()
+
+    benchmarks.append(Benchmark("odds.after_draw", odds_after_draw, 20, setup=odds_setup))
+
+    # Serial message parsing
+    def reset_game_state():
+        main.session = main.GameSession()
+        main.session.player_cards = [main.BingoCard()]
+
+    ball_message = b"ABALL:A\r\n\r\n"
+    mixed_message = b"BALL_REQUESTED\r\nzBALL_RELEASED\r\nCBALL:C\r\n\r\nGAME_STARTED\r\n"
+    benchmarks.append(Benchmark(
+        "serial.process_message.ball",
+        lambda: main.process_arduino_message(ball_message),
+        n(500), setup=reset_game_state
+    ))
+    benchmarks.append(Benchmark(
+        "serial.process_message.mixed",
+        lambda: main.process_arduino_message(mixed_message),
+        n(500), setup=reset_game_state
+    ))
+    benchmarks.append(Benchmark(
+        "serial.process_message.status_only",
+        lambda: main.process_arduino_message(b"BALL_REQUESTED\r\nGAME_STARTED\r\n"),
+        n(20000), setup=reset_game_state
+    ))
+    switch_message = b"8^\r\nw^\r\nzBALL_RELEASED\r\nZBALL_RETURNED\r\n^\r\na^\r\n"
+    benchmarks.append(Benchmark(
+        "serial.process_message.switches",
+        lambda: main.process_arduino_message(switch_message),
+        n(5000), setup=reset_game_state
+    ))
+
+    # Ball construction
+    ball_numbers = [rng.randint(1, 75) for _ in range(256)]
+    ball_index = {"i": 0}
+
+    def make_ball():
+        main.Ball(ball_numbers[ball_index["i"] & 255])
+        ball_index["i"] += 1
+
+    benchmarks.append(Benchmark("ball.construct", make_ball, n(500)))
+
+    # Rendering a full in-game frame
+    canvas = main.SoftwareCanvas(screen)
+    ui = main.GameUI(canvas)
+    frame_card = main.BingoCard()
+    frame_balls = [main.Ball(number) for number in rng.sample(range(1, 76), 20)]
+    for ball in frame_balls:
+        frame_card.mark_number(ball.number)
+
+    def render_frame(ui=ui, balls=frame_balls, card=frame_card, now=0.0):
+        ui.begin_frame(now)
+        ui.draw_background()
+        ui.draw_header()
+        ui.draw_current_ball(balls[-1])
+        ui.draw_recently_drawn_balls(balls)
+        ui.draw_player_card(card)
+        ui.draw_score_panel()
+        ui.canvas.present()
+
+    benchmarks.append(Benchmark("render.frame", render_frame, n(100)))
+
+    # The frame after a draw, halfway through the ball drop, strip roll and cell flash
+    animated_ui = main.GameUI(canvas)
+    animated_card = main.BingoCard()
+    animated_balls = frame_balls[:10] + [main.Ball(cell.number) for cell in animated_card.grid[0][:4]]
+    for ball in animated_balls[:-1]:
+        animated_card.mark_number(ball.number)
+    render_frame(animated_ui, animated_balls[:-1], animated_card)
+    animated_card.mark_number(animated_balls[-1].number)
+    render_frame(animated_ui, animated_balls, animated_card)
+    benchmarks.append(Benchmark(
+        "render.frame.animated",
+        lambda: render_frame(animated_ui, animated_balls, animated_card, now=0.25),
+        n(100)
+    ))
+
+    # The same frame through the SDL2 renderer (SDL's software renderer if there is no GPU)
+    try:
+        texture_ui = main.GameUI(main.TextureCanvas(screen.get_size(), accelerated=False))
+    except (pygame.error, RuntimeError) as e:
+        print(f"Skipping render.frame.texture: {e}")
+    else:
+        benchmarks.append(Benchmark("render.frame.texture", lambda: render_frame(texture_ui), n(100)))
+    benchmarks.append(Benchmark("render.draw_player_card", lambda: ui.draw_player_card(frame_card), n(300)))
+    benchmarks.append(Benchmark(
+        "render.draw_recently_drawn_balls",
+        lambda: ui.draw_recently_drawn_balls(frame_balls),
+        n(300)
+    ))
+    benchmarks.append(Benchmark("render.draw_caller_board", lambda: ui.draw_caller_board(frame_balls), n(300)))
+    benchmarks.append(Benchmark("render.draw_menu", lambda: ui.draw_menu(["New Game", "Settings", "Quit"], 0), n(1000)))
+
+    return benchmarks
+
+
+def git_revision() -> Optional[str]:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=main.SCRIPT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> bool:
+    """Print the change against a baseline run. Returns False on regressions above threshold."""
+    ok = True
+    print(f"\n{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous:
+            print(f"{name:40} {'-':>12} {current['median_us']:>10.2f}us {'new':>9}")
+            continue
+        change = (current['median_us'] - previous['median_us']) / previous['median_us'] * 100
+        flag = ""
+        if threshold and change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:40} {previous['median_us']:>10.2f}us {current['median_us']:>10.2f}us {change:>+8.1f}%{flag}")
+    return ok
+
+
+def main_cli() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the bingo game core and rendering paths")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--fail-above", type=float, default=0.0,
+                        help="exit non-zero if any median regresses by more than this percentage")
+    parser.add_argument("--repeat", type=int, default=7, help="timed samples per benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the calls per sample")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--resolution", default="1080x1920", help="render resolution, WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    screen = setup_game(width, height, args.seed)
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "resolution": args.resolution,
+            "repeat": args.repeat,
+            "scale": args.scale,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "benchmarks": {},
+    }
+
+    for benchmark in build_benchmarks(screen, args.seed, args.scale):
+        if args.filter and args.filter not in benchmark.name:
+            continue
+        random.seed(args.seed)
+        stats = benchmark.run(args.repeat)
+        results["benchmarks"][benchmark.name] = stats
+        print(f"{benchmark.name:40} {stats['median_us']:>10.2f}us  (min {stats['min_us']:.2f}, "
+              f"stdev {stats['stdev_us']:.2f})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"\nWrote results to {args.output}")
+
+    ok = True
+    if args.compare:
+        with open(args.compare) as f:
+            ok = compare(results, json.load(f), args.fail_above)
+
+    pygame.quit()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,255 @@
+"""
+Broadcast Server
+----------------
+Fans game events out from the caller machine to remote displays over TCP.
+
+Each event is one JSON object per line, for example:
+
+    {"t": "state", "active": true, "pattern": "any", "balls": [12, 40], ...}
+    {"t": "new", "pattern": "any", "games": 8}
+    {"t": "ball", "n": 57}
+    {"t": "win", "card": 0, "pattern": "horizontal"}
+    {"t": "end", "won": true, "score": 800, "wins": 8, "games": 8}
+
+A new subscriber first receives a "state" snapshot and then the live events.
+The server runs its own asyncio loop on a background thread; publish() only
+hands the event over, so the game loop never waits on the network. Every
+subscriber has a bounded queue: one that falls behind has its backlog dropped
+and is sent a fresh snapshot instead, without slowing anyone else down.
+"""
+
+import json
+import socket
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional
+
+from metrics import metrics
+
+
+class DisplayState:
+    """The game state a display needs, rebuilt from broadcast events."""
+
+    def __init__(self):
+        self.active = False
+        self.pattern = None
+        self.balls: List[int] = []
+        self.winner = None
+        self.score = 0
+        self.wins = 0
+        self.games = 0
+
+    def apply(self, event: Dict) -> None:
+        """Update the state from one event."""
+        kind = event.get("t")
+        if kind == "state":
+            self.active = event.get("active", False)
+            self.pattern = event.get("pattern")
+            self.balls = list(event.get("balls", []))
+            self.winner = event.get("winner")
+        elif kind == "new":
+            self.active = True
+            self.pattern = event.get("pattern")
+            self.balls = []
+            self.winner = None
+        elif kind == "ball":
+            self.balls.append(event["n"])
+        elif kind == "win":
+            self.winner = {"card": event.get("card"), "pattern": event.get("pattern")}
+        elif kind == "end":
+            self.active = False
+        for key, field in (("score", "score"), ("wins", "wins"), ("games", "games")):
+            if field in event:
+                setattr(self, key, event[field])
+
+    def snapshot(self) -> Dict:
+        """Return the state as a "state" event."""
+        return {
+            "t": "state",
+            "active": self.active,
+            "pattern": self.pattern,
+            "balls": list(self.balls),
+            "winner": self.winner,
+            "score": self.score,
+            "wins": self.wins,
+            "games": self.games,
+        }
+
+
+def encode_event(event: Dict) -> bytes:
+    """Encode an event as a compact JSON line."""
+    return (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _Subscriber:
+    """A connected display and its outgoing queue."""
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.resyncs = 0
+
+
+class BroadcastServer:
+    """Asyncio TCP server publishing game events to display clients."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8765, queue_size: int = 256):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.state = DisplayState()
+        self.subscribers: List[_Subscriber] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="broadcast", daemon=True)
+
+    def start(self) -> bool:
+        """Start serving on a background thread. Returns False if the port couldn't be opened."""
+        self._thread.start()
+        self._ready.wait(5.0)
+        if self._error is not None:
+            print(f"Could not start broadcast server: {self._error}")
+            return False
+        print(f"Broadcasting game events on {self.host}:{self.port}")
+        return True
+
+    def publish(self, event: Dict) -> None:
+        """Send an event to every subscriber (safe to call from any thread)."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._fan_out, event)
+
+    def stop(self) -> None:
+        """Close every connection and stop the server thread."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        """Run the event loop on the server thread."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port)
+            )
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            self.loop.close()
+            return
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+    def _fan_out(self, event: Dict) -> None:
+        """Apply an event to the server's state and queue it for every subscriber."""
+        self.state.apply(event)
+        line = encode_event(event)
+        snapshot = None
+        metrics.inc("broadcast.events")
+        for subscriber in self.subscribers:
+            try:
+                subscriber.queue.put_nowait(line)
+            except asyncio.QueueFull:
+                if snapshot is None:
+                    snapshot = encode_event(self.state.snapshot())
+                self._resync(subscriber, snapshot)
+
+    def _resync(self, subscriber: _Subscriber, snapshot: bytes) -> None:
+        """Replace a slow subscriber's backlog with a snapshot of the current state."""
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(snapshot)
+        subscriber.resyncs += 1
+        metrics.inc("broadcast.resyncs")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Stream events to one display until it disconnects."""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Keep the kernel-side buffer small so backpressure shows up in our queue
+        writer.transport.set_write_buffer_limits(high=64 * 1024)
+
+        subscriber = _Subscriber(writer, self.queue_size)
+        subscriber.queue.put_nowait(encode_event(self.state.snapshot()))
+        self.subscribers.append(subscriber)
+        metrics.inc("broadcast.connections")
+        # Notice disconnects even while nothing is being sent
+        watcher = asyncio.ensure_future(reader.read())
+        try:
+            while not watcher.done():
+                getter = asyncio.ensure_future(subscriber.queue.get())
+                await asyncio.wait({getter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                writer.write(getter.result())
+                # Batch whatever else is already queued into the same write
+                while not subscriber.queue.empty():
+                    writer.write(subscriber.queue.get_nowait())
+                await writer.drain()
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # Cancelled only when the server is stopping
+            pass
+        finally:
+            watcher.cancel()
+            self.subscribers.remove(subscriber)
+            writer.close()
+
+
+class DisplayClient:
+    """Receives broadcast events on a background thread for a display to render."""
+
+    def __init__(self, host: str, port: int, on_event: Callable[[Dict], None], retry_delay: float = 2.0):
+        self.host = host
+        self.port = port
+        self.on_event = on_event          # called on the client thread for every event
+        self.retry_delay = retry_delay
+        self.connected = False
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._thread = threading.Thread(target=self._run, name="display-client", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        """Connect, read event lines and reconnect whenever the caller goes away."""
+        while not self._stop.is_set():
+            try:
+                self._sock = socket.create_connection((self.host, self.port), timeout=5.0)
+                self._sock.settimeout(None)
+                self.connected = True
+                with self._sock.makefile("rb") as stream:
+                    for line in stream:
+                        try:
+                            self.on_event(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except OSError:
+                pass
+            finally:
+                self.connected = False
+                if self._sock is not None:
+                    self._sock.close()
+            self._stop.wait(self.retry_delay)
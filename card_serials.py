@@ -0,0 +1,263 @@
+"""
+Card Serials
+------------
+Every possible card has a serial number, and a card's numbers can be
+worked out from its serial (and back) in constant time. Nothing needs to be
+stored to look up a claimed card.
+
+A card's serial is the rank of its column choices. Each column is an ordered
+choice from that column's 15 numbers: 5 of them, or 4 for the N column
+around the FREE space. The column is ranked by its Lehmer code, and the five
+column ranks are combined in mixed radix, B first. Shown to players, a serial
+is 18 Crockford base-32 characters, e.g. 3F7K2M-0QZ9XA-T41BHC.
+
+When cards are issued across many sessions, SerialRegistry keeps a Bloom
+filter of every serial already issued. The filter is a memory-mapped file
+of fixed size, so tens of millions of serials need neither a database nor
+RAM to match. Its answer "possibly issued" is sometimes wrong (at the error
+rate it was sized for), and such a card is simply passed over; its answer
+"not issued" is always right, so no card is issued twice. Processes sharing
+a registry file take an exclusive lock on it for each test-and-set (on
+platforms with fcntl; elsewhere a registry is for one process only).
+
+    python card_serials.py 3F7K2M-0QZ9XA-T41BHC        # show a card
+    python card_serials.py --registry issued.bloom --stats
+"""
+
+import os
+import mmap
+import math
+import random
+import struct
+import hashlib
+import argparse
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
+import win_patterns
+
+COLUMN_SIZE = 15
+FREE_ROW = 2
+
+# (numbers chosen, ordered choices) for each column; the N column has the FREE space
+_COLUMNS = [(5, math.perm(COLUMN_SIZE, 5))] * 2 + [(4, math.perm(COLUMN_SIZE, 4))] + [(5, math.perm(COLUMN_SIZE, 5))] * 2
+
+SERIAL_COUNT = math.prod(count for _, count in _COLUMNS)     # about 5.5e26 distinct cards
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"     # Crockford base 32
+_DECODE = {char: value for value, char in enumerate(_ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+SERIAL_DIGITS = 18
+
+
+def _rank_column(offsets: List[int]) -> int:
+    """Lehmer rank of an ordered choice of distinct offsets from 0..14."""
+    remaining = list(range(COLUMN_SIZE))
+    rank = 0
+    for i, offset in enumerate(offsets):
+        position = remaining.index(offset)
+        remaining.pop(position)
+        rank += position * math.perm(COLUMN_SIZE - 1 - i, len(offsets) - 1 - i)
+    return rank
+
+
+def _unrank_column(rank: int, length: int) -> List[int]:
+    remaining = list(range(COLUMN_SIZE))
+    offsets = []
+    for i in range(length):
+        position, rank = divmod(rank, math.perm(COLUMN_SIZE - 1 - i, length - 1 - i))
+        offsets.append(remaining.pop(position))
+    return offsets
+
+
+def card_serial(card) -> int:
+    """Return the serial of a card (a BingoCard, or its numbers as for win_patterns.card_numbers)."""
+    numbers = win_patterns.card_numbers(card)
+    if len(numbers) != win_patterns.GRID_SIZE ** 2:
+        raise ValueError("a card has 25 numbers")
+    serial = 0
+    for col, (length, count) in enumerate(_COLUMNS):
+        column = numbers[col * 5:col * 5 + 5]
+        if length == 4:
+            if column[FREE_ROW] != win_patterns.FREE:
+                raise ValueError("the N column needs the FREE space in the middle")
+            column = column[:FREE_ROW] + column[FREE_ROW + 1:]
+        offsets = [number - col * COLUMN_SIZE - 1 for number in column]
+        if any(not 0 <= offset < COLUMN_SIZE for offset in offsets) or len(set(offsets)) != length:
+            raise ValueError(f"column {'BINGO'[col]} has numbers outside its range or repeated")
+        serial = serial * count + _rank_column(offsets)
+    return serial
+
+
+def card_from_serial(serial: int) -> List[int]:
+    """Return the 25 numbers, in [col][row] order, of the card with this serial."""
+    if not 0 <= serial < SERIAL_COUNT:
+        raise ValueError("serial out of range")
+    ranks = []
+    for _, count in reversed(_COLUMNS):
+        serial, rank = divmod(serial, count)
+        ranks.append(rank)
+    numbers = []
+    for col, ((length, _), rank) in enumerate(zip(_COLUMNS, reversed(ranks))):
+        column = [col * COLUMN_SIZE + 1 + offset for offset in _unrank_column(rank, length)]
+        if length == 4:
+            column.insert(FREE_ROW, win_patterns.FREE)
+        numbers.extend(column)
+    return numbers
+
+
+def random_serial(rng=random) -> int:
+    """Pick a card uniformly at random, as win_patterns.random_card_numbers deals them."""
+    return rng.randrange(SERIAL_COUNT)
+
+
+def format_serial(serial: int) -> str:
+    """Write a serial as 18 base-32 characters in groups of six."""
+    chars = []
+    for _ in range(SERIAL_DIGITS):
+        serial, digit = divmod(serial, 32)
+        chars.append(_ALPHABET[digit])
+    text = "".join(reversed(chars))
+    return "-".join(text[i:i + 6] for i in range(0, SERIAL_DIGITS, 6))
+
+
+def parse_serial(text: str) -> int:
+    """Read a serial written by format_serial (case, dashes and O/I/L mix-ups are forgiven)."""
+    serial = 0
+    digits = [char for char in text.upper() if char not in "- "]
+    if not digits:
+        raise ValueError("empty serial")
+    for char in digits:
+        if char not in _DECODE:
+            raise ValueError(f"invalid serial character {char!r}")
+        serial = serial * 32 + _DECODE[char]
+    if serial >= SERIAL_COUNT:
+        raise ValueError("serial out of range")
+    return serial
+
+
+class SerialRegistry:
+    """Bloom filter of issued serials in a memory-mapped file.
+
+    The file is a header (magic, bit count, hash count, serials added)
+    followed by the bit array. It is sized once, from the capacity and error
+    rate, when it is created; pages of it are only read as they are touched.
+    """
+
+    MAGIC = b"BINGOBF1"
+    HEADER = struct.Struct("<8sQIQ")
+
+    def __init__(self, path: str, capacity: int = 50_000_000, error_rate: float = 1e-6):
+        self.path = path
+        if not os.path.exists(path):
+            bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            bits = (bits + 7) // 8 * 8
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            with open(path, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, bits, hashes, 0))
+                f.truncate(self.HEADER.size + bits // 8)    # sparse where the filesystem allows
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self.count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a serial registry")
+
+    def _positions(self, serial: int) -> List[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(serial.to_bytes(12, "little"), digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        second |= 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, serial: int) -> bool:
+        """True if the serial may have been issued; False if it certainly has not."""
+        data = self._map
+        offset = self.HEADER.size
+        return all(data[offset + (position >> 3)] & (1 << (position & 7)) for position in self._positions(serial))
+
+    def add(self, serial: int) -> bool:
+        """Record a serial. Returns False, changing nothing, if it may have been issued already."""
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            if serial in self:
+                return False
+            data = self._map
+            offset = self.HEADER.size
+            for position in self._positions(serial):
+                data[offset + (position >> 3)] |= 1 << (position & 7)
+            # Other processes may have added serials since this one last looked
+            self.count = self.HEADER.unpack_from(data, 0)[3] + 1
+            self.HEADER.pack_into(data, 0, self.MAGIC, self.bits, self.hashes, self.count)
+            return True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def false_positive_rate(self) -> float:
+        """The chance that a new serial is passed over, at the current fill."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def issue_serial(registry: Optional[SerialRegistry], rng=random) -> int:
+    """Pick a random serial that has not been issued before, and record it."""
+    while True:
+        serial = random_serial(rng)
+        if registry is None or registry.add(serial):
+            return serial
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Look up cards by serial and inspect a serial registry")
+    parser.add_argument("serial", nargs="?", help="show the card with this serial")
+    parser.add_argument("--registry", help="Bloom filter file of issued serials")
+    parser.add_argument("--stats", action="store_true", help="show how full the registry is")
+    parser.add_argument("--capacity", type=int, default=50_000_000, help="serials a new registry is sized for")
+    parser.add_argument("--error-rate", type=float, default=1e-6,
+                        help="chance, once full, that a new registry passes over an unissued card")
+    args = parser.parse_args()
+
+    registry = SerialRegistry(args.registry, args.capacity, args.error_rate) if args.registry else None
+    try:
+        if args.serial:
+            serial = parse_serial(args.serial)
+            numbers = card_from_serial(serial)
+            print(f"Card {format_serial(serial)}")
+            print(" ".join(f"{letter:>3}" for letter in "BINGO"))
+            for row in range(5):
+                print(" ".join(f"{numbers[col * 5 + row] or 'FR':>3}" for col in range(5)))
+            if registry is not None:
+                print("issued (probably)" if serial in registry else "not issued")
+        if registry is not None and args.stats:
+            results = {
+                "serials": registry.count,
+                "bits": registry.bits,
+                "hashes": registry.hashes,
+                "file_mb": round(os.path.getsize(args.registry) / 1e6, 1),
+                "false_positive_rate": f"{registry.false_positive_rate():.2e}",
+            }
+            for key, value in results.items():
+                print(f"{key}: {value}")
+    finally:
+        if registry is not None:
+            registry.close()
+
+
+if __name__ == "__main__":
+    main()
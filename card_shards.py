@@ -0,0 +1,344 @@
+"""
+Card Shards
+-----------
+Evaluates very large card sets (linked games with millions of cards) by
+splitting them into shards, each held by its own process. A coordinator sends
+every drawn ball to all shards at once and gathers the cards that won on it,
+with the time each shard took.
+
+A shard does not re-check whole cards. It keeps, for every winning line of
+every card, a count of numbers still to be called, and an index from each
+number to the lines it appears on; a ball only decrements the lines it hits,
+and a line reaching zero wins its card. Lines follow win_patterns, so a card
+wins exactly when BingoCard.check_for_win would say so.
+
+Shards run as local processes, or as nodes on other machines:
+
+    python card_shards.py --serve 0.0.0.0:9870                         # on each node
+    python card_shards.py --cards 2000000 --nodes host1:9870,host2:9870
+
+numpy is used when it is installed; otherwise the same computation runs in
+plain Python.
+"""
+
+import os
+import time
+import random
+import argparse
+import multiprocessing
+from array import array
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import win_patterns
+from metrics import metrics
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_AUTHKEY = b"bingo-shards"
+
+
+class CardShard:
+    """A slice of the card set with per-line countdown counters."""
+
+    def __init__(self, cards: Sequence[Sequence[int]], pattern: str = "any",
+                 first_id: int = 0, max_number: int = 75):
+        self.first_id = first_id                  # card id of the shard's first card
+        self.max_number = max_number
+        self.pattern = pattern
+        lines = win_patterns.pattern_lines(pattern)
+        self.line_names = [name for name, _, _ in lines]
+        self.lines_per_card = len(lines)
+
+        # Which of a card's lines each cell is on
+        cell_lines = [[] for _ in range(win_patterns.GRID_SIZE ** 2)]
+        for offset, (_, _, cells) in enumerate(lines):
+            for cell in cells:
+                cell_lines[cell].append(offset)
+
+        index = [array('I') for _ in range(max_number + 1)]
+        counts = array('B')
+        for card_index, numbers in enumerate(cards):
+            base = card_index * self.lines_per_card
+            for cell, number in enumerate(numbers):
+                if number != win_patterns.FREE and cell_lines[cell]:
+                    index[number].extend([base + offset for offset in cell_lines[cell]])
+            counts.extend([sum(1 for cell in cells if numbers[cell] != win_patterns.FREE)
+                           for _, _, cells in lines])
+        self.card_count = len(cards)
+        self._initial = counts
+        self._index = index
+        if np is not None:
+            self._index = [np.frombuffer(lines, dtype=np.uint32) for lines in index]
+        self.new_game()
+
+    def new_game(self) -> None:
+        """Reset every line to uncalled."""
+        self._called = bytearray(self.max_number + 1)
+        if np is not None:
+            self._remaining = np.frombuffer(self._initial, dtype=np.uint8).copy()
+            self._won = np.zeros(self.card_count, dtype=bool)
+        else:
+            self._remaining = array('B', self._initial)
+            self._won = bytearray(self.card_count)
+        # Lines with only the FREE space (none in the standard patterns) win before the first ball
+        self.pending = self._completed(
+            [line for line, count in enumerate(self._initial) if count == 0]
+        )
+
+    def call(self, number: int) -> List[Tuple[int, str]]:
+        """Call a ball and return (card id, pattern) for every card that wins on it."""
+        winners = self.pending
+        self.pending = []
+        # A repeated or replayed ball must not count down its lines again
+        if not 1 <= number <= self.max_number or self._called[number]:
+            return winners
+        self._called[number] = 1
+        if np is not None:
+            lines = self._index[number]
+            self._remaining[lines] -= 1          # a number is on each line at most once
+            winners.extend(self._completed(lines[self._remaining[lines] == 0].tolist()))
+            return winners
+
+        remaining = self._remaining
+        done = []
+        for line in self._index[number]:
+            remaining[line] -= 1
+            if not remaining[line]:
+                done.append(line)
+        winners.extend(self._completed(done))
+        return winners
+
+    def _completed(self, lines: List[int]) -> List[Tuple[int, str]]:
+        """Turn completed lines into winners, once per card."""
+        winners = []
+        for line in lines:
+            card_index, offset = divmod(line, self.lines_per_card)
+            if not self._won[card_index]:
+                self._won[card_index] = True
+                winners.append((self.first_id + card_index, self.line_names[offset]))
+        return winners
+
+
+def generate_cards(count: int, seed: Optional[int] = None) -> List[List[int]]:
+    """Deal count random cards with the BingoCard column rules."""
+    rng = random.Random(seed)
+    return [win_patterns.random_card_numbers(rng) for _ in range(count)]
+
+
+def serve_shard(connection: Connection) -> None:
+    """Answer coordinator requests on a connection until told to stop.
+
+    Requests are tuples: ("generate", first_id, count, seed, pattern),
+    ("load", first_id, cards, pattern), ("new_game",), ("ball", number)
+    and ("stop",). Every request gets exactly one reply.
+    """
+    shard = None
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        kind = request[0]
+        if kind == "ball":
+            started = time.perf_counter()
+            winners = shard.call(request[1]) if shard is not None else []
+            connection.send(("winners", winners, (time.perf_counter() - started) * 1000))
+        elif kind == "new_game":
+            if shard is not None:
+                shard.new_game()
+            connection.send(("ok",))
+        elif kind == "generate":
+            _, first_id, count, seed, pattern = request
+            shard = CardShard(generate_cards(count, seed), pattern, first_id)
+            connection.send(("ok", shard.card_count))
+        elif kind == "load":
+            _, first_id, cards, pattern = request
+            shard = CardShard(cards, pattern, first_id)
+            connection.send(("ok", shard.card_count))
+        elif kind == "stop":
+            connection.send(("ok",))
+            break
+        else:
+            connection.send(("error", f"unknown request {kind!r}"))
+    connection.close()
+
+
+def _run_local_shard(connection: Connection) -> None:
+    """Process entry point for a local shard."""
+    try:
+        serve_shard(connection)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_node(host: str, port: int, authkey: bytes = DEFAULT_AUTHKEY) -> None:
+    """Serve one shard per coordinator connection on this machine."""
+    with Listener((host, port), authkey=authkey) as listener:
+        print(f"Card shard node listening on {host}:{port}")
+        while True:
+            connection = listener.accept()
+            process = multiprocessing.Process(target=_run_local_shard, args=(connection,), daemon=True)
+            process.start()
+            connection.close()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split HOST:PORT."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class ShardCoordinator:
+    """Splits a card set across shards and calls balls on all of them in parallel."""
+
+    def __init__(self, shards: int = 0, pattern: str = "any", nodes: Sequence[str] = (),
+                 authkey: bytes = DEFAULT_AUTHKEY):
+        self.pattern = pattern
+        self.card_count = 0
+        self._connections: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+        for address in nodes:
+            self._connections.append(Client(parse_address(address), authkey=authkey))
+        if not nodes:
+            for _ in range(shards or os.cpu_count() or 1):
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_run_local_shard, args=(child,), daemon=True)
+                process.start()
+                child.close()
+                self._connections.append(parent)
+                self._processes.append(process)
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._connections)
+
+    def _request_all(self, requests: Sequence[tuple]) -> List[tuple]:
+        """Send one request to each shard, then collect the replies."""
+        for connection, request in zip(self._connections, requests):
+            connection.send(request)
+        replies = [connection.recv() for connection in self._connections]
+        for reply in replies:
+            if reply[0] == "error":
+                raise RuntimeError(f"Card shard error: {reply[1]}")
+        return replies
+
+    def _split(self, count: int) -> List[Tuple[int, int]]:
+        """Return (first id, size) of each shard's part of count cards."""
+        size, extra = divmod(count, self.shard_count)
+        parts = []
+        first = 0
+        for i in range(self.shard_count):
+            part = size + (1 if i < extra else 0)
+            parts.append((first, part))
+            first += part
+        return parts
+
+    def generate_cards(self, count: int, seed: Optional[int] = None) -> int:
+        """Have every shard deal its share of count cards itself, so no cards cross the wire."""
+        requests = [
+            ("generate", first, part, None if seed is None else seed + i, self.pattern)
+            for i, (first, part) in enumerate(self._split(count))
+        ]
+        self.card_count = sum(reply[1] for reply in self._request_all(requests))
+        return self.card_count
+
+    def load_cards(self, cards: Sequence[Sequence[int]]) -> int:
+        """Distribute a list of cards (25 numbers each, [col][row] order); card ids are list indices."""
+        requests = [
+            ("load", first, [list(numbers) for numbers in cards[first:first + part]], self.pattern)
+            for first, part in self._split(len(cards))
+        ]
+        self.card_count = sum(reply[1] for reply in self._request_all(requests))
+        return self.card_count
+
+    def new_game(self) -> None:
+        """Reset every shard for a new draw."""
+        self._request_all([("new_game",)] * self.shard_count)
+
+    def call(self, number: int) -> Dict:
+        """Call a ball on every shard and return its winners and timings."""
+        started = time.perf_counter()
+        replies = self._request_all([("ball", number)] * self.shard_count)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        winners = sorted(winner for reply in replies for winner in reply[1])
+        shard_ms = [reply[2] for reply in replies]
+        metrics.observe("shards.ball_ms", elapsed)
+        for value in shard_ms:
+            metrics.observe("shards.shard_ms", value)
+        metrics.inc("shards.winners", len(winners))
+        return {"ball": number, "winners": winners, "elapsed_ms": elapsed, "shard_ms": shard_ms}
+
+    def close(self) -> None:
+        """Stop the shards."""
+        for connection in self._connections:
+            try:
+                connection.send(("stop",))
+                connection.recv()
+            except (EOFError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join(timeout=5.0)
+        self._connections = []
+        self._processes = []
+
+
+def main() -> None:
+    """Command line entry point: run a node, or time a game over a large card set."""
+    parser = argparse.ArgumentParser(description="Sharded evaluation of very large card sets")
+    parser.add_argument("--serve", metavar="HOST:PORT", help="run as a shard node")
+    parser.add_argument("--nodes", default="", help="comma-separated HOST:PORT shard nodes (default: local processes)")
+    parser.add_argument("--shards", type=int, default=0, help="local shard processes (default: one per CPU)")
+    parser.add_argument("--authkey", default=DEFAULT_AUTHKEY.decode())
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--pattern", default="any", choices=win_patterns.PATTERNS)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    authkey = args.authkey.encode()
+
+    if args.serve:
+        run_node(*parse_address(args.serve), authkey=authkey)
+        return
+
+    nodes = [node for node in args.nodes.split(",") if node]
+    coordinator = ShardCoordinator(args.shards, args.pattern, nodes, authkey)
+    shard_count = coordinator.shard_count
+    try:
+        started = time.perf_counter()
+        coordinator.generate_cards(args.cards, args.seed)
+        print(f"Dealt {coordinator.card_count} cards over {coordinator.shard_count} shards "
+              f"in {time.perf_counter() - started:.2f} s")
+
+        order = random.Random(args.seed).sample(range(1, 76), 75)
+        coordinator.new_game()
+        first_win = None
+        for index, number in enumerate(order):
+            result = coordinator.call(number)
+            if result["winners"] and first_win is None:
+                first_win = (index, number, len(result["winners"]))
+    finally:
+        coordinator.close()
+
+    snapshot = metrics.snapshot()
+    ball_ms = snapshot["histograms"].get("shards.ball_ms", {})
+    shard_ms = snapshot["histograms"].get("shards.shard_ms", {})
+    results = {
+        "cards": coordinator.card_count,
+        "shards": shard_count,
+        "first_win": None if first_win is None else
+        {"ball_index": first_win[0], "ball": first_win[1], "cards": first_win[2]},
+        "winners": snapshot["counters"].get("shards.winners", 0),
+        "ball_ms": {k: ball_ms.get(k) for k in ("p50", "p90", "p99", "max")},
+        "shard_ms": {k: shard_ms.get(k) for k in ("p50", "p90", "p99", "max")},
+    }
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Card Sheets
+-----------
+Renders printable sheets of bingo cards for paper sessions, headless, with
+the same look as the player card on the game screen (main.paint_card and the
+colours from settings.json).
+
+Cards are laid out in a grid on each page. Pages are rendered by a pool of
+processes, each loading the fonts once, and written to disk as they finish:
+one PNG per page, or a single PDF with one JPEG image per page. Each card is
+printed with its number and serial (see card_serials); with --registry, only
+cards that have not been printed or dealt before are used.
+
+    python card_sheets.py --cards 3000 --grid 2x3 --output sheets/
+    python card_sheets.py --cards 3000 --pdf sheets.pdf --seed 42 --registry issued.bloom
+"""
+
+import os
+import io
+import time
+import random
+import argparse
+import multiprocessing
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import main
+import win_patterns
+import card_serials
+
+MM_PER_INCH = 25.4
+PAGE_SIZES = {"a4": (210, 297), "a5": (148, 210), "letter": (215.9, 279.4)}
+
+# Font sizes relative to a card cell; larger than on screen so numbers read well on paper
+NUMBER_FONT = 0.4
+HEADER_FONT = 0.5
+
+
+class SheetLayout:
+    """Page geometry: where each card on a page goes, in pixels at the given DPI."""
+
+    def __init__(self, page_mm: Tuple[float, float], dpi: int, columns: int, rows: int):
+        self.page_mm = page_mm
+        self.dpi = dpi
+        self.size = (round(page_mm[0] / MM_PER_INCH * dpi), round(page_mm[1] / MM_PER_INCH * dpi))
+        self.per_page = columns * rows
+
+        # A card is a header row and five number rows; leave room for its serial below it
+        margin = round(10 / MM_PER_INCH * dpi)
+        slot_width = (self.size[0] - 2 * margin) / columns
+        slot_height = (self.size[1] - 2 * margin) / rows
+        cell = min(slot_width * 0.9 / 5, slot_height * 0.85 / 6)
+        self.cell_size = int(cell)
+        self.card_size = (self.cell_size * 5, self.cell_size * 6)
+        self.cell_rects = [
+            [pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size) for row in range(6)]
+            for col in range(5)
+        ]
+        self.card_origins = []
+        for index in range(self.per_page):
+            row, col = divmod(index, columns)
+            x = margin + slot_width * col + (slot_width - self.card_size[0]) / 2
+            y = margin + slot_height * row + (slot_height - self.card_size[1] - self.cell_size * 0.4) / 2
+            self.card_origins.append((int(x), int(y)))
+        self.font_sizes = (max(8, int(cell * HEADER_FONT)), max(8, int(cell * NUMBER_FONT)))
+
+
+# Per-process state, set up once by _init_worker
+_layout: Optional[SheetLayout] = None
+_colors: Dict = {}
+_fonts: Tuple = ()
+_text_cache: Dict = {}
+
+
+def _init_worker(layout: SheetLayout, colors: Dict) -> None:
+    """Load the fonts and colours once per process."""
+    global _layout, _colors, _fonts
+    _layout = layout
+    _colors = colors
+    font_path = main.custom_font_path()
+    _fonts = tuple(pygame.font.Font(font_path, size) for size in layout.font_sizes)
+    _text_cache.clear()
+
+
+def _text(label: str, color, header: bool) -> pygame.Surface:
+    key = (label, tuple(color), header)
+    surface = _text_cache.get(key)
+    if surface is None:
+        surface = _text_cache[key] = _fonts[not header].render(label, True, color)
+    return surface
+
+
+def render_page(cards: Sequence[Tuple[int, List[int]]]) -> pygame.Surface:
+    """Render one page of (card id, numbers) pairs."""
+    layout = _layout
+    page = pygame.Surface(layout.size)
+    page.fill((255, 255, 255))
+    for (card_id, numbers), origin in zip(cards, layout.card_origins):
+        card = main.BingoCard.from_numbers(numbers)
+        main.paint_card(page.subsurface(pygame.Rect(origin, layout.card_size)), card, layout.cell_rects,
+                        main.Layout.HEADER_COLORS, _colors, _text)
+        label = f"Card {card_id:06d}  {card_serials.format_serial(card_serials.card_serial(numbers))}"
+        serial = _fonts[1].render(label, True, (0, 0, 0))
+        page.blit(serial, serial.get_rect(midtop=(origin[0] + layout.card_size[0] / 2,
+                                                 origin[1] + layout.card_size[1] + layout.cell_size * 0.1)))
+    return page
+
+
+def _render_png(job: Tuple[int, Sequence, str]) -> str:
+    """Render a page and save it as a PNG; returns the path."""
+    index, cards, directory = job
+    path = os.path.join(directory, f"page_{index + 1:04d}.png")
+    pygame.image.save(render_page(cards), path)
+    return path
+
+
+def _render_jpeg(cards: Sequence[Tuple[int, List[int]]]) -> bytes:
+    """Render a page and return it JPEG-encoded, for the PDF."""
+    data = io.BytesIO()
+    pygame.image.save(render_page(cards), data, "page.jpg")
+    return data.getvalue()
+
+
+def deal_cards(count: int, seed: Optional[int] = None, first_id: int = 1,
+               registry: Optional[card_serials.SerialRegistry] = None) -> List[Tuple[int, List[int]]]:
+    """Deal count cards, numbered from first_id, skipping any serial already in the registry."""
+    rng = random.Random(seed)
+    if registry is None:
+        return [(first_id + i, win_patterns.random_card_numbers(rng)) for i in range(count)]
+    return [(first_id + i, card_serials.card_from_serial(card_serials.issue_serial(registry, rng)))
+            for i in range(count)]
+
+
+def pages(cards: Sequence, per_page: int) -> Iterator[Sequence]:
+    for start in range(0, len(cards), per_page):
+        yield cards[start:start + per_page]
+
+
+class PdfWriter:
+    """Writes a PDF of full-page JPEG images one page at a time.
+
+    Each page is an image XObject (the JPEG bytes as they are, /DCTDecode), a
+    content stream that draws it over the whole page, and the page object;
+    the page tree and cross-reference table are written on close().
+    """
+
+    def __init__(self, path: str, page_mm: Tuple[float, float]):
+        self.file = open(path, "wb")
+        self.page_points = tuple(round(mm / MM_PER_INCH * 72, 2) for mm in page_mm)
+        self.offsets: List[int] = []
+        self.page_ids: List[int] = []
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # Objects 1 and 2 (catalog and page tree) are written last
+        self.offsets = [0, 0]
+
+    def _object(self, body: bytes, stream: Optional[bytes] = None) -> int:
+        self.offsets.append(self.file.tell())
+        number = len(self.offsets)
+        self.file.write(b"%d 0 obj\n" % number + body)
+        if stream is not None:
+            self.file.write(b"\nstream\n" + stream + b"\nendstream")
+        self.file.write(b"\nendobj\n")
+        return number
+
+    def add_page(self, jpeg: bytes, size: Tuple[int, int]) -> None:
+        width, height = self.page_points
+        image = self._object(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>" % (size[0], size[1], len(jpeg)), jpeg)
+        content = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (width, height)
+        contents = self._object(b"<< /Length %d >>" % len(content), content)
+        self.page_ids.append(self._object(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> >>" % (width, height, contents, image)))
+
+    def close(self) -> None:
+        self.offsets[0] = self.file.tell()
+        self.file.write(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+        self.offsets[1] = self.file.tell()
+        kids = b" ".join(b"%d 0 R" % page for page in self.page_ids)
+        self.file.write(b"2 0 obj\n<< /Type /Pages /Kids [%s] /Count %d >>\nendobj\n" % (kids, len(self.page_ids)))
+        xref = self.file.tell()
+        self.file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1))
+        for offset in self.offsets:
+            self.file.write(b"%010d 00000 n \n" % offset)
+        self.file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(self.offsets) + 1, xref))
+        self.file.close()
+
+
+def render_sheets(cards: Sequence[Tuple[int, List[int]]], layout: SheetLayout, colors: Dict,
+                  output: Optional[str] = None, pdf: Optional[str] = None, processes: int = 0) -> int:
+    """Render cards onto pages across a process pool, writing pages as they finish. Returns the page count."""
+    count = 0
+    # Spawn rather than fork: a forked copy of an initialised SDL can hang
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes or None, initializer=_init_worker, initargs=(layout, colors)) as pool:
+        if pdf:
+            writer = PdfWriter(pdf, layout.page_mm)
+            try:
+                # imap keeps page order while later pages are still rendering
+                for jpeg in pool.imap(_render_jpeg, pages(cards, layout.per_page)):
+                    writer.add_page(jpeg, layout.size)
+                    count += 1
+            finally:
+                writer.close()
+        else:
+            os.makedirs(output, exist_ok=True)
+            jobs = ((index, page, output) for index, page in enumerate(pages(cards, layout.per_page)))
+            for _ in pool.imap_unordered(_render_png, jobs):
+                count += 1
+        # Let the workers exit on their own: SDL turns the SIGTERM of Pool.terminate() into a quit event
+        pool.close()
+        pool.join()
+    return count
+
+
+def main_cli() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Render printable bingo card sheets")
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--first-id", type=int, default=1, help="number of the first card")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--grid", default="2x3", help="cards per page, COLUMNSxROWS")
+    parser.add_argument("--page", choices=sorted(PAGE_SIZES), default="a4")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--output", default="sheets", help="directory for PNG pages")
+    parser.add_argument("--pdf", default=None, help="write one PDF here instead of PNG pages")
+    parser.add_argument("--processes", type=int, default=0, help="render processes (default: one per CPU)")
+    parser.add_argument("--registry", default=None, help="serial registry of cards already issued")
+    args = parser.parse_args()
+
+    columns, rows = (int(v) for v in args.grid.lower().split("x"))
+    layout = SheetLayout(PAGE_SIZES[args.page], args.dpi, columns, rows)
+    colors = main.load_settings()['colors']
+
+    started = time.perf_counter()
+    registry = card_serials.SerialRegistry(args.registry) if args.registry else None
+    try:
+        cards = deal_cards(args.cards, args.seed, args.first_id, registry)
+    finally:
+        if registry is not None:
+            registry.close()
+    count = render_sheets(cards, layout, colors, args.output, args.pdf, args.processes)
+    elapsed = time.perf_counter() - started
+
+    results = {
+        "cards": len(cards),
+        "pages": count,
+        "page_px": f"{layout.size[0]}x{layout.size[1]}",
+        "output": args.pdf or args.output,
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_s": round(count / elapsed, 1) if elapsed else None,
+    }
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,358 @@
+"""
+Configuration Service
+---------------------
+Loads, validates, saves and watches settings.json.
+
+Saves are debounced: repeated changes within a short window are coalesced
+into one write, done on a background thread as an atomic replace (temporary
+file, fsync, rename) so a crash never leaves a half-written file. The same
+thread polls the file and queues external edits; the game loop picks them up
+with poll() and applies them between frames.
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import metrics
+from win_patterns import PATTERNS as PATTERN_NAMES
+
+
+class Field:
+    """Expected type and limits of a single setting."""
+
+    def __init__(self, types: Tuple[type, ...], minimum: Optional[float] = None,
+                 maximum: Optional[float] = None, choices: Optional[List[Any]] = None,
+                 required: bool = True):
+        self.types = types
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.required = required
+
+    def check(self, value: Any) -> Optional[str]:
+        """Return a description of what is wrong with value, or None."""
+        # bool is an int subclass; only accept it where bool is expected
+        if isinstance(value, bool) and bool not in self.types:
+            return f"expected {self._type_names()}, got bool"
+        if not isinstance(value, self.types):
+            return f"expected {self._type_names()}, got {type(value).__name__}"
+        if self.choices is not None and value not in self.choices:
+            return f"must be one of {', '.join(str(c) for c in self.choices)}"
+        if self.minimum is not None and value is not None and value < self.minimum:
+            return f"must be at least {self.minimum}"
+        if self.maximum is not None and value is not None and value > self.maximum:
+            return f"must be at most {self.maximum}"
+        return None
+
+    def _type_names(self) -> str:
+        return " or ".join("null" if t is type(None) else t.__name__ for t in self.types)
+
+
+NUMBER = (int, float)
+COLOR = Field((list,))
+
+SETTINGS_SCHEMA: Dict[str, Dict[str, Field]] = {
+    "serial": {
+        "port": Field((str,)),
+        "baudrate": Field((int,), 300, 2000000),
+        "timeout": Field(NUMBER, 0),
+        "auto_detect": Field((bool,)),
+        "emulate": Field((bool,), required=False),
+        "protocol": Field((str,), choices=["auto", "framed", "ascii"], required=False),
+        "framed_baudrate": Field((int,), 300, 2000000, required=False),
+        "ack_timeout": Field(NUMBER, 0, required=False),
+        "max_retries": Field((int,), 0, required=False),
+        "negotiate_timeout": Field(NUMBER, 0, required=False),
+        "emulator": Field((dict,), required=False),
+    },
+    "display": {
+        "width": Field((int,), 100, 10000),
+        "height": Field((int,), 100, 10000),
+        "fullscreen": Field((bool,)),
+        "fps": Field((int,), 1, 500),
+        "renderer": Field((str,), choices=["auto", "gpu", "software"], required=False),
+        "animations": Field((bool,), required=False),
+    },
+    "metrics": {
+        "http_port": Field((int,), 0, 65535),
+        "dump_file": Field((str,)),
+    },
+    "debug": {
+        "profile_overlay": Field((bool,)),
+        "profile_trace": Field((bool,)),
+        "profile_csv": Field((str,)),
+    },
+    "stats": {
+        "enabled": Field((bool,)),
+        "database": Field((str,)),
+        "player": Field((str,)),
+        "cabinet": Field((str,)),
+    },
+    "journal": {
+        "enabled": Field((bool,)),
+        "path": Field((str,)),
+        "sync_interval": Field(NUMBER, 0),
+    },
+    "broadcast": {
+        "enabled": Field((bool,)),
+        "host": Field((str,)),
+        "port": Field((int,), 1, 65535),
+        "queue_size": Field((int,), 1),
+    },
+    "control": {
+        "enabled": Field((bool,), required=False),
+        "path": Field((str,), required=False),
+        "max_pending": Field((int,), 1, required=False),
+        "budget_ms": Field(NUMBER, 0, required=False),
+    },
+    "audio": {
+        "enabled": Field((bool,)),
+        "music_volume": Field(NUMBER, 0.0, 1.0),
+        "sfx_volume": Field(NUMBER, 0.0, 1.0),
+    },
+    "game": {
+        "max_balls": Field((int,), 1, 75),
+        "ball_draw_delay": Field((int,), 0),
+        "winning_patterns": Field((list,)),
+        "default_pattern": Field((str,), choices=PATTERN_NAMES),
+        "seed": Field((int, type(None)), required=False),
+        "claim_grace_balls": Field((int,), 0, required=False),
+        "card_registry": Field((str,), required=False),
+    },
+    "colors": {
+        "background": COLOR,
+        "text": COLOR,
+        "card_background": COLOR,
+        "card_highlight": COLOR,
+        "ball_colors": Field((dict,)),
+    },
+}
+
+
+def validate(settings: Any, schema: Dict[str, Dict[str, Field]] = SETTINGS_SCHEMA) -> List[str]:
+    """Check settings against the schema and return a list of problems.
+
+    Sections or keys missing from settings are only reported if required;
+    keys the schema doesn't know about are allowed.
+    """
+    if not isinstance(settings, dict):
+        return ["settings must be a JSON object"]
+
+    errors = []
+    for section_name, fields in schema.items():
+        section = settings.get(section_name)
+        if section is None:
+            if any(field.required for field in fields.values()):
+                errors.append(f"{section_name}: missing section")
+            continue
+        if not isinstance(section, dict):
+            errors.append(f"{section_name}: expected an object")
+            continue
+        for key, field in fields.items():
+            if key not in section:
+                if field.required:
+                    errors.append(f"{section_name}.{key}: missing")
+                continue
+            problem = field.check(section[key])
+            if problem:
+                errors.append(f"{section_name}.{key}: {problem}")
+    return errors
+
+
+def merge_defaults(settings: Dict, defaults: Dict) -> Dict:
+    """Fill sections and keys missing from settings with their defaults."""
+    merged = copy.deepcopy(settings)
+    for section_name, section in defaults.items():
+        if isinstance(section, dict) and isinstance(merged.get(section_name), dict):
+            for key, value in section.items():
+                merged[section_name].setdefault(key, copy.deepcopy(value))
+        else:
+            merged.setdefault(section_name, copy.deepcopy(section))
+    return merged
+
+
+def repair(settings: Dict, defaults: Dict,
+           schema: Dict[str, Dict[str, Field]] = SETTINGS_SCHEMA) -> Tuple[Dict, List[str]]:
+    """Fill in missing settings and replace invalid values with their defaults.
+
+    Returns the repaired settings and the problems that were fixed.
+    """
+    repaired = merge_defaults(settings, defaults) if isinstance(settings, dict) else copy.deepcopy(defaults)
+    errors = validate(repaired, schema)
+    for section_name, fields in schema.items():
+        section = repaired.get(section_name)
+        if not isinstance(section, dict):
+            repaired[section_name] = copy.deepcopy(defaults.get(section_name, {}))
+            continue
+        for key, field in fields.items():
+            if key in section and field.check(section[key]):
+                if key in defaults.get(section_name, {}):
+                    section[key] = copy.deepcopy(defaults[section_name][key])
+                else:
+                    del section[key]
+    return repaired, errors
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class ConfigService:
+    """Debounced atomic persistence and change watching for a JSON settings file."""
+
+    def __init__(self, path: str, defaults: Optional[Dict] = None,
+                 debounce: float = 0.5, poll_interval: float = 1.0):
+        self.path = path
+        self.defaults = defaults              # fills keys an external edit leaves out
+        self.debounce = debounce              # seconds to coalesce saves
+        self.poll_interval = poll_interval    # seconds between file checks
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: Optional[Dict] = None  # settings waiting to be written
+        self._due = 0.0
+        self._reloaded: Optional[Dict] = None  # external edit waiting for poll()
+        self._digest = self._file_digest()
+        self._stat = self._file_stat()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="config-service", daemon=True)
+        self._thread.start()
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _file_digest(self) -> Optional[str]:
+        try:
+            with open(self.path, 'rb') as f:
+                return _digest(f.read())
+        except OSError:
+            return None
+
+    def save(self, settings: Dict) -> None:
+        """Schedule settings to be written; later calls within the debounce window replace it."""
+        snapshot = copy.deepcopy(settings)
+        with self._lock:
+            if self._pending is not None:
+                metrics.inc("config.coalesced_saves")
+            self._pending = snapshot
+            self._due = time.monotonic() + self.debounce
+        self._wake.set()
+
+    def poll(self) -> Optional[Dict]:
+        """Return validated settings from an external edit since the last poll, if any."""
+        with self._lock:
+            reloaded, self._reloaded = self._reloaded, None
+        return reloaded
+
+    def flush(self) -> None:
+        """Write any pending settings now."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._write(pending)
+
+    def close(self) -> None:
+        """Write pending settings and stop the background thread."""
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+
+    def _write(self, settings: Dict) -> None:
+        """Validate and atomically replace the settings file."""
+        errors = validate(settings)
+        if errors:
+            metrics.inc("config.rejected")
+            print("Not saving invalid settings: " + "; ".join(errors))
+            return
+
+        data = json.dumps(settings, indent=4).encode('utf-8')
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        started = time.perf_counter()
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            metrics.inc("config.errors")
+            print(f"Error saving settings: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        # Remember what we wrote so the watcher doesn't treat it as an external edit
+        with self._lock:
+            self._digest = _digest(data)
+            self._stat = self._file_stat()
+        metrics.inc("config.saves")
+        metrics.observe("config.save_ms", (time.perf_counter() - started) * 1000)
+
+    def _check_file(self) -> None:
+        """Queue the file's contents if someone else changed it."""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return
+        self._stat = stat
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        digest = _digest(data)
+        if digest == self._digest:
+            return
+        self._digest = digest
+
+        try:
+            settings = json.loads(data)
+        except json.JSONDecodeError as e:
+            metrics.inc("config.rejected")
+            print(f"Ignoring edited settings.json: {e}")
+            return
+        if self.defaults and isinstance(settings, dict):
+            settings = merge_defaults(settings, self.defaults)
+        errors = validate(settings)
+        if errors:
+            metrics.inc("config.rejected")
+            print("Ignoring edited settings.json: " + "; ".join(errors))
+            return
+
+        with self._lock:
+            # A save still waiting to be written would overwrite the edit; the edit wins
+            self._pending = None
+            self._reloaded = settings
+        metrics.inc("config.reloads")
+
+    def _run(self) -> None:
+        """Background loop: write debounced saves and watch the file."""
+        next_check = time.monotonic() + self.poll_interval
+        while self._running:
+            with self._lock:
+                due = self._due if self._pending is not None else None
+            now = time.monotonic()
+            wait_until = next_check if due is None else min(due, next_check)
+            self._wake.wait(max(0.0, wait_until - now))
+            self._wake.clear()
+
+            now = time.monotonic()
+            pending = None
+            with self._lock:
+                if self._pending is not None and now >= self._due:
+                    pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write(pending)
+            if now >= next_check:
+                self._check_file()
+                next_check = now + self.poll_interval
@@ -0,0 +1,278 @@
+"""
+Control API
+-----------
+Lets scripts drive a cabinet over a local Unix socket, for scripted test
+sessions and for load generation from one controller. Each request is one JSON
+object per line with a command and an optional id; each reply is one line
+with the same id:
+
+    {"id": 1, "cmd": "new_game"}
+    {"id": 1, "ok": true, "result": {"t": "state", "active": true, ...}}
+    {"id": 2, "cmd": "draw_ball"}
+    {"id": 2, "ok": true, "result": {"ball": 57}}
+    {"id": 3, "cmd": "set", "settings": {"game": {"ball_draw_delay": 200}}}
+    {"id": 4, "cmd": "end_game", "won": false}
+    {"id": 5, "cmd": "bogus"}
+    {"id": 5, "ok": false, "error": "unknown command: bogus"}
+
+The server runs its own asyncio loop on a background thread, like the
+broadcast server. It only reads and queues commands. The game loop runs them
+between frames with process(), on the game's own thread, for at most a time
+budget per frame, so a flood of commands delays commands rather than frames.
+Clients may send many requests without waiting for replies. Replies on a
+connection come back in request order. A connection with max_pending
+requests waiting is not read until some are answered.
+
+Run this file to send commands, to one cabinet or to many at once:
+
+    python control.py control.sock state
+    python control.py control.sock set --args '{"settings": {"game": {"ball_draw_delay": 200}}}'
+    python control.py cab1.sock cab2.sock cab3.sock draw_ball --repeat 5000
+"""
+
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from metrics import metrics
+
+
+class ControlError(Exception):
+    """A command that can't be carried out; its message is sent back to the client."""
+
+
+def encode_line(message: Dict) -> bytes:
+    """Encode a request or reply as a compact JSON line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class ControlServer:
+    """Asyncio Unix socket server queuing JSON-lines commands for the game loop."""
+
+    def __init__(self, path: str, max_pending: int = 1024):
+        self.path = path
+        self.max_pending = max_pending      # unanswered requests per connection before reading pauses
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connections = 0
+        self._commands: deque = deque()     # (command, future), appended by the server thread
+        self._server = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="control", daemon=True)
+
+    def start(self) -> bool:
+        """Start serving on a background thread. Returns False if the socket couldn't be opened."""
+        if not hasattr(socket, "AF_UNIX"):
+            print("Could not start control server: Unix sockets are not available")
+            return False
+        self._thread.start()
+        self._ready.wait(5.0)
+        if self._error is not None:
+            print(f"Could not start control server: {self._error}")
+            return False
+        print(f"Accepting control commands on {self.path}")
+        return True
+
+    def stop(self) -> None:
+        """Close every connection, stop the server thread and remove the socket file."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+
+    def process(self, execute: Callable[[Dict], Dict], budget_ms: float = 4.0) -> List[str]:
+        """Run queued commands on the calling thread for up to budget_ms.
+
+        execute(command) returns the result to send back, or raises
+        ControlError. Any other exception is reported to that client as an
+        error too, and every command taken from the queue gets its reply.
+        Returns the names of the commands that succeeded.
+        """
+        if not self._commands:
+            return []
+        deadline = time.perf_counter() + budget_ms / 1000
+        replies = []
+        done = []
+        try:
+            while self._commands:
+                command, future = self._commands.popleft()
+                reply = {"id": command.get("id"), "ok": False, "error": "not run"}
+                replies.append((future, reply))
+                try:
+                    result = execute(command)
+                except ControlError as e:
+                    reply["error"] = str(e)
+                    metrics.inc("control.errors")
+                except Exception as e:
+                    print(f"Error running control command {command.get('cmd')!r}: {e!r}")
+                    reply["error"] = f"internal error: {e!r}"
+                    metrics.inc("control.errors")
+                else:
+                    del reply["error"]
+                    reply.update(ok=True, result=result)
+                    done.append(command.get("cmd"))
+                if time.perf_counter() >= deadline:
+                    break
+        finally:
+            metrics.inc("control.commands", len(replies))
+            # One wake-up of the server loop for the whole batch
+            self.loop.call_soon_threadsafe(self._resolve, replies)
+        return done
+
+    def _resolve(self, replies: List) -> None:
+        for future, reply in replies:
+            if not future.done():       # cancelled if the client went away
+                future.set_result(reply)
+
+    def _run(self) -> None:
+        """Run the event loop on the server thread."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            # A socket file left by a previous run that was killed
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._server = self.loop.run_until_complete(asyncio.start_unix_server(self._handle_client, self.path))
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            self.loop.close()
+            return
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read requests and queue them; _write_replies answers them in the same order."""
+        pending: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_pending)
+        replier = asyncio.ensure_future(self._write_replies(pending, slots, writer))
+        self.connections += 1
+        metrics.inc("control.connections")
+        try:
+            while not replier.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Waits here while max_pending replies are outstanding
+                await slots.acquire()
+                future = self.loop.create_future()
+                command = None
+                try:
+                    command = json.loads(line)
+                    if not isinstance(command, dict) or not isinstance(command.get("cmd"), str):
+                        raise ValueError("expected an object with a \"cmd\"")
+                except ValueError as e:
+                    request_id = command.get("id") if isinstance(command, dict) else None
+                    future.set_result({"id": request_id, "ok": False, "error": f"bad request: {e}"})
+                    metrics.inc("control.errors")
+                else:
+                    self._commands.append((command, future))
+                pending.put_nowait(future)
+        except (ConnectionError, OSError, asyncio.CancelledError, ValueError):
+            # ValueError: a line longer than the stream limit
+            pass
+        finally:
+            pending.put_nowait(None)
+            try:
+                await replier
+            except asyncio.CancelledError:
+                pass
+            self.connections -= 1
+            writer.close()
+
+    async def _write_replies(self, pending: asyncio.Queue, slots: asyncio.Semaphore,
+                             writer: asyncio.StreamWriter) -> None:
+        """Write each reply once it is ready, in request order."""
+        try:
+            while True:
+                future = await pending.get()
+                if future is None:
+                    break
+                writer.write(encode_line(await future))
+                slots.release()
+                if pending.empty():
+                    await writer.drain()
+        except (ConnectionError, OSError):
+            # The client is gone: drop the other replies and let the reader see the closed connection
+            while not pending.empty():
+                future = pending.get_nowait()
+                if future is not None:
+                    future.cancel()
+            writer.close()
+            for _ in range(self.max_pending):
+                slots.release()
+
+
+async def send_commands(path: str, command: Dict, repeat: int = 1) -> List[Dict]:
+    """Send a command repeat times down one connection without waiting between them; return the replies."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        lines = b"".join(encode_line(dict(command, id=i)) for i in range(repeat))
+        writer.write(lines)
+        replies = []
+        for _ in range(repeat):
+            line = await reader.readline()
+            if not line:
+                break
+            replies.append(json.loads(line))
+        return replies
+    finally:
+        writer.close()
+
+
+async def _send_all(paths: List[str], command: Dict, repeat: int) -> List[List[Dict]]:
+    return await asyncio.gather(*(send_commands(path, command, repeat) for path in paths))
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Send commands to cabinets over their control sockets")
+    parser.add_argument("sockets", nargs="+", help="control socket paths")
+    parser.add_argument("cmd", help="command, e.g. state, new_game, draw_ball, end_game, set")
+    parser.add_argument("--args", default="{}", help="JSON object of command arguments")
+    parser.add_argument("--repeat", type=int, default=1, help="send the command this many times to each socket")
+    args = parser.parse_args()
+
+    command = dict(json.loads(args.args), cmd=args.cmd)
+    started = time.perf_counter()
+    replies = asyncio.run(_send_all(args.sockets, command, args.repeat))
+    elapsed = time.perf_counter() - started
+
+    if args.repeat == 1:
+        for path, reply in zip(args.sockets, replies):
+            print(f"{path}: {json.dumps(reply[0]) if reply else 'no reply'}")
+        return
+    count = sum(len(r) for r in replies)
+    results = {
+        "sockets": len(args.sockets),
+        "replies": count,
+        "errors": sum(not reply["ok"] for r in replies for reply in r),
+        "elapsed_s": round(elapsed, 3),
+        "commands_per_s": round(count / elapsed, 1) if elapsed else None,
+    }
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,40 @@ to control physical components through Arduino Mega.
 import os
 import sys
 import json
+import math
 import random
 import time
 import pygame
 import serial
+import csv
 import glob
+import argparse
+import socket
+import sqlite3
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+from metrics import metrics, start_http_server
+import win_patterns
+import card_serials
+from stats_store import StatsStore
+from session_journal import SessionJournal, read_journal
+from config_service import ConfigService, repair, validate
+from control import ControlServer, ControlError
+from broadcast import BroadcastServer, DisplayClient, DisplayState
+from odds import OddsTracker
+from animation import Animator, ease_out_bounce, ease_out_cubic, ease_in_out_sine, frame_index, lerp
+from playfield import PlayfieldParser, POCKET, GATE, RETURN, SWITCH, IDENTIFY
+from serial_protocol import (
+    FRAME_ACK, FRAME_COMMAND, FRAME_HELLO_ACK, FRAME_TEXT, RELIABLE_FRAMES,
+    FrameDecoder, SequenceWindow, decode_hello, encode_frame, encode_hello, frame_to_line
+)
+
+try:
+    from pygame._sdl2 import video as sdl2_video
+except ImportError:
+    sdl2_video = None
 
 # Initialize Pygame
 pygame.init()
@@ -31,13 +58,19 @@ FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")
 # Global variables
 settings = {}
 serial_conn = None
-game_active = False
-balls_drawn = []
-current_ball = None
-player_cards = []
-score = 0
-wins = 0
-games_played = 0
+session = None  # the cabinet's GameSession
+stats_store = None
+session_journal = None
+card_registry = None  # card_serials.SerialRegistry of serials dealt on this cabinet
+config_service = None
+broadcast_server = None
+control_server = None
+pending_settings = None  # settings changed over the control socket, applied on the next frame
+arduino_bridge = None
+playfield = PlayfieldParser()  # parses the bridge stream and tracks pocket occupancy
+sound_manager = None
+ball_images: Dict[int, pygame.Surface] = {}  # number -> image shared by every Ball with that number
+_ball_font = None
 
 
 class Ball:
@@ -71,7 +104,12 @@ class Ball:
         self._create_image()
         
     def _create_image(self):
-        """Create an image representation of the ball."""
+        """Create an image representation of the ball, once per number."""
+        global _ball_font
+        
+        self.image = ball_images.get(self.number)
+        if self.image is not None:
+            return
         try:
             # Create a reliable basic colored circle first
             self.image = pygame.Surface((120, 120), pygame.SRCALPHA)
@@ -94,8 +132,9 @@ class Ball:
             pygame.draw.circle(self.image, (255, 255, 255), (60, 60), 50)
             
             # Add text to the circle - use built-in font which is reliable
-            font = pygame.font.Font(None, 48) 
-            ball_text = font.render(f"{self.letter}{self.number}", True, (0, 0, 0))
+            if _ball_font is None:
+                _ball_font = pygame.font.Font(None, 48)
+            ball_text = _ball_font.render(f"{self.letter}{self.number}", True, (0, 0, 0))
             text_rect = ball_text.get_rect(center=(60, 60))
             self.image.blit(ball_text, text_rect)
             
@@ -133,6 +172,7 @@ class Ball:
             print(f"Error creating ball image: {e}")
             self.image = pygame.Surface((120, 120), pygame.SRCALPHA)
             pygame.draw.circle(self.image, (150, 150, 150), (60, 60), 60)  # Gray circle
+        ball_images[self.number] = self.image
 
 
 class BingoCell:
@@ -159,41 +199,53 @@ class BingoCell:
 class BingoCard:
     """Represents a 5x5 bingo card with cells arranged in a grid."""
     
-    def __init__(self):
+    def __init__(self, serial: Optional[int] = None):
         self.grid = []
+        self._serial = serial
         self._generate_card()
         self.winner = False
         self.winning_pattern = None
+        self._line_masks = {}
         
     def _generate_card(self):
-        """Generate a random 5x5 bingo card following Belgian bingo rules."""
+        """Generate a random 5x5 bingo card following Belgian bingo rules, or the card with the given serial."""
         # Belgian bingo uses 1-75 numbers
-        # B: 1-15, I: 16-30, N: 31-45, G: 46-60, O: 61-75
-        
-        self.grid = []
-        
-        # For each column, select 5 unique random numbers from the column's range
-        for col in range(5):
-            start = col * 15 + 1
-            end = start + 14
-            
-            # For the N column (middle), make the center spot free
-            if col == 2:
-                # Select 4 numbers for the N column (leaving middle space for FREE)
-                column_numbers = random.sample(range(start, end + 1), 5)
-                # Replace the middle spot with 0 to represent FREE
-                column_numbers[2] = 0
-            else:
-                column_numbers = random.sample(range(start, end + 1), 5)
-                
-            # Create the cells for this column
-            column = [BingoCell(num, col) for num in column_numbers]
-            self.grid.append(column)
+        # B: 1-15, I: 16-30, N: 31-45, G: 46-60, O: 61-75, with a FREE middle space
+        if self._serial is not None:
+            numbers = card_serials.card_from_serial(self._serial)
+        else:
+            numbers = win_patterns.random_card_numbers()
+        self.grid = [[BingoCell(numbers[col * 5 + row], col) for row in range(5)] for col in range(5)]
         
         # If the center cell is 0, mark it as already selected (FREE space)
         if self.grid[2][2].number == 0:
             self.grid[2][2].mark()
     
+    @classmethod
+    def from_numbers(cls, numbers: List[int]) -> 'BingoCard':
+        """Rebuild a card from its 25 numbers in [col][row] order."""
+        card = cls.__new__(cls)
+        card.grid = [[BingoCell(numbers[col * 5 + row], col) for row in range(5)] for col in range(5)]
+        card._serial = None
+        card.winner = False
+        card.winning_pattern = None
+        card._line_masks = {}
+        for column in card.grid:
+            for cell in column:
+                if cell.number == 0:
+                    cell.mark()
+        return card
+    
+    @property
+    def serial(self) -> Optional[int]:
+        """The card's serial (see card_serials), or None if it isn't a standard card."""
+        if self._serial is None:
+            try:
+                self._serial = card_serials.card_serial(self)
+            except ValueError:
+                return None
+        return self._serial
+    
     def mark_number(self, number: int) -> bool:
         """Mark a number on the card if it exists. Return True if marked."""
         for col in range(5):
@@ -203,6 +255,14 @@ class BingoCard:
                     return True
         return False
     
+    def line_masks(self, pattern: str) -> List[tuple]:
+        """Return the cached drawn-ball bitmasks of this card's lines for a pattern."""
+        masks = self._line_masks.get(pattern)
+        if masks is None:
+            masks = self._line_masks[pattern] = win_patterns.line_masks(
+                win_patterns.card_numbers(self), pattern)
+        return masks
+    
     def check_for_win(self, pattern: str) -> bool:
         """Check if the card has a winning pattern."""
         if pattern == "horizontal":
@@ -259,6 +319,301 @@ class BingoCard:
         return False
 
 
+class BallDeck:
+    """A deck of ball numbers shuffled once per game, with a bitset of drawn numbers."""
+    
+    def __init__(self, max_number: int = 75, seed: Optional[int] = None):
+        self.max_number = max_number
+        self.random = random.Random()
+        self.shuffle(seed)
+    
+    def shuffle(self, seed: Optional[int] = None) -> None:
+        """Reset the deck to all numbers in a new random order."""
+        if seed is not None:
+            self.random.seed(seed)
+        self.order = list(range(1, self.max_number + 1))
+        self.random.shuffle(self.order)
+        # Where each number sits in self.order, so it can be removed in O(1)
+        self.position = [0] * (self.max_number + 1)
+        for i, number in enumerate(self.order):
+            self.position[number] = i
+        self.drawn_bits = 0                              # bit (n - 1) set once n is called
+        self.draw_order = []                             # numbers in the order they were called
+        self.draw_index = [-1] * (self.max_number + 1)   # ball index at which n was called
+    
+    def set_order(self, planned_order: List[int]) -> None:
+        """Reset the deck to draw the given numbers in order (e.g. when restoring a game)."""
+        self.order = list(planned_order[::-1])
+        for i, number in enumerate(self.order):
+            self.position[number] = i
+        self.drawn_bits = 0
+        self.draw_order = []
+        self.draw_index = [-1] * (self.max_number + 1)
+    
+    def draw(self) -> Optional[int]:
+        """Draw the next ball number, or None when the deck is empty."""
+        if not self.order:
+            return None
+        number = self.order.pop()
+        self._record(number)
+        return number
+    
+    def mark(self, number: int) -> bool:
+        """Record a number drawn elsewhere (e.g. by the hardware). Returns False if already called."""
+        if not 1 <= number <= self.max_number or self.is_drawn(number):
+            return False
+        # Swap the last undrawn number into this one's slot
+        i = self.position[number]
+        last = self.order.pop()
+        if last != number:
+            self.order[i] = last
+            self.position[last] = i
+        self._record(number)
+        return True
+    
+    def _record(self, number: int) -> None:
+        """Update the drawn bitset and draw history."""
+        self.drawn_bits |= 1 << (number - 1)
+        self.draw_index[number] = len(self.draw_order)
+        self.draw_order.append(number)
+    
+    def is_drawn(self, number: int) -> bool:
+        """Check whether a number has been called."""
+        return bool((self.drawn_bits >> (number - 1)) & 1)
+    
+    def planned_order(self) -> List[int]:
+        """Return the full draw order if the rest of the deck is drawn in turn."""
+        return self.draw_order + self.order[::-1]
+    
+    def peek(self) -> Optional[int]:
+        """Return the next number draw() will give without drawing it."""
+        return self.order[-1] if self.order else None
+    
+    @property
+    def remaining(self) -> int:
+        """Number of balls still in the deck."""
+        return len(self.order)
+    
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class GameSession:
+    """The state of one bingo room: its deck, cards, called balls and running totals.
+
+    The cabinet plays a single session; a room server can host many side by side.
+    Every state change is reported to on_event as the same dict the broadcast
+    server sends to remote displays. ball_factory turns a called number into
+    what balls_drawn holds (Ball objects for the screen, plain ints headless).
+    With a registry (card_serials.SerialRegistry) every card dealt has a
+    serial that no session sharing the registry has dealt before.
+    """
+
+    def __init__(self, pattern: str = "any", max_balls: int = 75, seed: Optional[int] = None,
+                 card_count: int = 1, ball_factory=None, on_event=None, registry=None):
+        self.pattern = pattern
+        self.max_balls = max_balls
+        self.seed = seed
+        self.card_count = card_count
+        self.ball_factory = ball_factory or Ball
+        self.on_event = on_event
+        self.registry = registry
+        self.active = False
+        self.ball_deck: Optional[BallDeck] = None
+        self.balls_drawn = []
+        self.current_ball = None
+        self.player_cards: List[BingoCard] = []
+        self._card_index: Optional[Tuple[List[BingoCard], Dict[int, int]]] = None
+        self._odds: Optional[Tuple[tuple, OddsTracker]] = None
+        self.winner = None          # {"card": index, "pattern": name} once a card has won
+        self.game_id = None         # statistics id of the game in progress
+        self.score = 0
+        self.wins = 0
+        self.games_played = 0
+        self.games_started = 0      # games dealt by this session; with a seed, game n is shuffled with seed + n
+
+    def _emit(self, event: Dict) -> None:
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def new_game(self, cards: Optional[List[BingoCard]] = None) -> None:
+        """Shuffle a new deck, deal cards and start the game."""
+        seed = None if self.seed is None else self.seed + self.games_started
+        self.ball_deck = BallDeck(self.max_balls, seed)
+        self.games_started += 1
+        self.balls_drawn = []
+        self.current_ball = None
+        if cards is None:
+            if self.registry is not None:
+                cards = [BingoCard(card_serials.issue_serial(self.registry)) for _ in range(self.card_count)]
+            else:
+                cards = [BingoCard() for _ in range(self.card_count)]
+        self.player_cards = cards
+        self.winner = None
+        self.games_played += 1
+        self.active = True
+        self._emit({"t": "new", "pattern": self.pattern, "games": self.games_played})
+
+    def draw(self) -> Optional[int]:
+        """Draw the next ball from the deck. Returns None if no game is running or the deck is empty."""
+        if not self.active or self.ball_deck is None:
+            return None
+        number = self.ball_deck.draw()
+        if number is not None:
+            self._add_ball(number)
+        return number
+
+    def call(self, number: int) -> bool:
+        """Add a ball drawn elsewhere (e.g. by the hardware). Returns False if it was already called."""
+        if self.ball_deck is not None and not self.ball_deck.mark(number):
+            return False
+        self._add_ball(number)
+        return True
+
+    def _add_ball(self, number: int) -> None:
+        """Show a called ball and mark it on the cards."""
+        self.current_ball = self.ball_factory(number)
+        self.balls_drawn.append(self.current_ball)
+        for card in self.player_cards:
+            card.mark_number(number)
+        self._emit({"t": "ball", "n": number})
+
+    def check_for_bingo(self) -> bool:
+        """Check the cards for the session's pattern and remember the first winner."""
+        for index, card in enumerate(self.player_cards):
+            if card.check_for_win(self.pattern):
+                self.winner = {"card": index, "pattern": card.winning_pattern or self.pattern}
+                self._emit({"t": "win", "card": index, "pattern": self.winner["pattern"]})
+                return True
+        return False
+
+    def end_game(self, is_winner: bool) -> None:
+        """Finish the game and update the totals."""
+        if is_winner:
+            self.score += 100
+            self.wins += 1
+        self.active = False
+        self._emit({"t": "end", "won": is_winner, "score": self.score, "wins": self.wins,
+                    "games": self.games_played})
+
+    def card_index(self, serial: int) -> Optional[int]:
+        """Return the index in player_cards of the card with this serial, or None."""
+        # Rebuilt whenever player_cards is replaced
+        if self._card_index is None or self._card_index[0] is not self.player_cards:
+            self._card_index = (self.player_cards,
+                                {card.serial: index for index, card in enumerate(self.player_cards)})
+        return self._card_index[1].get(serial)
+
+    def win_odds(self, horizon: int = 5) -> List[Dict]:
+        """Exact odds (or bounds) of the session's pattern being won within 1..horizon more balls; see odds.py."""
+        deck = self.ball_deck
+        if deck is None or not self.active:
+            return []
+        # Rebuilt for a new game, new cards or a new pattern; otherwise only the new balls are applied
+        key = (deck, self.player_cards, self.pattern, horizon)
+        if self._odds is None or any(a is not b for a, b in zip(self._odds[0], key)):
+            self._odds = (key, OddsTracker(self.player_cards, self.pattern, horizon, deck.max_number))
+        tracker = self._odds[1]
+        for number in deck.draw_order[tracker.marked:]:
+            tracker.mark(number)
+        return tracker.odds()
+
+    def verify_claim(self, card_id: int, pattern: Optional[str] = None, grace_balls: int = 0) -> Dict:
+        """Verify a bingo claim for a card against the balls drawn so far.
+
+        card_id is the card's index in player_cards (see card_index to find
+        it from the serial printed on the card). The claim is valid if any
+        line of the pattern is fully drawn; the earliest completed line is
+        reported with the ball that completed it. A valid claim is late when
+        more than grace_balls balls were drawn after that ball. A claim for
+        an unknown card or pattern is rejected.
+        """
+        pattern = pattern or self.pattern
+        result = {
+            "card_id": card_id,
+            "pattern": pattern,
+            "valid": False,
+            "line_pattern": None,
+            "line_index": None,
+            "numbers": [],
+            "ball": None,
+            "ball_index": None,
+            "balls_since": None,
+            "late": False,
+        }
+
+        deck = self.ball_deck
+        if (deck is None or not 0 <= card_id < len(self.player_cards)
+                or pattern not in win_patterns.PATTERNS):
+            metrics.inc("claims.rejected")
+            return result
+
+        drawn_bits = deck.drawn_bits
+        draw_index = deck.draw_index
+        best = None
+        for name, line_index, mask, numbers in self.player_cards[card_id].line_masks(pattern):
+            if mask & drawn_bits == mask:
+                completed_at = max(draw_index[number] for number in numbers)
+                if best is None or completed_at < best[0]:
+                    best = (completed_at, name, line_index, numbers)
+
+        if best is None:
+            metrics.inc("claims.rejected")
+            return result
+
+        completed_at, name, line_index, numbers = best
+        balls_since = len(deck.draw_order) - 1 - completed_at
+        result.update({
+            "valid": True,
+            "line_pattern": name,
+            "line_index": line_index,
+            "numbers": numbers,
+            "ball": deck.draw_order[completed_at],
+            "ball_index": completed_at,
+            "balls_since": balls_since,
+            "late": balls_since > grace_balls,
+        })
+        metrics.inc("claims.late" if result["late"] else "claims.verified")
+        return result
+
+    def restore(self, state: Dict) -> bool:
+        """Rebuild the game in progress from a replayed journal."""
+        if not state['cards']:
+            return False
+
+        self.player_cards = [BingoCard.from_numbers(numbers) for numbers in state['cards']]
+        self.ball_deck = BallDeck(self.max_balls)
+        if len(state['draw_order']) == self.ball_deck.max_number:
+            self.ball_deck.set_order(state['draw_order'])
+
+        self.balls_drawn = []
+        for number in state['draws']:
+            if not self.ball_deck.mark(number):
+                continue
+            self.balls_drawn.append(self.ball_factory(number))
+            for card in self.player_cards:
+                card.mark_number(number)
+        self.current_ball = self.balls_drawn[-1] if self.balls_drawn else None
+        self.pattern = state['pattern'] or self.pattern
+        self.game_id = state['game_id']
+        self.winner = None
+        self.active = True
+        return True
+
+    def snapshot(self) -> Dict:
+        """Return the session as a broadcast "state" event."""
+        return {
+            "t": "state",
+            "active": self.active,
+            "pattern": self.pattern,
+            "balls": list(self.ball_deck.draw_order) if self.ball_deck is not None else [],
+            "winner": self.winner,
+            "score": self.score,
+            "wins": self.wins,
+            "games": self.games_played,
+        }
+
+
 class ArduinoBridge:
     """Handles communication with Arduino Uno bridge."""
     
@@ -266,13 +621,51 @@ class ArduinoBridge:
         self.connection = None
         self.connected = False
         self.fallback_mode = False
+        self.emulator = None
+        
+        # Framed protocol state ("ascii", "negotiating" or "framed")
+        self.protocol = "ascii"
+        self._decoder = FrameDecoder()
+        self._rx_seen = SequenceWindow()
+        self._tx_seq = 0
+        self._pending = {}  # seq -> [frame bytes, last sent time, attempts, first sent time]
+        self._negotiate_deadline = 0.0
+        self._hello_sent_at = 0.0
+        self._hello = b""
+        self.ack_timeout = settings['serial'].get('ack_timeout', 0.25)
+        self.max_retries = settings['serial'].get('max_retries', 5)
+        self.framing_errors = 0
+        
+        # Timing for latency metrics (time.perf_counter() values)
+        self.last_rx_time = None
+        self.last_tx_time = None
+        self.last_message_read_at = None
+        self._commands_in_flight = deque(maxlen=64)  # (command, sent at)
+        self._unshown_balls = []  # read times of balls not yet on screen
+        
         self.auto_detect = settings['serial'].get('auto_detect', False)
         
-        if self.auto_detect:
+        if settings['serial'].get('emulate', False) and self.start_emulator():
+            self.auto_detect = False
+            self.connect(self.emulator.port, baudrate, timeout)
+        elif self.auto_detect:
             self.detect_and_connect(baudrate, timeout)
         else:
             self.connect(port, baudrate, timeout)
     
+    def start_emulator(self) -> bool:
+        """Start the local serial emulator in place of the real Uno/Mega."""
+        try:
+            from serial_emulator import emulator_from_settings
+            self.emulator = emulator_from_settings(settings['serial'].get('emulator', {}))
+            port = self.emulator.start()
+            print(f"Started Arduino emulator on {port}")
+            return True
+        except (ImportError, RuntimeError, OSError) as e:
+            print(f"Could not start Arduino emulator: {e}")
+            self.emulator = None
+            return False
+    
     def detect_and_connect(self, baudrate: int = 9600, timeout: float = 0.1) -> bool:
         """Auto-detect and connect to Arduino."""
         print("Auto-detecting Arduino port...")
@@ -331,15 +724,19 @@ class ArduinoBridge:
             self.connection = serial.Serial(port, baudrate, timeout=timeout)
             self.connected = True
             print(f"Connected to Arduino on port {port}")
+            if metrics.counters.get("serial.connects", 0):
+                metrics.inc("serial.reconnects")
+            metrics.inc("serial.connects")
+            # A token cut off by the old connection never completes
+            playfield.reset()
+            if settings['serial'].get('protocol', "auto") != "ascii":
+                self.negotiate_protocol()
             # Save the successful port to settings if we're auto-detecting
             if self.auto_detect and settings['serial']['port'] != port:
                 settings['serial']['port'] = port
-                try:
-                    with open(os.path.join(SCRIPT_DIR, "settings.json"), 'w') as f:
-                        json.dump(settings, f, indent=4)
+                if config_service is not None:
+                    config_service.save(settings)
                     print(f"Saved detected port {port} to settings")
-                except Exception as e:
-                    print(f"Could not save port to settings: {e}")
             return True
         except (serial.SerialException, OSError) as e:
             print(f"Failed to connect to Arduino on port {port}: {e}")
@@ -350,6 +747,112 @@ class ArduinoBridge:
             self.connected = False
             return False
     
+    def negotiate_protocol(self) -> None:
+        """Offer the framed protocol; stay on ASCII lines unless the bridge accepts."""
+        self.protocol = "negotiating"
+        self._decoder = FrameDecoder()
+        # The Uno resets when the port opens, so allow for its boot time
+        self._negotiate_deadline = time.monotonic() + settings['serial'].get('negotiate_timeout', 3.0)
+        try:
+            self._hello = encode_hello(settings['serial'].get('framed_baudrate', 115200))
+        except ValueError as e:
+            print(f"Not offering the framed protocol: {e} - using ASCII lines")
+            self.protocol = "ascii"
+            return
+        self._send_hello()
+    
+    def _send_hello(self) -> None:
+        """Send the HELLO frame (encode_hello refuses rates whose frame a legacy sketch would act on)."""
+        self._hello_sent_at = time.monotonic()
+        try:
+            self._write(self._hello)
+        except Exception as e:
+            print(f"Error sending protocol hello: {e}")
+    
+    def _write_frame(self, frame_type: int, payload: bytes) -> None:
+        """Send a frame, tracking it for retransmission if it needs an ACK."""
+        self._tx_seq = (self._tx_seq + 1) & 0xFF
+        frame = encode_frame(frame_type, self._tx_seq, payload)
+        if frame_type in RELIABLE_FRAMES:
+            now = time.monotonic()
+            self._pending[self._tx_seq] = [frame, now, 1, now]
+        self._write(frame)
+    
+    def _write(self, data: bytes) -> None:
+        """Write bytes to the port, recording when and how much was sent."""
+        self.connection.write(data)
+        self.last_tx_time = time.perf_counter()
+        metrics.inc("serial.writes")
+        metrics.inc("serial.bytes_written", len(data))
+    
+    def _service_protocol(self) -> None:
+        """Retransmit unacknowledged frames and time out negotiation."""
+        now = time.monotonic()
+        if self.protocol == "negotiating":
+            if now >= self._negotiate_deadline:
+                print("Bridge did not answer protocol hello - using ASCII lines")
+                self.protocol = "ascii"
+            elif now - self._hello_sent_at >= self.ack_timeout:
+                self._send_hello()
+            
+        for seq, entry in list(self._pending.items()):
+            frame, sent_at, attempts, _ = entry
+            if now - sent_at < self.ack_timeout:
+                continue
+            if attempts > self.max_retries:
+                print(f"Giving up on frame {seq} after {attempts} attempts")
+                metrics.inc("serial.frames_abandoned")
+                del self._pending[seq]
+                continue
+            metrics.inc("serial.retransmits")
+            self._write(frame)
+            entry[1] = now
+            entry[2] = attempts + 1
+    
+    def _decode_frames(self, data: bytes) -> bytes:
+        """Handle received frames and return the legacy bytes they stand for."""
+        text = []
+        errors_before = self._decoder.crc_errors + self._decoder.version_errors
+        frames = self._decoder.feed(data)
+        decode_errors = self._decoder.crc_errors + self._decoder.version_errors - errors_before
+        if decode_errors:
+            self.framing_errors += decode_errors
+            metrics.inc("serial.framing_errors", decode_errors)
+        for frame_type, seq, payload in frames:
+            if frame_type == FRAME_HELLO_ACK:
+                version, baudrate = decode_hello(payload)
+                if baudrate != self.connection.baudrate:
+                    self.connection.baudrate = baudrate
+                # Confirm at the new rate; the bridge reverts to ASCII without it
+                self._write(encode_frame(FRAME_ACK, 0, b"\x00"))
+                if self.protocol != "framed":
+                    print(f"Using framed serial protocol v{version} at {baudrate} baud")
+                self.protocol = "framed"
+                continue
+            if frame_type == FRAME_ACK:
+                entry = self._pending.pop(payload[0], None) if payload else None
+                if entry:
+                    metrics.observe("serial.ack_round_trip_ms", (time.monotonic() - entry[3]) * 1000)
+                continue
+            if frame_type == FRAME_TEXT and self.protocol == "framed":
+                # Bytes outside a frame are line noise once framing is agreed
+                self.framing_errors += 1
+                metrics.inc("serial.framing_errors")
+                continue
+            if frame_type in RELIABLE_FRAMES:
+                self._write(encode_frame(FRAME_ACK, 0, bytes((seq,))))
+                if self._rx_seen.seen(seq):
+                    metrics.inc("serial.duplicate_frames")
+                    continue
+                
+            line = frame_to_line(frame_type, payload)
+            if line:
+                text.append(line)
+                if self.protocol == "negotiating" and "BINGO_BRIDGE_READY" in line:
+                    # The bridge just rebooted and missed the first hello
+                    self._send_hello()
+        return "".join(text).encode('latin-1')
+    
     def is_connected(self) -> bool:
         """Check if the serial connection is open and working."""
         return self.connected and self.connection and self.connection.is_open
@@ -358,9 +861,16 @@ class ArduinoBridge:
         """Send a command to Arduino."""
         if self.is_connected():
             try:
-                self.connection.write(command.encode('utf-8'))
+                if self.protocol == "framed":
+                    for ch in command.encode('utf-8'):
+                        self._write_frame(FRAME_COMMAND, bytes((ch,)))
+                else:
+                    self._write(command.encode('utf-8'))
+                for ch in command:
+                    self._commands_in_flight.append((ch, self.last_tx_time))
             except Exception as e:
                 print(f"Error sending command to Arduino: {e}")
+                metrics.inc("serial.disconnects")
                 self.connected = False
                 self.fallback_mode = True
         elif self.fallback_mode:
@@ -373,44 +883,67 @@ class ArduinoBridge:
         # Simulate Arduino behavior
         if command == "N":
             # Simulate new game confirmation
-            global game_active
-            game_active = True
+            session.active = True
             print("FALLBACK MODE - Game started")
         elif command == "E":
             # Simulate end game
-            game_active = False
+            session.active = False
             print("FALLBACK MODE - Game ended")
         elif command == "D":
-            # Simulate ball draw
-            global balls_drawn, current_ball
-            if game_active:
-                # Draw a random ball that hasn't been drawn yet
-                available_numbers = list(set(range(1, 76)) - set(b.number for b in balls_drawn))
-                if available_numbers:
-                    new_ball_num = random.choice(available_numbers)
-                    new_ball = Ball(new_ball_num)
-                    current_ball = new_ball
-                    balls_drawn.append(new_ball)
-                    
-                    # Mark the ball on player cards
-                    for card in player_cards:
-                        card.mark_number(new_ball_num)
-                    
-                    # Play sound
-                    sound_manager.play_sound("ball_draw")
-                    print(f"FALLBACK MODE - Drew ball {new_ball.letter}{new_ball.number}")
+            # Simulate ball draw from the session's shuffled deck
+            if session.draw() is not None:
+                # Play sound
+                sound_manager.play_sound("ball_draw")
+                new_ball = session.current_ball
+                print(f"FALLBACK MODE - Drew ball {new_ball.letter}{new_ball.number}")
     
-    def read_message(self) -> str:
-        """Read a message from Arduino if available."""
+    def read_message(self) -> bytes:
+        """Read whatever the Arduino has sent; playfield parses partial lines across reads."""
+        if self.is_connected() and self.protocol != "ascii":
+            try:
+                self._service_protocol()
+            except Exception as e:
+                print(f"Error retransmitting to Arduino: {e}")
         if self.is_connected() and self.connection.in_waiting > 0:
             try:
-                msg = self.connection.read(self.connection.in_waiting).decode('utf-8')
-                return msg
+                data = self.connection.read(self.connection.in_waiting)
+                read_at = time.perf_counter()
+                metrics.inc("serial.reads")
+                metrics.inc("serial.bytes_read", len(data))
+                if self.last_rx_time is not None:
+                    metrics.observe("serial.rx_interarrival_ms", (read_at - self.last_rx_time) * 1000)
+                self.last_rx_time = read_at
+                
+                self.last_message_read_at = read_at
+                if self.protocol == "ascii":
+                    return data
+                return self._decode_frames(data)
             except Exception as e:
                 print(f"Error reading from Arduino: {e}")
+                metrics.inc("serial.disconnects")
                 self.connected = False
                 self.fallback_mode = True
-        return ""
+        return b""
+    
+    def note_response(self, command: str) -> None:
+        """Record the round trip for the oldest outstanding command of this kind."""
+        now = time.perf_counter()
+        for i, (sent, sent_at) in enumerate(self._commands_in_flight):
+            if sent == command:
+                del self._commands_in_flight[i]
+                name = "serial.draw_round_trip_ms" if command == "D" else "serial.command_round_trip_ms"
+                metrics.observe(name, (now - sent_at) * 1000)
+                break
+        if command == "D" and self.last_message_read_at is not None:
+            self._unshown_balls.append(self.last_message_read_at)
+    
+    def note_frame_presented(self) -> None:
+        """Record how long received balls took to reach the screen."""
+        if self._unshown_balls:
+            now = time.perf_counter()
+            for read_at in self._unshown_balls:
+                metrics.observe("serial.ball_to_screen_ms", (now - read_at) * 1000)
+            self._unshown_balls = []
     
     def start_game(self) -> None:
         """Send command to start a new game."""
@@ -428,48 +961,111 @@ class ArduinoBridge:
             except:
                 pass
             self.connected = False
+        if self.emulator:
+            self.emulator.stop()
+            self.emulator = None
 
 
 class SoundManager:
-    """Handles loading and playing sound effects and music."""
+    """Handles loading and playing sound effects and music.
+    
+    Each sound category has its own reserved mixer channels, so the total number
+    of voices is bounded and a burst of one sound can't starve the others.
+    """
+    
+    # Sound effects: file, category and priority (higher wins when channels run out)
+    SOUNDS = {
+        "button_click": {"file": "button_click.wav", "category": "ui", "priority": 0},
+        "ball_draw": {"file": "ball_draw.wav", "category": "draw", "priority": 1},
+        "lose": {"file": "lose.wav", "category": "result", "priority": 2},
+        "win": {"file": "win.wav", "category": "result", "priority": 3, "preempts": ["draw", "ui"]},
+        "bingo": {"file": "bingo.wav", "category": "result", "priority": 3, "preempts": ["draw", "ui"]},
+    }
+    
+    # Reserved channels per category
+    CHANNELS = {"ui": 2, "draw": 2, "result": 1}
+    
+    MUSIC_FILE = "background_music.wav"
     
     def __init__(self):
         self.sounds = {}
         self.music_playing = False
+        self.channels = {}
+        self.playing = {}   # channel -> name of the sound last started on it
+        self._setup_channels()
         self.load_sounds()
+        self.apply_volumes()
+    
+    def _setup_channels(self) -> None:
+        """Reserve a fixed set of mixer channels for each sound category."""
+        voices = sum(self.CHANNELS.values())
+        pygame.mixer.set_num_channels(voices)
+        pygame.mixer.set_reserved(voices)
+        index = 0
+        for category, count in self.CHANNELS.items():
+            self.channels[category] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
     
     def load_sounds(self) -> None:
         """Load all sound effects from the sounds directory."""
-        sound_files = {
-            "ball_draw": "ball_draw.wav",
-            "bingo": "bingo.wav",
-            "button_click": "button_click.wav",
-            "win": "win.wav",
-            "lose": "lose.wav"
-        }
-        
-        for sound_name, file_name in sound_files.items():
+        for sound_name, info in self.SOUNDS.items():
             try:
-                self.sounds[sound_name] = pygame.mixer.Sound(os.path.join(SOUNDS_DIR, file_name))
+                self.sounds[sound_name] = pygame.mixer.Sound(os.path.join(SOUNDS_DIR, info["file"]))
             except pygame.error as e:
-                print(f"Error loading sound '{file_name}': {e}")
+                print(f"Error loading sound '{info['file']}': {e}")
+    
+    def apply_volumes(self) -> None:
+        """Apply the volume settings; call again whenever they change."""
+        for sound in self.sounds.values():
+            sound.set_volume(settings['audio']['sfx_volume'])
+        pygame.mixer.music.set_volume(settings['audio']['music_volume'])
+    
+    def _is_playing(self, channel: pygame.mixer.Channel) -> Optional[str]:
+        """Return the sound playing on a channel, if any."""
+        if channel.get_busy():
+            return self.playing.get(channel)
+        return None
     
     def play_sound(self, sound_name: str) -> None:
-        """Play a sound effect by name."""
-        if settings['audio']['enabled'] and sound_name in self.sounds:
-            self.sounds[sound_name].set_volume(settings['audio']['sfx_volume'])
-            self.sounds[sound_name].play()
+        """Play a sound effect by name on its category's channels."""
+        if not settings['audio']['enabled'] or sound_name not in self.sounds:
+            return
+        info = self.SOUNDS[sound_name]
+        category = info["category"]
+        
+        # A playing sound that preempts this category silences new sounds in it
+        for channels in self.channels.values():
+            for channel in channels:
+                playing = self._is_playing(channel)
+                if playing and category in self.SOUNDS[playing].get("preempts", ()):
+                    metrics.inc("audio.suppressed")
+                    return
+        
+        # Stop lower-priority categories this sound preempts
+        for preempted in info.get("preempts", ()):
+            for channel in self.channels.get(preempted, []):
+                if self._is_playing(channel):
+                    channel.stop()
+                    metrics.inc("audio.preempted")
+        
+        # Use a free channel, otherwise steal the one with the lowest priority sound
+        channels = self.channels[category]
+        channel = next((c for c in channels if not c.get_busy()), None)
+        if channel is None:
+            channel = min(channels, key=lambda c: self.SOUNDS.get(self.playing.get(c), {}).get("priority", 0))
+            if self.SOUNDS.get(self.playing.get(channel), {}).get("priority", 0) > info["priority"]:
+                metrics.inc("audio.dropped")
+                return
+            metrics.inc("audio.preempted")
+        
+        channel.play(self.sounds[sound_name])
+        self.playing[channel] = sound_name
     
     def play_music(self) -> None:
-        """Start playing background music."""
+        """Start streaming the background music."""
         if settings['audio']['enabled'] and not self.music_playing:
             try:
-                # Try WAV first, fall back to MP3 if it fails
-                try:
-                    pygame.mixer.music.load(os.path.join(SOUNDS_DIR, "background_music.wav"))
-                except:
-                    pygame.mixer.music.load(os.path.join(SOUNDS_DIR, "background_music.mp3"))
-                    
+                pygame.mixer.music.load(os.path.join(SOUNDS_DIR, self.MUSIC_FILE))
                 pygame.mixer.music.set_volume(settings['audio']['music_volume'])
                 pygame.mixer.music.play(-1)  # Loop indefinitely
                 self.music_playing = True
@@ -483,69 +1079,496 @@ class SoundManager:
             self.music_playing = False
 
 
-class GameUI:
-    """Handles game rendering and UI interactions."""
+class _ProfilerSection:
+    """Context manager that adds its elapsed time to a profiler section."""
+    
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """Times sections of each frame for the debug overlay and the CSV trace."""
+    
+    # Columns of the CSV trace, in display order
+    SECTIONS = [
+        "events", "control", "serial", "check_for_bingo",
+        "draw_background", "draw_header", "draw_menu", "draw_settings",
+        "draw_current_ball", "draw_recently_drawn_balls", "draw_caller_board",
+        "draw_win_odds", "draw_player_card", "draw_score_panel", "draw_game_status", "flip"
+    ]
+    
+    def __init__(self, target_fps: int, history: int = 240, trace_limit: int = 108000):
+        self.enabled = False      # overlay visible
+        self.tracing = False      # record every frame for the CSV trace
+        self.target_fps = target_fps
+        self.frame_times = deque(maxlen=history)  # milliseconds
+        self.history = deque(maxlen=history)      # section timings of recent frames
+        self.trace = deque(maxlen=trace_limit)
+        self.current = {}
+        self.dropped = 0
+        self.frame_index = 0
+        self.last_frame_end = time.perf_counter()
+        self._sections = {}
+    
+    def section(self, name: str) -> _ProfilerSection:
+        """Return a context manager that times a named part of the frame."""
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _ProfilerSection(self, name)
+        return section
+    
+    def end_frame(self) -> None:
+        """Close the current frame and start timing the next one."""
+        now = time.perf_counter()
+        frame_ms = (now - self.last_frame_end) * 1000
+        self.last_frame_end = now
+        self.frame_index += 1
+        
+        budget_ms = 1000.0 / max(1, self.target_fps)
+        dropped = frame_ms > budget_ms * 1.5
+        if dropped:
+            self.dropped += 1
+        
+        self.frame_times.append(frame_ms)
+        self.history.append(self.current)
+        if self.enabled or self.tracing:
+            row = [self.frame_index, round(frame_ms, 3), int(dropped)]
+            row.extend(round(self.current.get(name, 0.0) * 1000, 3) for name in self.SECTIONS)
+            self.trace.append(row)
+        self.current = {}
+    
+    def average_ms(self, name: str) -> float:
+        """Average time in milliseconds spent in a section over recent frames."""
+        if not self.history:
+            return 0.0
+        return sum(frame.get(name, 0.0) for frame in self.history) * 1000 / len(self.history)
+    
+    def write_csv(self, path: str) -> None:
+        """Write the recorded frames to a CSV file."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms", "dropped"] + [f"{name}_ms" for name in self.SECTIONS])
+            writer.writerows(self.trace)
+
+
+class GameClock:
+    """Game time in milliseconds, optionally running faster than real time.
+    
+    At speed 1 this is pygame's clock. Faster, the frame limit rises with the
+    speed, so a frame still stands for 1/fps of a second of game time while
+    draw delays and animations pass speed times sooner in real time.
+    """
+    
+    def __init__(self, speed: float = 1.0):
+        self.speed = speed
+        self.clock = pygame.time.Clock()
+        self.start_ticks = pygame.time.get_ticks()
+        self.started = time.perf_counter()
+    
+    def ticks(self) -> int:
+        return self.start_ticks + int((time.perf_counter() - self.started) * 1000 * self.speed)
+    
+    def tick(self, fps: int) -> None:
+        self.clock.tick(fps * self.speed)
+
+
+class SoftwareCanvas:
+    """Draws with Surface blits on the display surface (the original render path)."""
+    
+    hardware_scaling = False
     
     def __init__(self, screen: pygame.Surface):
         self.screen = screen
-        self.width = screen.get_width()
-        self.height = screen.get_height()
+    
+    def get_size(self) -> Tuple[int, int]:
+        return self.screen.get_size()
+    
+    def resized(self) -> None:
+        """Pick up the display surface after the window was resized."""
+        self.screen = pygame.display.get_surface()
+    
+    def blit(self, surface: pygame.Surface, dest) -> None:
+        self.screen.blit(surface, dest)
+    
+    def blit_scaled(self, surface: pygame.Surface, rect) -> None:
+        """Draw a surface stretched to rect (scaled on the CPU; callers cache scaled copies instead)."""
+        rect = pygame.Rect(rect)
+        self.screen.blit(pygame.transform.scale(surface, rect.size), rect)
+    
+    def fill_rect(self, color, rect) -> None:
+        pygame.draw.rect(self.screen, color, rect)
+    
+    def frame_rect(self, color, rect, width: int = 1) -> None:
+        pygame.draw.rect(self.screen, color, rect, width)
+    
+    def update(self, surface: pygame.Surface, rect) -> None:
+        """Note that part of a surface changed after it was drawn (nothing to do here)."""
+    
+    def present(self) -> None:
+        pygame.display.flip()
+    
+    def close(self) -> None:
+        pass
+
+
+class TextureCanvas:
+    """Draws through an SDL2 renderer on the GPU.
+    
+    Every surface drawn is uploaded once as a texture and reused for as long
+    as the surface is; images are scaled while drawing, and the whole frame is
+    rendered at a fixed logical size and scaled to the window by the GPU, so
+    resizing the window needs no relayout.
+    """
+    
+    hardware_scaling = True
+    TEXTURE_TTL = 30            # frames an unused texture is kept
+    
+    def __init__(self, size: Tuple[int, int], fullscreen: bool = False,
+                 title: str = "Belgian Bingo", accelerated: bool = True):
+        if sdl2_video is None:
+            raise pygame.error("pygame._sdl2 is not available")
+        self.window = sdl2_video.Window(title, size=size, resizable=True, fullscreen_desktop=fullscreen)
+        try:
+            # accelerated=-1 accepts SDL's own software renderer too
+            self.renderer = sdl2_video.Renderer(self.window, accelerated=1 if accelerated else -1, vsync=False)
+        except (pygame.error, RuntimeError):
+            self.window.destroy()
+            raise
+        self.renderer.logical_size = size
+        self.size = tuple(size)
+        self._textures = {}     # id(surface) -> [surface, texture, last frame used]
+        self._frame = 0
+    
+    def get_size(self) -> Tuple[int, int]:
+        return self.size
+    
+    def resized(self) -> None:
+        pass
+    
+    def texture(self, surface: pygame.Surface):
+        """Return the texture for a surface, uploading it the first time it is drawn."""
+        entry = self._textures.get(id(surface))
+        if entry is None or entry[0] is not surface:
+            entry = self._textures[id(surface)] = [surface, sdl2_video.Texture.from_surface(self.renderer, surface), 0]
+            metrics.inc("render.texture_uploads")
+        entry[2] = self._frame
+        return entry[1]
+    
+    def blit(self, surface: pygame.Surface, dest) -> None:
+        if len(dest) == 2:
+            dest = (dest[0], dest[1], surface.get_width(), surface.get_height())
+        self.texture(surface).draw(dstrect=dest)
+    
+    def blit_scaled(self, surface: pygame.Surface, rect) -> None:
+        self.texture(surface).draw(dstrect=rect)
+    
+    def fill_rect(self, color, rect) -> None:
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.fill_rect(pygame.Rect(rect))
+    
+    def frame_rect(self, color, rect, width: int = 1) -> None:
+        # pygame.draw.rect draws a border of width inside the rect; do the same with nested outlines
+        self.renderer.draw_color = pygame.Color(color)
+        rect = pygame.Rect(rect)
+        for _ in range(width):
+            self.renderer.draw_rect(rect)
+            rect = rect.inflate(-2, -2)
+    
+    def update(self, surface: pygame.Surface, rect) -> None:
+        """Upload just the changed part of a surface whose texture is cached."""
+        entry = self._textures.get(id(surface))
+        if entry is not None and entry[0] is surface:
+            rect = pygame.Rect(rect)
+            entry[1].update(surface.subsurface(rect), rect)
+            metrics.inc("render.texture_updates")
+    
+    def present(self) -> None:
+        self.renderer.present()
+        self._frame += 1
+        # Forget textures of surfaces that stopped being drawn (old text, old balls)
+        if self._frame % self.TEXTURE_TTL == 0:
+            expired = self._frame - self.TEXTURE_TTL
+            for key in [key for key, entry in self._textures.items() if entry[2] < expired]:
+                del self._textures[key]
+        self.renderer.draw_color = pygame.Color(0, 0, 0)
+        self.renderer.clear()
+    
+    def close(self) -> None:
+        self._textures = {}
+        self.window.destroy()
+
+
+class Layout:
+    """Screen geometry for one resolution, computed once and only read while drawing."""
+    
+    RECENT_BALLS = 10           # balls shown in the recently drawn strip
+    
+    # Column header colours of the card (B, I, N, G, O)
+    LETTER_COLORS = [(65, 105, 225), (34, 139, 34), (255, 0, 0), (255, 215, 0), (138, 43, 226)]
+    HEADER_COLORS = [[max(0, min(255, c * 0.8)) for c in color] for color in LETTER_COLORS]
+    
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.center_x = width // 2
+        
+        # Scale factors for responsive design
+        self.scale_x = width / 1080  # Base width reference
+        self.scale_y = height / 1920  # Base height reference
+        self.scale = scale = min(self.scale_x, self.scale_y)  # Use the smaller scale to maintain proportions
         
-        # Calculate scale factors for responsive design
-        self.scale_x = self.width / 1080  # Base width reference
-        self.scale_y = self.height / 1920  # Base height reference
-        self.scale = min(self.scale_x, self.scale_y)  # Use the smaller scale to maintain proportions
+        # Font sizes (large, medium, small)
+        self.font_sizes = (max(24, int(48 * scale)), max(18, int(36 * scale)), max(12, int(24 * scale)))
         
-        # Dynamically size fonts based on screen dimensions
-        base_large_size = int(48 * self.scale)
-        base_medium_size = int(36 * self.scale)
-        base_small_size = int(24 * self.scale)
+        # Header: logo or title, and the hardware status in the top right
+        self.header_y = int(height * 0.01)  # 1% from the top
+        self.logo_size = (int(width * 0.5), int(int(width * 0.5) / 4))
+        self.status_padding = int(15 * scale)
         
-        # Use pygame's default font which is guaranteed to work
-        self.font_large = pygame.font.Font(None, max(24, base_large_size))
-        self.font_medium = pygame.font.Font(None, max(18, base_medium_size))
-        self.font_small = pygame.font.Font(None, max(12, base_small_size))
+        # Current ball
+        self.ball_size = int(120 * scale)
+        ball_y = int(height * 0.12)  # 12% from the top
+        self.ball_center = (self.center_x, ball_y)
+        self.ball_text_top = ball_y + self.ball_size // 2 + int(10 * scale)
+        
+        # Recently drawn strip: ball positions for every strip length
+        self.recent_size = int(50 * scale)
+        spacing = int(10 * scale)
+        recent_y = int(height * 0.24)  # 24% from the top
+        self.recent_title_top = recent_y - int(40 * scale)
+        self.recent_positions = []
+        for count in range(self.RECENT_BALLS + 1):
+            total_width = count * (self.recent_size + spacing) - spacing
+            start_x = (width - total_width) // 2
+            self.recent_positions.append(
+                [(start_x + i * (self.recent_size + spacing), recent_y) for i in range(count)]
+            )
+        
+        # Player card: square, at most 80% of the width, 35% from the top
+        card_width = min(width * 0.8, height * 0.5)
+        card_x = (width - card_width) // 2
+        card_y = int(height * 0.35)
+        self.card_rect = pygame.Rect(card_x, card_y, card_width, card_width)
+        cell_size = card_width / 5
+        self.cell_rects = [
+            [pygame.Rect(card_x + col * cell_size, card_y + row * cell_size, cell_size, cell_size) for row in range(5)]
+            for col in range(5)
+        ]
+        self.header_colors = self.HEADER_COLORS
+        
+        # Caller board in the card's place: a letter and 15 numbers per row, relative to board_rect
+        board_width = width * 0.9
+        tile = board_width / 16
+        self.board_rect = pygame.Rect((width - board_width) // 2, card_y, board_width, tile * 5)
+        self.board_letter_rects = [pygame.Rect(0, row * tile, tile, tile) for row in range(5)]
+        self.board_tile_rects = [None] + [
+            pygame.Rect((1 + (number - 1) % 15) * tile, (number - 1) // 15 * tile, tile, tile)
+            for number in range(1, 76)
+        ]
+        self.odds_center = (width // 2, self.board_rect.bottom + int(30 * scale))
+        
+        # Score panel with three centred sections
+        panel_width = width * 0.9
+        panel_height = int(height * 0.15)
+        panel_x = (width - panel_width) // 2
+        panel_y = height - panel_height - int(20 * scale)
+        self.panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
+        self.panel_centers = [
+            (panel_x + panel_width / 3 * (i + 0.5), panel_y + panel_height / 2) for i in range(3)
+        ]
+        
+        # Status banner and menus
+        self.status_center = (self.center_x, int(height * 0.3))
+        self.box_padding = (int(20 * scale), int(10 * scale))
+        self.menu_option_height = int(60 * scale)
+        self._menu_tops = {}
+        self.overlay_padding = int(10 * scale)
+        self.overlay_width = int(width * 0.45)
+        self.overlay_graph_height = int(60 * scale)
+        
+        # Settings screen
+        self.settings_title_top = int(height * 0.05)
+        self.settings_subtitle_top = int(height * 0.15)
+        self.settings_option_height = int(50 * scale)
+        self.settings_menu_y = int(height * 0.25)
+        self.slider_size = (200 * scale, 10 * scale)
+        self.selection_box = (self.center_x - 250 * scale, -15 * scale, 500 * scale, 30 * scale)
+        self.category_option_height = int(70 * scale)
+        self.category_menu_y = int(height * 0.3)
+        self.category_padding = (int(40 * scale), int(20 * scale))
+        self.help_bottoms = (height - 30, height - 60)
+    
+    def menu_top(self, count: int) -> int:
+        """Return the y of the first of count vertically centred menu options."""
+        top = self._menu_tops.get(count)
+        if top is None:
+            top = self._menu_tops[count] = (self.height - count * self.menu_option_height) // 2
+        return top
+
+
+def custom_font_path() -> Optional[str]:
+    """Return the game's font file if it loads, else None for pygame's default font."""
+    try:
+        font_path = os.path.join(FONTS_DIR, "RobotoCondensed-Regular.ttf")
+        if os.path.exists(font_path):
+            # Test with small text first to avoid crashes
+            test_font = pygame.font.Font(font_path, 12)
+            test_font.render("Test", True, (255, 255, 255))
+            print("Custom fonts loaded successfully")
+            return font_path
+    except Exception as e:
+        print(f"Using system fonts - custom font error: {e}")
+    return None
+
 
-        # Load background (single color fallback if image loading fails)
-        self.background = pygame.Surface((self.width, self.height))
-        self.background.fill((20, 20, 40))  # Dark blue background
+def paint_card(surface: pygame.Surface, card: BingoCard, cell_rects: List[List[pygame.Rect]],
+               header_colors: List, colors: Dict, text: Callable[[str, Tuple, bool], pygame.Surface]) -> None:
+    """Draw a card filling surface: its frame, the B/I/N/G/O headers and the numbers.
+    
+    cell_rects[col] holds the header cell followed by one cell per row to show.
+    text(label, color, header) renders a label in the header or the number font.
+    The game screen and the printable card sheets both draw cards with this.
+    """
+    text_color = colors['text']
+    background_color = colors['card_background']
+    
+    # Draw card background
+    pygame.draw.rect(surface, background_color, surface.get_rect())
+    pygame.draw.rect(surface, text_color, surface.get_rect(), 3)
+    
+    # Draw BINGO letters at the top
+    letters = ['B', 'I', 'N', 'G', 'O']
+    
+    # Draw the cell grid
+    for col in range(5):
+        column_rects = cell_rects[col]
+        
+        # Draw column header with a stronger colored background
+        cell_rect = column_rects[0]
+        pygame.draw.rect(surface, header_colors[col], cell_rect)
+        letter_surf = text(letters[col], (255, 255, 255), True)
+        surface.blit(letter_surf, letter_surf.get_rect(center=cell_rect.center))
+        pygame.draw.rect(surface, text_color, cell_rect, 1)
+        
+        for row in range(1, len(column_rects)):
+            cell_rect = column_rects[row]
+            
+            # Offset row due to headers
+            cell = card.grid[col][row - 1]
+            
+            # Draw highlighted background if marked
+            if cell.is_marked():
+                pygame.draw.rect(surface, colors['ball_colors'][cell.letter], cell_rect)
+            else:
+                pygame.draw.rect(surface, background_color, cell_rect)
+            pygame.draw.rect(surface, text_color, cell_rect, 1)
+            
+            # Draw number (or FREE for the center space)
+            label = text(str(cell.number) if cell.number else "FREE", text_color, False)
+            surface.blit(label, label.get_rect(center=cell_rect.center))
+
+
+class GameUI:
+    """Handles game rendering and UI interactions."""
+    
+    # Animations (seconds) and their pre-rendered frames
+    DROP_TIME = 0.6             # a new current ball falls into place
+    ROLL_TIME = 0.5             # balls roll along the recently drawn strip
+    FLASH_TIME = 0.8            # a newly marked card cell flashes
+    ROTATION_FRAMES = 24
+    SCALE_FRAMES = 8
+    FLASH_FRAMES = 8
+    SPRITE_CACHE_SIZE = 32      # balls whose frames are kept
+    
+    BOARD_BACKDROP = (20, 20, 40)
+    
+    def __init__(self, canvas: Union[SoftwareCanvas, TextureCanvas]):
+        self.show_hardware_status = True
+        
+        # Animation state, advanced by the clock rather than by frames
+        self.animator = Animator()
+        self.frame_time = time.perf_counter()
+        self._shown_ball = None
+        self._strip = []
+        self._strip_from = {}
+        self._strip_serial = 0
         
-        # Try to load image background
+        # Drawn balls followed incrementally: a ring buffer for the recent strip
+        # and the numbers the caller board has yet to repaint
+        self._recent = deque(maxlen=Layout.RECENT_BALLS)
+        self._called_count = 0
+        self._last_called = None
+        self._called_serial = 0
+        self._called = bytearray(76)
+        self._board_pending = []
+        self._card_marks = {}
+        
+        # Source images, scaled to the window by relayout()
+        self.background_image = None
+        self.logo_image = None
         try:
             bg_path = os.path.join(IMAGES_DIR, "background.jpg")
             if os.path.exists(bg_path):
-                bg = pygame.image.load(bg_path)
-                self.background = pygame.transform.scale(bg, (self.width, self.height))
+                self.background_image = pygame.image.load(bg_path)
         except Exception as e:
             print(f"Error loading background: {e}")
-            
-        # Try to load logo
-        self.logo = None
         try:
             logo_path = os.path.join(IMAGES_DIR, "logo.png")
             if os.path.exists(logo_path):
-                logo = pygame.image.load(logo_path)
-                logo_width = int(self.width * 0.5)
-                logo_height = int(logo_width / 4)  # Maintain aspect ratio
-                self.logo = pygame.transform.scale(logo, (logo_width, logo_height))
+                self.logo_image = pygame.image.load(logo_path)
         except Exception as e:
             print(f"Error loading logo: {e}")
-            
-        # Try to load custom fonts only after everything else is set up
-        try:
-            font_path = os.path.join(FONTS_DIR, "RobotoCondensed-Regular.ttf")
-            if os.path.exists(font_path):
-                # Test with small text first to avoid crashes
-                test_font = pygame.font.Font(font_path, 12)
-                test = test_font.render("Test", True, (255, 255, 255))
-                
-                # If we reach here, the font works - load the real sizes with proper scaling
-                self.font_large = pygame.font.Font(font_path, max(24, base_large_size))
-                self.font_medium = pygame.font.Font(font_path, max(18, base_medium_size))
-                self.font_small = pygame.font.Font(font_path, max(12, base_small_size))
-                print("Custom fonts loaded successfully")
-        except Exception as e:
-            print(f"Using system fonts - custom font error: {e}")
+        
+        # Try the custom font once; relayout() sizes it
+        self.font_path = custom_font_path()
+        
+        self.relayout(canvas)
+    
+    def relayout(self, canvas: Union[SoftwareCanvas, TextureCanvas]) -> None:
+        """Compute the layout for the canvas size and rescale fonts and images to it."""
+        self.canvas = canvas
+        self.layout = layout = Layout(*canvas.get_size())
+        self.width = layout.width
+        self.height = layout.height
+        self.scale_x = layout.scale_x
+        self.scale_y = layout.scale_y
+        self.scale = layout.scale
+        
+        large, medium, small = layout.font_sizes
+        self.font_large = pygame.font.Font(self.font_path, large)
+        self.font_medium = pygame.font.Font(self.font_path, medium)
+        self.font_small = pygame.font.Font(self.font_path, small)
+        
+        # Background (single color fallback if there is no image); the GPU scales images itself
+        if self.background_image is not None and canvas.hardware_scaling:
+            self.background = self.background_image
+        elif self.background_image is not None:
+            self.background = pygame.transform.scale(self.background_image, (self.width, self.height))
+        else:
+            self.background = pygame.Surface((self.width, self.height))
+            self.background.fill((20, 20, 40))  # Dark blue background
+        self.logo = None
+        if self.logo_image:
+            self.logo = self.logo_image if canvas.hardware_scaling else pygame.transform.scale(self.logo_image, layout.logo_size)
+        
+        # Surfaces sized for the old layout
+        self._ball_images = {}
+        self._text_cache = {}
+        self._card_layers = {}
+        self._sprites = OrderedDict()
+        self._flash_frames = {}
+        self._board = None
     
     def render_text(self, font, text, color):
         """Safely render text with fallbacks in case of font issues."""
@@ -563,224 +1586,354 @@ class GameUI:
                 surf.fill((0, 0, 0, 0))
                 return surf
     
+    def static_text(self, font, text, color):
+        """Render text that rarely changes (labels, card numbers) once per layout."""
+        key = (id(font), text, tuple(color))
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = self._text_cache[key] = self.render_text(font, text, color)
+        return surface
+    
+    def ball_image(self, ball: Ball, size: int) -> pygame.Surface:
+        """Return a ball's image scaled to size, scaling each ball once per layout."""
+        key = (ball.number, size)
+        image = self._ball_images.get(key)
+        if image is None:
+            image = self._ball_images[key] = pygame.transform.scale(ball.image, (size, size))
+        return image
+    
+    def draw_ball(self, ball: Ball, rect: pygame.Rect) -> None:
+        """Draw a ball's image into rect."""
+        if self.canvas.hardware_scaling:
+            self.canvas.blit_scaled(ball.image, rect)
+        else:
+            self.canvas.blit(self.ball_image(ball, rect.width), rect)
+    
+    def begin_frame(self, now: Optional[float] = None) -> None:
+        """Set the time the frame's animations are drawn at."""
+        self.frame_time = time.perf_counter() if now is None else now
+    
+    def animating(self) -> bool:
+        return settings['display'].get('animations', True)
+    
+    def ball_sprites(self, ball: Ball, size: int) -> Dict[str, List[pygame.Surface]]:
+        """Return a ball's rotation and scale frames at size, rendering them once per ball."""
+        key = (ball.number, size)
+        sprites = self._sprites.get(key)
+        if sprites is not None:
+            self._sprites.move_to_end(key)
+            return sprites
+        
+        base = self.ball_image(ball, size)
+        sprites = self._sprites[key] = {
+            # Clockwise turns; frame 0 is the ball at rest
+            "rotation": [base] + [pygame.transform.rotate(base, -360 * i / self.ROTATION_FRAMES)
+                                  for i in range(1, self.ROTATION_FRAMES)],
+            "scale": [pygame.transform.scale(ball.image, (max(1, int(size * (i + 1) / self.SCALE_FRAMES)),) * 2)
+                      for i in range(self.SCALE_FRAMES - 1)] + [base],
+        }
+        metrics.inc("render.sprite_renders")
+        if len(self._sprites) > self.SPRITE_CACHE_SIZE:
+            self._sprites.popitem(last=False)
+        return sprites
+    
+    def flash_frames(self, size: Tuple[int, int]) -> List[pygame.Surface]:
+        """Return the fading highlight frames for a card cell of size."""
+        frames = self._flash_frames.get(size)
+        if frames is None:
+            frames = self._flash_frames[size] = []
+            for i in range(self.FLASH_FRAMES):
+                frame = pygame.Surface(size, pygame.SRCALPHA)
+                frame.fill((255, 255, 255, int(200 * (1 - i / self.FLASH_FRAMES))))
+                frames.append(frame)
+        return frames
+    
+    def draw_sprite(self, sprite: pygame.Surface, center: Tuple[float, float]) -> None:
+        self.canvas.blit(sprite, sprite.get_rect(center=(round(center[0]), round(center[1]))))
+    
     def draw_background(self):
         """Draw the background on the screen."""
-        self.screen.blit(self.background, (0, 0))
+        if self.canvas.hardware_scaling:
+            self.canvas.blit_scaled(self.background, (0, 0, self.width, self.height))
+        else:
+            self.canvas.blit(self.background, (0, 0))
     
     def draw_header(self):
         """Draw the game header including logo and title."""
-        # Calculate responsive header position
-        header_y = int(self.height * 0.01)  # 1% from the top
+        layout = self.layout
         
         # Draw the logo if available
         if self.logo:
-            logo_rect = self.logo.get_rect(midtop=(self.width // 2, header_y))
-            self.screen.blit(self.logo, logo_rect)
+            logo_rect = pygame.Rect((0, 0), layout.logo_size)
+            logo_rect.midtop = (layout.center_x, layout.header_y)
+            if self.canvas.hardware_scaling:
+                self.canvas.blit_scaled(self.logo, logo_rect)
+            else:
+                self.canvas.blit(self.logo, logo_rect)
         else:
             # Draw text title if no logo
-            title = self.render_text(self.font_large, "BELGIAN BINGO", settings['colors']['text'])
-            title_rect = title.get_rect(midtop=(self.width // 2, header_y))
-            self.screen.blit(title, title_rect)
+            title = self.static_text(self.font_large, "BELGIAN BINGO", settings['colors']['text'])
+            title_rect = title.get_rect(midtop=(layout.center_x, layout.header_y))
+            self.canvas.blit(title, title_rect)
             
         # Add hardware connection status with safe rendering
-        status_padding = int(15 * self.scale)  # Scale padding with screen size
+        if not self.show_hardware_status:
+            return
         if arduino_bridge and arduino_bridge.fallback_mode:
-            status_text = self.render_text(self.font_small, "SIMULATION MODE (No Hardware)", (255, 100, 100))
-            status_rect = status_text.get_rect(topright=(self.width - status_padding, status_padding))
-            self.screen.blit(status_text, status_rect)
+            status_text = self.static_text(self.font_small, "SIMULATION MODE (No Hardware)", (255, 100, 100))
         elif arduino_bridge and arduino_bridge.is_connected():
-            status_text = self.render_text(self.font_small, "Hardware Connected", (100, 255, 100))
-            status_rect = status_text.get_rect(topright=(self.width - status_padding, status_padding))
-            self.screen.blit(status_text, status_rect)
+            status_text = self.static_text(self.font_small, "Hardware Connected", (100, 255, 100))
         else:
-            status_text = self.render_text(self.font_small, "Hardware Disconnected", (255, 100, 100))
-            status_rect = status_text.get_rect(topright=(self.width - status_padding, status_padding))
-            self.screen.blit(status_text, status_rect)
+            status_text = self.static_text(self.font_small, "Hardware Disconnected", (255, 100, 100))
+        status_rect = status_text.get_rect(topright=(layout.width - layout.status_padding, layout.status_padding))
+        self.canvas.blit(status_text, status_rect)
     
     def draw_current_ball(self, ball: Ball) -> None:
         """Draw the current drawn ball."""
         if ball:
-            # Calculate responsive positioning
-            ball_size = int(120 * self.scale)  # Scale ball size
-            ball_y = int(self.height * 0.12)  # 12% from the top
+            layout = self.layout
+            if ball is not self._shown_ball:
+                if self._shown_ball is not None and self.animating():
+                    self.animator.start("drop", self.frame_time, self.DROP_TIME)
+                self._shown_ball = ball
             
-            # Scale the ball image to the appropriate size
-            scaled_ball = pygame.transform.scale(ball.image, (ball_size, ball_size))
-            ball_rect = scaled_ball.get_rect(center=(self.width // 2, ball_y))
-            self.screen.blit(scaled_ball, ball_rect)
+            progress = self.animator.progress("drop", self.frame_time)
+            if progress is None:
+                ball_rect = pygame.Rect(0, 0, layout.ball_size, layout.ball_size)
+                ball_rect.center = layout.ball_center
+                self.draw_ball(ball, ball_rect)
+            else:
+                # Fall from above the screen, growing to full size, and bounce into place
+                x, y = layout.ball_center
+                start_y = -layout.ball_size
+                scale_frames = self.ball_sprites(ball, layout.ball_size)["scale"]
+                sprite = scale_frames[frame_index(ease_out_cubic(progress), len(scale_frames))]
+                self.draw_sprite(sprite, (x, lerp(start_y, y, ease_out_bounce(progress))))
             
             # Draw ball info text
-            ball_text = self.render_text(self.font_medium, f"Current Ball: {ball.letter}{ball.number}", settings['colors']['text'])
-            text_rect = ball_text.get_rect(midtop=(self.width // 2, ball_y + ball_size // 2 + int(10 * self.scale)))
-            self.screen.blit(ball_text, text_rect)
+            ball_text = self.static_text(self.font_medium, f"Current Ball: {ball.letter}{ball.number}", settings['colors']['text'])
+            text_rect = ball_text.get_rect(midtop=(layout.center_x, layout.ball_text_top))
+            self.canvas.blit(ball_text, text_rect)
     
     def draw_recently_drawn_balls(self, balls: List[Ball]) -> None:
         """Draw the list of recently drawn balls."""
         if not balls:
             return
+        layout = self.layout
             
         # Show the last 10 balls (or fewer if less have been drawn)
-        recent_balls = balls[-10:] if len(balls) > 10 else balls
-        
-        # Scale ball size based on screen dimensions
-        ball_size = int(50 * self.scale)
-        spacing = int(10 * self.scale)
-        
-        # Calculate responsive positioning
-        total_width = len(recent_balls) * (ball_size + spacing) - spacing
-        start_x = (self.width - total_width) // 2
-        ball_y = int(self.height * 0.24)  # 24% from the top
+        self.track_draws(balls)
+        recent_balls = self._recent
         
         # Draw title
-        title = self.render_text(self.font_small, "Recently Drawn:", settings['colors']['text'])
-        title_rect = title.get_rect(midtop=(self.width // 2, ball_y - int(40 * self.scale)))
-        self.screen.blit(title, title_rect)
+        title = self.static_text(self.font_small, "Recently Drawn:", settings['colors']['text'])
+        title_rect = title.get_rect(midtop=(layout.center_x, layout.recent_title_top))
+        self.canvas.blit(title, title_rect)
         
         # Draw each recent ball
-        for i, ball in enumerate(recent_balls):
-            # Create a scaled-down version of the ball image
-            scaled_img = pygame.transform.scale(ball.image, (ball_size, ball_size))
-            x_pos = start_x + i * (ball_size + spacing)
-            self.screen.blit(scaled_img, (x_pos, ball_y))
+        size = layout.recent_size
+        positions = layout.recent_positions[len(recent_balls)]
+        if self._strip_serial != self._called_serial:
+            self._strip_serial = self._called_serial
+            self._start_roll(list(recent_balls), positions)
+        
+        progress = self.animator.progress("roll", self.frame_time)
+        if progress is None:
+            for ball, position in zip(recent_balls, positions):
+                self.draw_ball(ball, pygame.Rect(position, (size, size)))
+            return
+        
+        # Roll each ball from where it was to its new slot, turning as it goes
+        eased = ease_in_out_sine(progress)
+        radius = size / 2
+        for ball, position in zip(recent_balls, positions):
+            start_x = self._strip_from.get(id(ball), position[0])
+            x = lerp(start_x, position[0], eased)
+            turns = (x - start_x) / (2 * math.pi * radius)
+            rotation = self.ball_sprites(ball, size)["rotation"]
+            sprite = rotation[int(round(turns * len(rotation))) % len(rotation)]
+            self.draw_sprite(sprite, (x + radius, position[1] + radius))
+    
+    def _start_roll(self, recent_balls: List[Ball], positions: List[Tuple[int, int]]) -> None:
+        """Start rolling the strip from its previous arrangement to a new one."""
+        previous = self._strip
+        self._strip = recent_balls
+        old_x = {id(ball): x for ball, (x, _) in zip(previous, self.layout.recent_positions[len(previous)])}
+        # Only animate the strip growing by new balls (not a new game or a restored one)
+        if not previous or not self.animating() or not all(id(ball) in old_x for ball in recent_balls[:-1]):
+            self.animator.tweens.pop("roll", None)
+            return
+        # New balls roll in from the right-hand edge
+        self._strip_from = {
+            id(ball): old_x.get(id(ball), self.layout.width + i * self.layout.recent_size)
+            for i, ball in enumerate(recent_balls)
+        }
+        self.animator.start("roll", self.frame_time, self.ROLL_TIME)
             
+    def track_draws(self, balls: List[Ball]) -> None:
+        """Take in the balls drawn since the last frame, or start over for a new game."""
+        count = self._called_count
+        if len(balls) < count or (count and balls[count - 1] is not self._last_called):
+            self._recent.clear()
+            self._called = bytearray(76)
+            self._board_pending = []
+            self._board = None
+            self._called_count = count = 0
+            self._last_called = None
+            self._called_serial += 1
+        if len(balls) == count:
+            return
+        for i in range(count, len(balls)):
+            self._recent.append(balls[i])
+            self._called[balls[i].number] = 1
+            self._board_pending.append(balls[i].number)
+        self._called_count = len(balls)
+        self._last_called = balls[-1]
+        self._called_serial += 1
+    
+    def draw_caller_board(self, balls: List[Ball]) -> None:
+        """Draw the board of all 75 numbers with the called ones lit.
+        
+        The board is kept as one surface; a draw repaints only the tiles of the
+        newly called number and the one called before it.
+        """
+        self.track_draws(balls)
+        if self._board is None:
+            self._paint_board()
+        elif self._board_pending:
+            previous = self._board_last
+            self._board_last = self._last_called.number
+            for number in self._board_pending:
+                self._paint_board_tile(number)
+            if previous and previous not in self._board_pending:
+                self._paint_board_tile(previous)
+            self._board_pending = []
+        self.canvas.blit(self._board, self.layout.board_rect.topleft)
+    
+    def _paint_board(self) -> None:
+        """Paint the whole board: letters, every tile, and the numbers called so far."""
+        layout = self.layout
+        self._board = pygame.Surface(layout.board_rect.size)
+        self._board.fill(self.BOARD_BACKDROP)
+        for row, rect in enumerate(layout.board_letter_rects):
+            pygame.draw.rect(self._board, layout.header_colors[row], rect.inflate(-2, -2))
+            letter = self.static_text(self.font_small, "BINGO"[row], (255, 255, 255))
+            self._board.blit(letter, letter.get_rect(center=rect.center))
+        
+        self._board_last = self._last_called.number if self._called_count else 0
+        self._board_pending = []
+        for number in range(1, 76):
+            self._paint_board_tile(number, upload=False)
+        metrics.inc("render.board_redraws")
+    
+    def _paint_board_tile(self, number: int, upload: bool = True) -> None:
+        """Repaint one number's tile: dim if not called, in its column colour if called, outlined if last."""
+        colors = settings['colors']
+        rect = self.layout.board_tile_rects[number]
+        tile = rect.inflate(-2, -2)
+        called = self._called[number]
+        self._board.fill(self.BOARD_BACKDROP, rect)
+        pygame.draw.rect(self._board, colors['ball_colors']["BINGO"[(number - 1) // 15]] if called else colors['card_background'], tile)
+        if number == self._board_last:
+            pygame.draw.rect(self._board, (255, 255, 255), tile, 2)
+        text = self.static_text(self.font_small, str(number), colors['text'] if called else (110, 110, 130))
+        self._board.blit(text, text.get_rect(center=rect.center))
+        if upload:
+            # Only this tile changed; a GPU canvas re-uploads just its pixels
+            self.canvas.update(self._board, rect)
+            metrics.inc("render.board_tiles")
+    
     def draw_player_card(self, card: BingoCard, index: int = 0) -> None:
         """Draw a player's bingo card."""
-        # Calculate responsive card size based on screen width
-        # Card should be square but not larger than 80% of screen width
-        card_width = min(self.width * 0.8, self.height * 0.5)
-        card_height = card_width  # Square aspect ratio for the grid itself
-        
-        # Position card centered horizontally and at proper vertical position
-        card_x = (self.width - card_width) // 2
-        card_y = int(self.height * 0.35)  # 35% from the top
-        
-        # Draw card background
-        pygame.draw.rect(self.screen, settings['colors']['card_background'], 
-                        (card_x, card_y, card_width, card_height))
-        pygame.draw.rect(self.screen, settings['colors']['text'], 
-                        (card_x, card_y, card_width, card_height), 3)
-        
-        # Draw BINGO letters at the top
-        letters = ['B', 'I', 'N', 'G', 'O']
-        cell_width = card_width / 5
-        cell_height = card_height / 5
+        layout = self.layout
+        self.canvas.blit(self.card_layer(card, index), layout.card_rect.topleft)
+        
+        # Flash the cells marked since the last frame (the four rows below the header)
+        marks = [cell.marked for column in card.grid for cell in column[:4]]
+        previous = self._card_marks.get(index)
+        self._card_marks[index] = (id(card), marks)
+        if previous is not None and previous[0] == id(card) and self.animating():
+            for i, (was, now) in enumerate(zip(previous[1], marks)):
+                if now and not was:
+                    self.animator.start(("flash", index, i), self.frame_time, self.FLASH_TIME)
         
-        # Draw the cell grid
         for col in range(5):
-            for row in range(5):
-                cell = card.grid[col][row]
-                cell_rect = pygame.Rect(
-                    card_x + col * cell_width, 
-                    card_y + row * cell_height,
-                    cell_width, 
-                    cell_height
-                )
-                
-                # Draw the cell border and background
-                if col == 0:  # B column header
-                    letter_color = (65, 105, 225)  # Blue
-                elif col == 1:  # I column header
-                    letter_color = (34, 139, 34)  # Green
-                elif col == 2:  # N column header
-                    letter_color = (255, 0, 0)  # Red
-                elif col == 3:  # G column header
-                    letter_color = (255, 215, 0)  # Yellow
-                elif col == 4:  # O column header
-                    letter_color = (138, 43, 226)  # Purple
-                
-                # Draw column header
-                if row == 0:
-                    # Draw stronger colored header background
-                    header_color = [max(0, min(255, c * 0.8)) for c in letter_color]
-                    pygame.draw.rect(self.screen, header_color, cell_rect)
-                    letter_surf = self.render_text(self.font_medium, letters[col], (255, 255, 255))
-                    letter_rect = letter_surf.get_rect(center=cell_rect.center)
-                    self.screen.blit(letter_surf, letter_rect)
-                    pygame.draw.rect(self.screen, settings['colors']['text'], cell_rect, 1)
-                    continue
-                
-                # Offset row due to headers
-                actual_row = row - 1
-                cell = card.grid[col][actual_row]
-                    
-                # Draw highlighted background if marked
-                if cell.is_marked():
-                    pygame.draw.rect(self.screen, settings['colors']['ball_colors'][cell.letter], cell_rect)
-                    pygame.draw.rect(self.screen, settings['colors']['text'], cell_rect, 1)
-                else:
-                    pygame.draw.rect(self.screen, settings['colors']['card_background'], cell_rect)
-                    pygame.draw.rect(self.screen, settings['colors']['text'], cell_rect, 1)
-                
-                # Draw number (or FREE for the center space)
-                if cell.number == 0:
-                    text = self.render_text(self.font_small, "FREE", settings['colors']['text'])
-                else:
-                    text = self.render_text(self.font_small, str(cell.number), settings['colors']['text'])
-                    
-                text_rect = text.get_rect(center=cell_rect.center)
-                self.screen.blit(text, text_rect)
+            for row in range(1, 5):
+                progress = self.animator.progress(("flash", index, col * 4 + row - 1), self.frame_time)
+                if progress is not None:
+                    cell_rect = layout.cell_rects[col][row]
+                    frames = self.flash_frames(cell_rect.size)
+                    self.canvas.blit(frames[frame_index(progress, len(frames))], cell_rect.topleft)
+    
+    def card_layer(self, card: BingoCard, index: int = 0) -> pygame.Surface:
+        """Return the card drawn on its own surface, redrawn only when its marks or colours change."""
+        colors = settings['colors']
+        key = (
+            id(card),
+            tuple(cell.marked for column in card.grid for cell in column),
+            repr((colors['text'], colors['card_background'], colors['ball_colors'])),
+        )
+        cached = self._card_layers.get(index)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        layout = self.layout
+        origin = layout.card_rect.topleft
+        layer = pygame.Surface(layout.card_rect.size)
+        cell_rects = [[rect.move(-origin[0], -origin[1]) for rect in column] for column in layout.cell_rects]
+        fonts = (self.font_medium, self.font_small)
+        paint_card(layer, card, cell_rects, layout.header_colors, colors,
+                   lambda text, color, header: self.static_text(fonts[not header], text, color))
+        
+        self._card_layers[index] = (key, layer)
+        metrics.inc("render.card_redraws")
+        return layer
+    
+    def draw_win_odds(self, odds: List[Dict], shown: Tuple[int, ...] = (1, 3, 5)) -> None:
+        """Draw the odds of a bingo within the next few balls under the caller board."""
+        parts = []
+        for entry in odds:
+            if entry["balls"] not in shown:
+                continue
+            if entry["exact"]:
+                parts.append(f"{entry['balls']}: {entry['probability']:.1%}")
+            else:
+                parts.append(f"{entry['balls']}: {entry['low']:.1%}-{entry['high']:.1%}")
+        if not parts:
+            return
+        text = self.render_text(self.font_small, "Bingo within " + "   ".join(parts), settings['colors']['text'])
+        self.canvas.blit(text, text.get_rect(center=self.layout.odds_center))
     
     def draw_score_panel(self) -> None:
         """Draw the score and game statistics panel."""
-        # Calculate responsive panel size and position
-        panel_width = self.width * 0.9
-        panel_height = int(self.height * 0.15)
-        panel_x = (self.width - panel_width) // 2
-        panel_y = self.height - panel_height - int(20 * self.scale)
+        layout = self.layout
         
         # Draw panel background
-        pygame.draw.rect(self.screen, settings['colors']['card_background'], 
-                        (panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(self.screen, settings['colors']['text'], 
-                        (panel_x, panel_y, panel_width, panel_height), 2)
-        
-        # Draw scores and stats
-        score_text = self.render_text(self.font_medium, f"Score: {score}", settings['colors']['text'])
-        wins_text = self.render_text(self.font_medium, f"Wins: {wins}", settings['colors']['text'])
-        games_text = self.render_text(self.font_medium, f"Games: {games_played}", settings['colors']['text'])
-        
-        # Draw the texts in a row
-        section_width = panel_width / 3
-        
-        score_rect = score_text.get_rect(center=(
-            panel_x + section_width * 0.5, 
-            panel_y + panel_height / 2
-        ))
-        wins_rect = wins_text.get_rect(center=(
-            panel_x + section_width * 1.5, 
-            panel_y + panel_height / 2
-        ))
-        games_rect = games_text.get_rect(center=(
-            panel_x + section_width * 2.5, 
-            panel_y + panel_height / 2
-        ))
-        
-        self.screen.blit(score_text, score_rect)
-        self.screen.blit(wins_text, wins_rect)
-        self.screen.blit(games_text, games_rect)
+        self.canvas.fill_rect(settings['colors']['card_background'], layout.panel_rect)
+        self.canvas.frame_rect(settings['colors']['text'], layout.panel_rect, 2)
+        
+        # Draw scores and stats in a row
+        texts = [f"Score: {session.score}", f"Wins: {session.wins}", f"Games: {session.games_played}"]
+        for text, center in zip(texts, layout.panel_centers):
+            surface = self.render_text(self.font_medium, text, settings['colors']['text'])
+            self.canvas.blit(surface, surface.get_rect(center=center))
         
     def draw_game_status(self, status: str) -> None:
         """Draw game status or announcements."""
-        # Position in upper part of the card
-        status_y = int(self.height * 0.3)
-        
-        status_text = self.render_text(self.font_medium, status, settings['colors']['text'])
-        status_rect = status_text.get_rect(center=(self.width // 2, status_y))
+        status_text = self.static_text(self.font_medium, status, settings['colors']['text'])
+        status_rect = status_text.get_rect(center=self.layout.status_center)
         
         # Draw subtle background behind text
-        bg_rect = status_rect.copy()
-        bg_rect.inflate_ip(int(20 * self.scale), int(10 * self.scale))
-        pygame.draw.rect(self.screen, settings['colors']['card_background'], bg_rect)
-        pygame.draw.rect(self.screen, settings['colors']['text'], bg_rect, 1)
+        bg_rect = status_rect.inflate(self.layout.box_padding)
+        self.canvas.fill_rect(settings['colors']['card_background'], bg_rect)
+        self.canvas.frame_rect(settings['colors']['text'], bg_rect, 1)
         
-        self.screen.blit(status_text, status_rect)
+        self.canvas.blit(status_text, status_rect)
         
     def draw_menu(self, options: List[str], selected: int) -> None:
         """Draw a menu with options and highlighted selection."""
-        # Calculate responsive spacing
-        option_height = int(60 * self.scale)
-        menu_height = len(options) * option_height
-        menu_y = (self.height - menu_height) // 2
+        layout = self.layout
+        menu_y = layout.menu_top(len(options))
         
         for i, option in enumerate(options):
             if i == selected:
@@ -788,32 +1941,90 @@ class GameUI:
             else:
                 color = settings['colors']['text']
                 
-            text = self.render_text(self.font_medium, option, color)
-            text_rect = text.get_rect(center=(self.width // 2, menu_y + i * option_height))
+            text = self.static_text(self.font_medium, option, color)
+            text_rect = text.get_rect(center=(layout.center_x, menu_y + i * layout.menu_option_height))
             
             # Draw background for selected item
             if i == selected:
-                bg_rect = text_rect.copy()
-                bg_rect.inflate_ip(int(20 * self.scale), int(10 * self.scale))
-                pygame.draw.rect(self.screen, settings['colors']['card_highlight'], bg_rect)
-                pygame.draw.rect(self.screen, color, bg_rect, 2)
+                bg_rect = text_rect.inflate(layout.box_padding)
+                self.canvas.fill_rect(settings['colors']['card_highlight'], bg_rect)
+                self.canvas.frame_rect(color, bg_rect, 2)
             
-            self.screen.blit(text, text_rect)
+            self.canvas.blit(text, text_rect)
+    
+    def draw_profiler_overlay(self, profiler: FrameProfiler) -> None:
+        """Draw frame timings and a rolling frame-time histogram."""
+        padding = self.layout.overlay_padding
+        line_height = self.font_small.get_linesize()
+        
+        frame_times = list(profiler.frame_times)
+        last_ms = frame_times[-1] if frame_times else 0.0
+        avg_ms = sum(frame_times) / len(frame_times) if frame_times else 0.0
+        lines = [
+            f"Frame {last_ms:.1f} ms (avg {avg_ms:.1f}, {1000 / avg_ms if avg_ms else 0:.0f} fps)",
+            f"Dropped frames: {profiler.dropped}",
+        ]
+        for name in profiler.SECTIONS:
+            avg = profiler.average_ms(name)
+            if avg > 0:
+                lines.append(f"{name}: {avg:.2f} ms")
+        
+        hist_height = self.layout.overlay_graph_height + line_height
+        panel_width = self.layout.overlay_width
+        panel_height = len(lines) * line_height + hist_height + padding * 3
+        panel = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        
+        for i, line in enumerate(lines):
+            text = self.render_text(self.font_small, line, (200, 255, 200))
+            panel.blit(text, (padding, padding + i * line_height))
+        
+        # Rolling histogram: one bar per recent frame, red when over budget
+        budget_ms = 1000.0 / max(1, profiler.target_fps)
+        graph_top = padding * 2 + len(lines) * line_height
+        graph_bottom = panel_height - padding
+        graph_height = graph_bottom - graph_top
+        graph_width = panel_width - padding * 2
+        if frame_times:
+            bar_width = max(1, graph_width // len(frame_times))
+            scale_ms = max(budget_ms * 3, max(frame_times))
+            for i, frame_ms in enumerate(frame_times[-graph_width // bar_width:]):
+                bar_height = max(1, int(graph_height * min(frame_ms, scale_ms) / scale_ms))
+                color = (255, 80, 80) if frame_ms > budget_ms * 1.5 else (80, 200, 255)
+                pygame.draw.rect(panel, color, (padding + i * bar_width, graph_bottom - bar_height, bar_width, bar_height))
+            budget_y = graph_bottom - int(graph_height * budget_ms / scale_ms)
+            pygame.draw.line(panel, (255, 255, 0), (padding, budget_y), (padding + graph_width, budget_y))
+        
+        self.canvas.blit(panel, (padding, padding))
 
 
 class SettingsScreen:
     """Handles the settings menu and configuration."""
     
-    def __init__(self, screen: pygame.Surface, ui: GameUI):
-        self.screen = screen
-        self.ui = ui
-        self.width = screen.get_width()
-        self.height = screen.get_height()
+    def __init__(self, canvas: Union[SoftwareCanvas, TextureCanvas], ui: GameUI):
+        self.relayout(canvas, ui)
         
         # Settings categories and options
         self.categories = ["Serial", "Display", "Audio", "Game", "Back to Main Menu"]
         self.current_category = 0
+        self._build_options()
         
+        self.current_options = self.categories
+        self.selected_index = 0
+        self.in_submenu = False
+        self.current_submenu = None
+        self.edit_mode = False
+        self.need_reconnect = False
+    
+    def relayout(self, canvas: Union[SoftwareCanvas, TextureCanvas], ui: GameUI) -> None:
+        """Use a new canvas size; geometry comes from the UI's layout."""
+        self.canvas = canvas
+        self.ui = ui
+        self.layout = ui.layout
+        self.width, self.height = canvas.get_size()
+    
+    def _build_options(self) -> None:
+        """Create the option lists from the current settings."""
         # Serial settings
         self.serial_settings = [
             {"name": "Auto-detect Arduino", "type": "toggle", "value": settings['serial'].get('auto_detect', False)},
@@ -823,7 +2034,10 @@ class SettingsScreen:
         # Display settings
         self.display_settings = [
             {"name": "Fullscreen", "type": "toggle", "value": settings['display']['fullscreen']},
-            {"name": "FPS", "type": "value", "value": settings['display']['fps'], "min": 30, "max": 120, "step": 10}
+            {"name": "FPS", "type": "value", "value": settings['display']['fps'], "min": 30, "max": 120, "step": 10},
+            {"name": "Renderer", "type": "option", "value": settings['display'].get('renderer', "auto"),
+             "options": ["auto", "gpu", "software"]},
+            {"name": "Animations", "type": "toggle", "value": settings['display'].get('animations', True)}
         ]
         
         # Audio settings
@@ -839,13 +2053,20 @@ class SettingsScreen:
             {"name": "Winning Pattern", "type": "option", "value": settings['game']['default_pattern'], 
              "options": ["horizontal", "vertical", "diagonal", "four_corners", "full_card", "any"]}
         ]
-        
-        self.current_options = self.categories
-        self.selected_index = 0
-        self.in_submenu = False
-        self.current_submenu = None
+    
+    def reload_options(self) -> None:
+        """Refresh the displayed values after settings changed outside this screen."""
+        self._build_options()
         self.edit_mode = False
-        self.need_reconnect = False
+        if self.in_submenu:
+            options = {
+                "serial": self.serial_settings,
+                "display": self.display_settings,
+                "audio": self.audio_settings,
+                "game": self.game_settings,
+            }[self.current_submenu]
+            self.current_options = options + [{"name": "Back", "type": "back"}]
+            self.selected_index = min(self.selected_index, len(self.current_options) - 1)
     
     def handle_input(self, event) -> bool:
         """Handle input events. Returns True if settings screen should close."""
@@ -879,13 +2100,7 @@ class SettingsScreen:
                         
                         # Reconnect Arduino if needed
                         if self.need_reconnect:
-                            global arduino_bridge_port
-                            arduino_bridge.close()
-                            arduino_bridge = ArduinoBridge(
-                                settings['serial']['port'],
-                                settings['serial']['baudrate'],
-                                settings['serial']['timeout']
-                            )
+                            reconnect_arduino()
                             self.need_reconnect = False
                     else:
                         # Edit the selected setting
@@ -900,13 +2115,7 @@ class SettingsScreen:
                     
                     # Reconnect Arduino if needed
                     if self.need_reconnect:
-                        global arduino_bridge_port
-                        arduino_bridge.close()
-                        arduino_bridge = ArduinoBridge(
-                            settings['serial']['port'],
-                            settings['serial']['baudrate'],
-                            settings['serial']['timeout']
-                        )
+                        reconnect_arduino()
                         self.need_reconnect = False
             else:
                 # Main settings menu
@@ -979,6 +2188,10 @@ class SettingsScreen:
                 settings['display']['fullscreen'] = setting["value"]
             elif setting["name"] == "FPS":
                 settings['display']['fps'] = setting["value"]
+            elif setting["name"] == "Renderer":
+                settings['display']['renderer'] = setting["value"]
+            elif setting["name"] == "Animations":
+                settings['display']['animations'] = setting["value"]
                 
         # Audio settings
         for setting in self.audio_settings:
@@ -986,9 +2199,9 @@ class SettingsScreen:
                 settings['audio']['enabled'] = setting["value"]
             elif setting["name"] == "Music Volume":
                 settings['audio']['music_volume'] = setting["value"]
-                pygame.mixer.music.set_volume(setting["value"])
             elif setting["name"] == "SFX Volume":
                 settings['audio']['sfx_volume'] = setting["value"]
+        sound_manager.apply_volumes()
                 
         # Game settings
         for setting in self.game_settings:
@@ -997,22 +2210,21 @@ class SettingsScreen:
             elif setting["name"] == "Winning Pattern":
                 settings['game']['default_pattern'] = setting["value"]
         
-        # Save settings to file
-        try:
-            with open(os.path.join(SCRIPT_DIR, "settings.json"), 'w') as f:
-                json.dump(settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        # Save settings to file (written in the background, coalescing quick edits)
+        if config_service is not None:
+            config_service.save(settings)
     
     def draw(self) -> None:
         """Draw the settings screen."""
+        layout = self.layout
+        
         # Draw background
         self.ui.draw_background()
         
         # Draw title
-        title = self.ui.render_text(self.ui.font_large, "Settings", settings['colors']['text'])
-        title_rect = title.get_rect(midtop=(self.width // 2, int(self.ui.height * 0.05)))
-        self.screen.blit(title, title_rect)
+        title = self.ui.static_text(self.ui.font_large, "Settings", settings['colors']['text'])
+        title_rect = title.get_rect(midtop=(layout.center_x, layout.settings_title_top))
+        self.canvas.blit(title, title_rect)
         
         if self.in_submenu:
             # Draw submenu title
@@ -1026,12 +2238,12 @@ class SettingsScreen:
             elif self.current_submenu == "game":
                 submenu_title = "Game Settings"
                 
-            subtitle = self.ui.render_text(self.ui.font_medium, submenu_title, settings['colors']['text'])
-            subtitle_rect = subtitle.get_rect(midtop=(self.width // 2, int(self.ui.height * 0.15)))
-            self.screen.blit(subtitle, subtitle_rect)
+            subtitle = self.ui.static_text(self.ui.font_medium, submenu_title, settings['colors']['text'])
+            subtitle_rect = subtitle.get_rect(midtop=(layout.center_x, layout.settings_subtitle_top))
+            self.canvas.blit(subtitle, subtitle_rect)
             
-            option_height = int(50 * self.ui.scale)
-            menu_y = int(self.ui.height * 0.25)
+            option_height = layout.settings_option_height
+            menu_y = layout.settings_menu_y
             
             for i, option in enumerate(self.current_options):
                 # Option name
@@ -1042,9 +2254,9 @@ class SettingsScreen:
                 else:
                     name_color = settings['colors']['text']
                     
-                name_text = self.ui.render_text(self.ui.font_medium, option["name"], name_color)
-                name_rect = name_text.get_rect(midright=(self.width // 2 - 20, menu_y + i * option_height))
-                self.screen.blit(name_text, name_rect)
+                name_text = self.ui.static_text(self.ui.font_medium, option["name"], name_color)
+                name_rect = name_text.get_rect(midright=(layout.center_x - 20, menu_y + i * option_height))
+                self.canvas.blit(name_text, name_rect)
                 
                 # Option value (if applicable)
                 if option["type"] != "back":
@@ -1061,39 +2273,32 @@ class SettingsScreen:
                         
                     value_color = name_color if i == self.selected_index else settings['colors']['text']
                     value_rendered = self.ui.render_text(self.ui.font_medium, value_text, value_color)
-                    value_rect = value_rendered.get_rect(midleft=(self.width // 2 + 20, menu_y + i * option_height))
-                    self.screen.blit(value_rendered, value_rect)
+                    value_rect = value_rendered.get_rect(midleft=(layout.center_x + 20, menu_y + i * option_height))
+                    self.canvas.blit(value_rendered, value_rect)
                     
                     # Draw slider bar for slider type
                     if option["type"] == "slider" and i == self.selected_index:
-                        slider_width = 200 * self.ui.scale
-                        slider_height = 10 * self.ui.scale
-                        slider_x = self.width // 2 + 20
+                        slider_width, slider_height = layout.slider_size
+                        slider_x = layout.center_x + 20
                         slider_y = menu_y + i * option_height + 20
                         
                         # Background bar
-                        pygame.draw.rect(self.screen, (60, 60, 60), 
-                                        (slider_x, slider_y, slider_width, slider_height))
+                        self.canvas.fill_rect((60, 60, 60), (slider_x, slider_y, slider_width, slider_height))
                         
                         # Filled portion
                         fill_width = int(slider_width * option["value"])
-                        pygame.draw.rect(self.screen, (100, 200, 255), 
-                                        (slider_x, slider_y, fill_width, slider_height))
+                        self.canvas.fill_rect((100, 200, 255), (slider_x, slider_y, fill_width, slider_height))
                 
                 # Draw selection box
                 if i == self.selected_index:
-                    box_rect = pygame.Rect(
-                        self.width // 2 - 250 * self.ui.scale, 
-                        menu_y + i * option_height - 15 * self.ui.scale,
-                        500 * self.ui.scale, 
-                        30 * self.ui.scale
-                    )
-                    pygame.draw.rect(self.screen, settings['colors']['card_highlight'], box_rect, 2)
+                    box_x, box_offset, box_width, box_height = layout.selection_box
+                    box_rect = pygame.Rect(box_x, menu_y + i * option_height + box_offset, box_width, box_height)
+                    self.canvas.frame_rect(settings['colors']['card_highlight'], box_rect, 2)
                 
         else:
             # Draw main menu categories
-            option_height = int(70 * self.ui.scale)
-            menu_y = int(self.ui.height * 0.3)
+            option_height = layout.category_option_height
+            menu_y = layout.category_menu_y
             
             for i, category in enumerate(self.categories):
                 if i == self.selected_index:
@@ -1101,135 +2306,422 @@ class SettingsScreen:
                 else:
                     color = settings['colors']['text']
                     
-                text = self.ui.render_text(self.ui.font_medium, category, color)
-                text_rect = text.get_rect(center=(self.width // 2, menu_y + i * option_height))
+                text = self.ui.static_text(self.ui.font_medium, category, color)
+                text_rect = text.get_rect(center=(layout.center_x, menu_y + i * option_height))
                 
                 # Draw background for selected item
                 if i == self.selected_index:
-                    bg_rect = text_rect.copy()
-                    bg_rect.inflate_ip(int(40 * self.ui.scale), int(20 * self.ui.scale))
-                    pygame.draw.rect(self.screen, settings['colors']['card_highlight'], bg_rect)
-                    pygame.draw.rect(self.screen, color, bg_rect, 2)
+                    bg_rect = text_rect.inflate(layout.category_padding)
+                    self.canvas.fill_rect(settings['colors']['card_highlight'], bg_rect)
+                    self.canvas.frame_rect(color, bg_rect, 2)
                 
-                self.screen.blit(text, text_rect)
+                self.canvas.blit(text, text_rect)
         
         # Draw navigation help
-        help_text1 = self.ui.render_text(self.ui.font_small, 
+        help_text1 = self.ui.static_text(self.ui.font_small, 
                                          "Arrow Keys: Navigate | Enter: Select | Escape: Back", 
                                          settings['colors']['text'])
-        help_rect1 = help_text1.get_rect(midbottom=(self.width // 2, self.height - 30))
-        self.screen.blit(help_text1, help_rect1)
+        help_rect1 = help_text1.get_rect(midbottom=(layout.center_x, layout.help_bottoms[0]))
+        self.canvas.blit(help_text1, help_rect1)
         
         if self.edit_mode:
-            help_text2 = self.ui.render_text(self.ui.font_small, 
+            help_text2 = self.ui.static_text(self.ui.font_small, 
                                             "Left/Right: Adjust Value | Enter: Confirm", 
                                             settings['colors']['text'])
-            help_rect2 = help_text2.get_rect(midbottom=(self.width // 2, self.height - 60))
-            self.screen.blit(help_text2, help_rect2)
+            help_rect2 = help_text2.get_rect(midbottom=(layout.center_x, layout.help_bottoms[1]))
+            self.canvas.blit(help_text2, help_rect2)
+
+
+def default_settings() -> Dict:
+    """Return the settings used when settings.json is missing or incomplete."""
+    return {
+        "serial": {"port": "/dev/ttyACM0", "baudrate": 9600, "timeout": 0.1, "auto_detect": False, "emulate": False,
+                   "protocol": "auto", "framed_baudrate": 115200},
+        "display": {"width": 1080, "height": 1920, "fullscreen": True, "fps": 60, "renderer": "auto", "animations": True},
+        "metrics": {"http_port": 0, "dump_file": ""},
+        "debug": {"profile_overlay": False, "profile_trace": False, "profile_csv": "profile_trace.csv"},
+        "stats": {"enabled": True, "database": "stats.db", "player": "player1", "cabinet": ""},
+        "journal": {"enabled": True, "path": "session.journal", "sync_interval": 0.05},
+        "broadcast": {"enabled": False, "host": "0.0.0.0", "port": 8765, "queue_size": 256},
+        "control": {"enabled": False, "path": "control.sock", "max_pending": 1024, "budget_ms": 4.0},
+        "audio": {"enabled": True, "music_volume": 0.5, "sfx_volume": 0.8},
+        "game": {
+            "max_balls": 75,
+            "ball_draw_delay": 3000,
+            "winning_patterns": ["horizontal", "vertical", "diagonal", "four_corners", "full_card"],
+            "default_pattern": "horizontal",
+            "card_registry": ""
+        },
+        "colors": {
+            "background": [20, 20, 40],
+            "text": [255, 255, 255],
+            "card_background": [30, 30, 60],
+            "card_highlight": [60, 60, 100],
+            "ball_colors": {
+                "B": [65, 105, 225],
+                "I": [34, 139, 34],
+                "N": [255, 0, 0],
+                "G": [255, 215, 0],
+                "O": [138, 43, 226]
+            }
+        }
+    }
 
 
 def load_settings() -> Dict:
-    """Load game settings from settings.json."""
+    """Load game settings from settings.json, repairing missing or invalid values."""
     try:
         with open(os.path.join(SCRIPT_DIR, "settings.json")) as f:
-            return json.load(f)
+            loaded = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error loading settings: {e}")
         # Return default settings
-        return {
-            "serial": {"port": "/dev/ttyACM0", "baudrate": 9600, "timeout": 0.1, "auto_detect": False},
-            "display": {"width": 1080, "height": 1920, "fullscreen": True, "fps": 60},
-            "audio": {"enabled": True, "music_volume": 0.5, "sfx_volume": 0.8},
-            "game": {
-                "max_balls": 75,
-                "ball_draw_delay": 3000,
-                "winning_patterns": ["horizontal", "vertical", "diagonal", "four_corners", "full_card"],
-                "default_pattern": "horizontal"
-            },
-            "colors": {
-                "background": [20, 20, 40],
-                "text": [255, 255, 255],
-                "card_background": [30, 30, 60],
-                "card_highlight": [60, 60, 100],
-                "ball_colors": {
-                    "B": [65, 105, 225],
-                    "I": [34, 139, 34],
-                    "N": [255, 0, 0],
-                    "G": [255, 215, 0],
-                    "O": [138, 43, 226]
-                }
-            }
-        }
+        return default_settings()
+    
+    repaired, errors = repair(loaded, default_settings())
+    for error in errors:
+        print(f"Invalid setting, using default: {error}")
+    return repaired
+
+
+def reconnect_arduino() -> None:
+    """Close the Arduino connection and reconnect with the current serial settings."""
+    global arduino_bridge
+    
+    if arduino_bridge is not None:
+        arduino_bridge.close()
+    arduino_bridge = ArduinoBridge(
+        settings['serial']['port'],
+        settings['serial']['baudrate'],
+        settings['serial']['timeout']
+    )
 
 
-def process_arduino_message(message: str):
-    """Process messages received from the Arduino."""
-    global current_ball
+def apply_settings(new_settings: Dict) -> set:
+    """Apply settings edited outside the game. Returns the names of the sections that changed."""
+    changed = {name for name in set(settings) | set(new_settings) if settings.get(name) != new_settings.get(name)}
+    if not changed:
+        return changed
+    
+    old_serial = settings.get('serial')
+    # Update in place so every holder of the settings dict sees the new values
+    settings.clear()
+    settings.update(new_settings)
+    
+    if 'audio' in changed:
+        sound_manager.apply_volumes()
+        if not settings['audio']['enabled']:
+            sound_manager.stop_music()
+        else:
+            sound_manager.play_music()
+    
+    # Only reconnect for a change the bridge cares about, not e.g. a tweaked emulator option
+    if 'serial' in changed and any(
+            old_serial.get(key) != settings['serial'].get(key)
+            for key in ('port', 'baudrate', 'timeout', 'auto_detect', 'emulate', 'protocol')):
+        reconnect_arduino()
     
-    lines = message.strip().split('\n')
+    print(f"Applied settings changes: {', '.join(sorted(changed))}")
+    return changed
+
+
+def process_arduino_message(message: Union[str, bytes]):
+    """Process bytes received from the Arduino."""
+    bridge = arduino_bridge
+    if bridge is not None and message and bridge.last_message_read_at is not None:
+        metrics.observe("serial.queue_wait_ms", (time.perf_counter() - bridge.last_message_read_at) * 1000)
+        metrics.inc("serial.messages")
+    if isinstance(message, str):
+        message = message.encode('latin-1')
     
-    for line in lines:
-        if not line:
-            continue
+    for kind, value in playfield.feed(message):
+        if kind == POCKET:
+            # A ball landed in pocket value (A-Y = 1-25);
+            # ignore a pocket that has already been called this game
+            if not session.call(value):
+                continue
             
-        if line.startswith("BALL:"):
-            # Ball has been drawn
-            ball_code = line[5:].strip()
+            # Play sound
+            sound_manager.play_sound("ball_draw")
             
-            # Convert Arduino ball code (A-Y) to number (1-25)
-            if 'A' <= ball_code <= 'Y':
-                ball_num = ord(ball_code) - ord('A') + 1
-                
-                # Create a new Ball object
-                current_ball = Ball(ball_num)
-                balls_drawn.append(current_ball)
-                
-                # Mark the ball on player cards
-                for card in player_cards:
-                    card.mark_number(ball_num)
-                
-                # Play sound
-                sound_manager.play_sound("ball_draw")
+            if bridge is not None:
+                bridge.note_response("D")
                 
-        elif line == "BALL_RELEASED":
+        elif kind == GATE:
             # Ball has been physically released
             print("Ball released through gate")
             
-        elif line == "BALL_RETURNED":
+        elif kind == RETURN:
             # Ball has been returned
             print("Ball returned to the tray")
             
-        elif line == "GAME_STARTED":
+        elif kind == SWITCH:
+            metrics.inc(f"playfield.{value}")
+            
+        elif kind == IDENTIFY:
+            print(f"Playfield identified as {value}")
+            
+        elif value == "GAME_STARTED":
             # Game has started confirmation
-            global game_active
-            game_active = True
+            session.active = True
+            if bridge is not None:
+                bridge.note_response("N")
             
-        elif line == "GAME_ENDED":
+        elif value == "GAME_ENDED":
             # Game has ended confirmation
-            game_active = False
+            session.active = False
+            if bridge is not None:
+                bridge.note_response("E")
+
+
+def open_session() -> GameSession:
+    """Create the cabinet's game session from the game settings."""
+    return GameSession(
+        settings['game']['default_pattern'],
+        settings['game'].get('max_balls', 75),
+        settings['game'].get('seed'),
+        on_event=on_session_event
+    )
+
+
+def on_session_event(event: Dict) -> None:
+    """Record a cabinet game event in the statistics and the session journal, and broadcast it."""
+    kind = event["t"]
+    if kind == "new":
+        if stats_store is not None:
+            player_id, cabinet_id = stats_ids()
+            session.game_id = stats_store.start_game(player_id, cabinet_id, session.pattern)
+        if session_journal is not None:
+            session_journal.new_game(session.game_id, session.pattern, session.ball_deck.planned_order(),
+                                     [win_patterns.card_numbers(card) for card in session.player_cards])
+    elif kind == "ball":
+        if stats_store is not None and session.game_id is not None:
+            stats_store.record_draw(session.game_id, len(session.balls_drawn), event["n"])
+        if session_journal is not None:
+            session_journal.ball(event["n"])
+    elif kind == "win":
+        if session_journal is not None:
+            session_journal.win(event["card"], event["pattern"])
+    elif kind == "end":
+        # Queue the outcome; the stats writer commits it off the game loop
+        if stats_store is not None and session.game_id is not None:
+            player_id, cabinet_id = stats_ids()
+            stats_store.end_game(session.game_id, player_id, cabinet_id, event["won"],
+                                 100 if event["won"] else 0, len(session.balls_drawn))
+            session.game_id = None
+        if session_journal is not None:
+            session_journal.end_game(event["won"])
+    broadcast(event)
 
 
 def check_for_bingo() -> bool:
     """Check all player cards for bingo according to the winning pattern."""
-    pattern = settings['game']['default_pattern']
+    return session.check_for_bingo()
+
+
+def verify_claim(card_id: int, pattern: Optional[str] = None) -> Dict:
+    """Verify a bingo claim for a player card in the cabinet's game.
     
-    for card in player_cards:
-        if card.check_for_win(pattern):
-            return True
+    A valid claim is late when more than game.claim_grace_balls balls were
+    drawn after the ball that completed it; see GameSession.verify_claim.
+    """
+    return session.verify_claim(card_id, pattern, settings['game'].get('claim_grace_balls', 0))
+
+
+def stats_ids() -> Tuple[str, str]:
+    """Return the (player, cabinet) ids statistics are recorded under."""
+    stats_settings = settings.get('stats', {})
+    return stats_settings.get('player', "player1"), stats_settings.get('cabinet') or socket.gethostname()
+
+
+def open_stats_store() -> None:
+    """Open the statistics database and restore the player's totals."""
+    global stats_store
+    
+    stats_settings = settings.get('stats', {})
+    if not stats_settings.get('enabled', False):
+        return
+    
+    try:
+        stats_store = StatsStore(os.path.join(SCRIPT_DIR, stats_settings.get('database', "stats.db")))
+        totals = stats_store.player_stats(stats_ids()[0])
+        session.score, session.wins, session.games_played = totals['score'], totals['wins'], totals['games_played']
+    except sqlite3.Error as e:
+        print(f"Could not open statistics database: {e}")
+        stats_store = None
+
+
+def broadcast(event: Dict) -> None:
+    """Send an event to remote displays, if the broadcast server is running."""
+    if broadcast_server is not None:
+        broadcast_server.publish(event)
+
+
+def start_broadcast_server() -> None:
+    """Start the broadcast server for remote displays if it is enabled."""
+    global broadcast_server
+    
+    broadcast_settings = settings.get('broadcast', {})
+    if not broadcast_settings.get('enabled', False):
+        return
+    
+    server = BroadcastServer(
+        broadcast_settings.get('host', "0.0.0.0"),
+        broadcast_settings.get('port', 8765),
+        broadcast_settings.get('queue_size', 256)
+    )
+    if server.start():
+        broadcast_server = server
+        broadcast(session.snapshot())
+
+
+def start_control_server() -> None:
+    """Start the control socket for automation if it is enabled."""
+    global control_server
+    
+    control_settings = settings.get('control', {})
+    if not control_settings.get('enabled', False):
+        return
+    
+    server = ControlServer(os.path.join(SCRIPT_DIR, control_settings.get('path', "control.sock")),
+                           control_settings.get('max_pending', 1024))
+    if server.start():
+        control_server = server
+
+
+def run_control_command(command: Dict) -> Dict:
+    """Carry out one command from the control socket (see control.py) and return its result."""
+    global pending_settings
+    
+    name = command["cmd"]
+    if name == "ping":
+        return {}
+    if name == "state":
+        state = session.snapshot()
+        horizon = command.get("odds")
+        if horizon is not None:
+            if not isinstance(horizon, int) or isinstance(horizon, bool) or horizon < 1:
+                raise ControlError("odds must be a positive number of balls")
+            state["odds"] = session.win_odds(horizon)
+        return state
+    if name == "settings":
+        return json.loads(json.dumps(settings))
+    if name == "new_game":
+        new_game()
+        return session.snapshot()
+    if name in ("draw_ball", "end_game", "verify_claim") and not session.active:
+        raise ControlError("no game in progress")
+    if name == "draw_ball":
+        drawn = len(session.balls_drawn)
+        draw_ball()
+        # None when the ball is still on its way from the hardware
+        ball = session.balls_drawn[-1].number if len(session.balls_drawn) > drawn else None
+        return {"ball": ball, "balls": len(session.balls_drawn)}
+    if name == "end_game":
+        end_game(bool(command.get("won", False)))
+        return session.snapshot()
+    if name == "verify_claim":
+        card = command.get("card", 0)
+        pattern = command.get("pattern")
+        if not isinstance(card, int):
+            raise ControlError("card must be the card's index")
+        if pattern is not None and pattern not in win_patterns.PATTERNS:
+            raise ControlError(f"unknown pattern: {pattern}")
+        return verify_claim(card, pattern)
+    if name == "set":
+        # {"settings": {section: {key: value}}}, checked now and applied with the next frame
+        changes = command.get("settings")
+        if not isinstance(changes, dict) or not all(isinstance(values, dict) for values in changes.values()):
+            raise ControlError("settings must map sections to objects of values")
+        updated = json.loads(json.dumps(pending_settings if pending_settings is not None else settings))
+        for section, values in changes.items():
+            current = updated.setdefault(section, {})
+            if not isinstance(current, dict):
+                raise ControlError(f"{section} is not a settings section")
+            current.update(values)
+        errors = validate(updated)
+        if errors:
+            raise ControlError("; ".join(errors))
+        pending_settings = updated
+        return {"sections": sorted(changes)}
+    raise ControlError(f"unknown command: {name}")
+
+
+def take_control_settings() -> Optional[Dict]:
+    """Return the settings changed over the control socket since the last frame, saving them, or None."""
+    global pending_settings
+    
+    updated, pending_settings = pending_settings, None
+    if updated is not None and config_service is not None:
+        config_service.save(updated)
+    return updated
+
+
+def open_card_registry() -> None:
+    """Open the registry of dealt card serials, if one is configured, so no card is dealt twice."""
+    global card_registry
+    
+    path = settings['game'].get('card_registry', "")
+    if not path:
+        return
+    
+    try:
+        card_registry = card_serials.SerialRegistry(os.path.join(SCRIPT_DIR, path))
+        session.registry = card_registry
+    except (OSError, ValueError) as e:
+        print(f"Could not open card registry: {e}")
+        card_registry = None
+
+
+def open_session_journal() -> bool:
+    """Open the session journal, restoring an unfinished game from it. Returns True if restored."""
+    global session_journal
+    
+    journal_settings = settings.get('journal', {})
+    if not journal_settings.get('enabled', False):
+        return False
     
-    return False
+    path = os.path.join(SCRIPT_DIR, journal_settings.get('path', "session.journal"))
+    started = time.perf_counter()
+    state = read_journal(path)
+    restored = state is not None and not state['ended'] and restore_game(state)
+    if restored:
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics.observe("journal.replay_ms", elapsed)
+        print(f"Restored unfinished game with {len(session.balls_drawn)} balls drawn ({elapsed:.1f} ms)")
+    
+    session_journal = SessionJournal(path, journal_settings.get('sync_interval', 0.05))
+    if restored:
+        # Rewrite the journal so a torn record at the end of the old one is dropped
+        session_journal.new_game(session.game_id, session.pattern, session.ball_deck.planned_order(),
+                                 [win_patterns.card_numbers(card) for card in session.player_cards],
+                                 session.ball_deck.draw_order)
+    return restored
+
+
+def restore_game(state: Dict) -> bool:
+    """Rebuild the game in progress from a replayed journal."""
+    session.max_balls = settings['game'].get('max_balls', 75)
+    if not session.restore(state):
+        return False
+    if stats_store is None:
+        session.game_id = None
+    
+    # The bridge lost its game state with the power, so start it again
+    if arduino_bridge is not None and arduino_bridge.is_connected():
+        arduino_bridge.start_game()
+    return True
 
 
 def new_game() -> None:
     """Start a new bingo game."""
-    global balls_drawn, current_ball, player_cards, game_active, games_played
-    
-    # Reset game state
-    balls_drawn = []
-    current_ball = None
+    # Pick up game settings changed since the last game
+    session.pattern = settings['game']['default_pattern']
+    session.max_balls = settings['game'].get('max_balls', 75)
+    session.seed = settings['game'].get('seed')
     
-    # Create a new bingo card for the player
-    player_cards = [BingoCard()]
+    # Reset game state and deal a new bingo card for the player
+    session.new_game()
     
     # Connect to Arduino and start the game
     if arduino_bridge.is_connected():
@@ -1237,32 +2729,24 @@ def new_game() -> None:
     
     # Play start sound
     sound_manager.play_sound("button_click")
-    
-    # Update game stats
-    games_played += 1
-    game_active = True
 
 
 def end_game(is_winner: bool) -> None:
     """End the current game."""
-    global game_active, score, wins
-    
     if is_winner:
         sound_manager.play_sound("win")
-        score += 100
-        wins += 1
     else:
         sound_manager.play_sound("lose")
     
+    session.end_game(is_winner)
+    
     if arduino_bridge.is_connected():
         arduino_bridge.end_game()
-    
-    game_active = False
 
 
 def draw_ball() -> None:
     """Draw a new bingo ball."""
-    if not game_active or arduino_bridge is None:
+    if not session.active or arduino_bridge is None:
         return
         
     # Request a new ball from the Arduino system
@@ -1271,25 +2755,61 @@ def draw_ball() -> None:
     # The ball will be processed when Arduino sends back the ball code
 
 
-def main() -> None:
-    """Main game function."""
-    global settings, serial_conn, arduino_bridge, sound_manager, game_active
+def open_display(title: str = "Belgian Bingo",
+                 previous: Optional[Union[SoftwareCanvas, TextureCanvas]] = None) -> Union[SoftwareCanvas, TextureCanvas]:
+    """Create the canvas from the display settings: the GPU renderer if chosen and available, else the display surface.
     
-    # Load settings
-    settings = load_settings()
-    
-    # Set up display
+    The renderer is chosen at startup; reopening the display keeps the previous canvas's kind.
+    """
+    size = (settings['display']['width'], settings['display']['height'])
+    renderer = settings['display'].get('renderer', "auto")
+    if previous is not None:
+        previous.close()
+        renderer = "gpu" if previous.hardware_scaling else "software"
+    if renderer != "software":
+        try:
+            canvas = TextureCanvas(size, settings['display']['fullscreen'], title, accelerated=renderer == "auto")
+            print("Using the GPU renderer")
+            return canvas
+        except (pygame.error, RuntimeError) as e:
+            print(f"GPU renderer not available, drawing in software: {e}")
+    canvas = SoftwareCanvas(open_display_surface())
+    pygame.display.set_caption(title)
+    return canvas
+
+
+def open_display_surface() -> pygame.Surface:
+    """Create the display surface from the display settings."""
     if settings['display']['fullscreen']:
-        screen = pygame.display.set_mode(
+        return pygame.display.set_mode(
             (settings['display']['width'], settings['display']['height']), 
             pygame.FULLSCREEN
         )
-    else:
-        screen = pygame.display.set_mode(
-            (settings['display']['width'], settings['display']['height'])
-        )
+    return pygame.display.set_mode(
+        (settings['display']['width'], settings['display']['height']),
+        pygame.RESIZABLE
+    )
+
+
+def main(overrides: Optional[Dict] = None, speed: float = 1.0,
+         frame_hook: Optional[Callable[[bool], None]] = None) -> None:
+    """Main game function.
+    
+    overrides replaces settings values section by section, speed runs game time
+    faster than real time, and frame_hook is called after every frame with
+    whether the menu is showing (the soak test uses all three).
+    """
+    global settings, serial_conn, arduino_bridge, sound_manager, session, config_service
     
-    pygame.display.set_caption("Belgian Bingo")
+    # Load settings and watch the file for changes
+    settings = load_settings()
+    for section, values in (overrides or {}).items():
+        settings.setdefault(section, {}).update(values)
+    session = open_session()
+    config_service = ConfigService(os.path.join(SCRIPT_DIR, "settings.json"), default_settings())
+    
+    # Set up display
+    canvas = open_display()
     
     # Set up Arduino connection
     arduino_bridge = ArduinoBridge(
@@ -1302,111 +2822,309 @@ def main() -> None:
     sound_manager = SoundManager()
     sound_manager.play_music()
     
+    # Restore persistent statistics and any game interrupted by a crash
+    open_stats_store()
+    open_card_registry()
+    restored_game = open_session_journal()
+    
+    # Serve game events to remote displays
+    start_broadcast_server()
+    start_control_server()
+    
     # Initialize UI
-    ui = GameUI(screen)
+    ui = GameUI(canvas)
     
     # Initialize settings screen
-    settings_screen = SettingsScreen(screen, ui)
+    settings_screen = SettingsScreen(canvas, ui)
+    
+    # Serve metrics locally if configured
+    metrics_settings = settings.get('metrics', {})
+    if metrics_settings.get('http_port'):
+        try:
+            start_http_server(metrics, metrics_settings['http_port'])
+            print(f"Serving metrics on http://127.0.0.1:{metrics_settings['http_port']}/metrics")
+        except OSError as e:
+            print(f"Could not start metrics server: {e}")
     
     # Game state
-    in_menu = True
+    in_menu = not restored_game
     in_settings = False
     menu_options = ["New Game", "Settings", "Quit"]
     selected_option = 0
     
+    # Frame profiler (F3 toggles the overlay)
+    debug_settings = settings.get('debug', {})
+    profiler = FrameProfiler(settings['display']['fps'])
+    profiler.enabled = debug_settings.get('profile_overlay', False)
+    profiler.tracing = debug_settings.get('profile_trace', False)
+    
     # Main game loop
-    clock = pygame.time.Clock()
-    last_ball_draw_time = pygame.time.get_ticks()
+    clock = GameClock(speed)
+    last_ball_draw_time = clock.ticks()
     running = True
+    show_board = False          # caller board instead of the player card
     
     while running:
-        current_time = pygame.time.get_ticks()
+        current_time = clock.ticks()
         
         # Process events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            # Handle keyboard input
-            if in_settings:
-                if settings_screen.handle_input(event):
-                    in_settings = False
-            elif in_menu:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        selected_option = (selected_option - 1) % len(menu_options)
-                        sound_manager.play_sound("button_click")
-                    elif event.key == pygame.K_DOWN:
-                        selected_option = (selected_option + 1) % len(menu_options)
-                        sound_manager.play_sound("button_click")
-                    elif event.key == pygame.K_RETURN:
-                        if menu_options[selected_option] == "New Game":
-                            in_menu = False
-                            new_game()
-                        elif menu_options[selected_option] == "Settings":
-                            in_settings = True
-                        elif menu_options[selected_option] == "Quit":
+        with profiler.section("events"):
+            resized = False
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                
+                if event.type == pygame.VIDEORESIZE:
+                    # Dragging sends many of these; lay out once per frame
+                    resized = True
+                    continue
+                
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.enabled = not profiler.enabled
+                    continue
+                
+                # Handle keyboard input
+                if in_settings:
+                    if settings_screen.handle_input(event):
+                        in_settings = False
+                elif in_menu:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_UP:
+                            selected_option = (selected_option - 1) % len(menu_options)
+                            sound_manager.play_sound("button_click")
+                        elif event.key == pygame.K_DOWN:
+                            selected_option = (selected_option + 1) % len(menu_options)
+                            sound_manager.play_sound("button_click")
+                        elif event.key == pygame.K_RETURN:
+                            if menu_options[selected_option] == "New Game":
+                                in_menu = False
+                                new_game()
+                            elif menu_options[selected_option] == "Settings":
+                                in_settings = True
+                            elif menu_options[selected_option] == "Quit":
+                                running = False
+                        elif event.key == pygame.K_ESCAPE:
                             running = False
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-            else:
-                # In-game controls
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        in_menu = True
-                    elif event.key == pygame.K_SPACE:
-                        draw_ball()
-        
-        # Check for Arduino messages
-        if arduino_bridge.is_connected():
-            message = arduino_bridge.read_message()
-            if message:
-                process_arduino_message(message)
-        
-        # Auto-draw balls at regular intervals when game is active
-        if game_active and current_time - last_ball_draw_time >= settings['game']['ball_draw_delay']:
-            draw_ball()
-            last_ball_draw_time = current_time
+                else:
+                    # In-game controls
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            in_menu = True
+                        elif event.key == pygame.K_SPACE:
+                            draw_ball()
+                        elif event.key == pygame.K_TAB:
+                            show_board = not show_board
+        
+        # Run commands from the control socket between frames, within a time budget
+        if control_server is not None:
+            with profiler.section("control"):
+                done = control_server.process(run_control_command, settings.get('control', {}).get('budget_ms', 4.0))
+            if "new_game" in done:
+                in_menu = in_settings = False
+            elif "end_game" in done:
+                in_menu = True
+        
+        if resized and not canvas.hardware_scaling:
+            canvas.resized()
+            ui.relayout(canvas)
+            settings_screen.relayout(canvas, ui)
+        
+        # Apply settings edited outside the game or over the control socket
+        reloaded = config_service.poll()
+        if reloaded is None:
+            reloaded = take_control_settings()
+        if reloaded is not None:
+            changed = apply_settings(reloaded)
+            if 'display' in changed:
+                canvas = open_display(previous=canvas)
+                ui.relayout(canvas)
+                settings_screen.relayout(canvas, ui)
+            elif changed:
+                settings_screen.reload_options()
+            if 'debug' in changed:
+                profiler.enabled = settings['debug'].get('profile_overlay', profiler.enabled)
+                profiler.tracing = settings['debug'].get('profile_trace', profiler.tracing)
+            profiler.target_fps = settings['display']['fps']
+        
+        with profiler.section("serial"):
+            # Check for Arduino messages
+            if arduino_bridge.is_connected():
+                message = arduino_bridge.read_message()
+                if message:
+                    process_arduino_message(message)
+            
+            # Auto-draw balls at regular intervals when game is active
+            if session.active and current_time - last_ball_draw_time >= settings['game']['ball_draw_delay']:
+                draw_ball()
+                last_ball_draw_time = current_time
         
         # Check for bingo
-        if game_active and check_for_bingo():
+        with profiler.section("check_for_bingo"):
+            bingo = session.active and check_for_bingo()
+        if bingo:
             end_game(True)
-            game_active = False
             in_menu = True
         
         # Draw UI
-        ui.draw_background()
-        ui.draw_header()
+        ui.begin_frame(current_time / 1000)
+        with profiler.section("draw_background"):
+            ui.draw_background()
+        with profiler.section("draw_header"):
+            ui.draw_header()
         
         if in_settings:
-            settings_screen.draw()
+            with profiler.section("draw_settings"):
+                settings_screen.draw()
         elif in_menu:
-            ui.draw_menu(menu_options, selected_option)
+            with profiler.section("draw_menu"):
+                ui.draw_menu(menu_options, selected_option)
         else:
-            if current_ball:
-                ui.draw_current_ball(current_ball)
+            if session.current_ball:
+                with profiler.section("draw_current_ball"):
+                    ui.draw_current_ball(session.current_ball)
             
-            ui.draw_recently_drawn_balls(balls_drawn)
+            with profiler.section("draw_recently_drawn_balls"):
+                ui.draw_recently_drawn_balls(session.balls_drawn)
             
-            if player_cards:
-                ui.draw_player_card(player_cards[0])
+            if show_board:
+                with profiler.section("draw_caller_board"):
+                    ui.draw_caller_board(session.balls_drawn)
+                with profiler.section("draw_win_odds"):
+                    ui.draw_win_odds(session.win_odds())
+            elif session.player_cards:
+                with profiler.section("draw_player_card"):
+                    ui.draw_player_card(session.player_cards[0])
             
-            ui.draw_score_panel()
+            with profiler.section("draw_score_panel"):
+                ui.draw_score_panel()
             
-            if not game_active:
-                ui.draw_game_status("GAME OVER - Press ESC for menu")
+            if not session.active:
+                with profiler.section("draw_game_status"):
+                    ui.draw_game_status("GAME OVER - Press ESC for menu")
+        
+        if profiler.enabled:
+            ui.draw_profiler_overlay(profiler)
         
         # Update display
-        pygame.display.flip()
+        with profiler.section("flip"):
+            canvas.present()
+        arduino_bridge.note_frame_presented()
         clock.tick(settings['display']['fps'])
+        profiler.end_frame()
+        if frame_hook is not None:
+            frame_hook(in_menu or in_settings)
+    
+    # Export the frame trace
+    if profiler.trace:
+        trace_path = os.path.join(SCRIPT_DIR, settings['debug'].get('profile_csv', "profile_trace.csv"))
+        try:
+            profiler.write_csv(trace_path)
+            print(f"Wrote frame trace to {trace_path}")
+        except OSError as e:
+            print(f"Could not write frame trace: {e}")
+    
+    # Write out collected metrics
+    metrics_settings = settings.get('metrics', {})
+    if metrics_settings.get('dump_file'):
+        try:
+            metrics.dump(os.path.join(SCRIPT_DIR, metrics_settings['dump_file']))
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
     
     # Clean up before quitting
     if arduino_bridge.is_connected():
         arduino_bridge.close()
+    if stats_store is not None:
+        stats_store.close()
+    if session_journal is not None:
+        session_journal.close()
+    if card_registry is not None:
+        card_registry.close()
+    if broadcast_server is not None:
+        broadcast_server.stop()
+    if control_server is not None:
+        control_server.stop()
+    config_service.close()
     
     pygame.quit()
     sys.exit()
 
 
+def run_display_client(address: str) -> None:
+    """Run as a remote display showing the game broadcast by a caller machine."""
+    global settings, session
+    
+    settings = load_settings()
+    session = open_session()
+    host, _, port = address.rpartition(":")
+    if not host:
+        host, port = port, settings.get('broadcast', {}).get('port', 8765)
+    
+    canvas = open_display("Belgian Bingo - Display")
+    ui = GameUI(canvas)
+    ui.show_hardware_status = False  # the hardware belongs to the caller machine
+    
+    # Events arrive on the client thread and are applied between frames
+    state = DisplayState()
+    events = deque()
+    client = DisplayClient(host, int(port), events.append)
+    client.start()
+    
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        resized = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.VIDEORESIZE:
+                resized = True
+        if resized and not canvas.hardware_scaling:
+            canvas.resized()
+            ui.relayout(canvas)
+        
+        while events:
+            state.apply(events.popleft())
+        
+        # Keep Ball objects for the drawn numbers, only building the new ones
+        balls_drawn = session.balls_drawn
+        if [ball.number for ball in balls_drawn[:len(state.balls)]] != state.balls[:len(balls_drawn)]:
+            balls_drawn = []
+        balls_drawn = balls_drawn[:len(state.balls)]
+        for number in state.balls[len(balls_drawn):]:
+            balls_drawn.append(Ball(number))
+        session.balls_drawn = balls_drawn
+        session.current_ball = balls_drawn[-1] if balls_drawn else None
+        session.score, session.wins, session.games_played = state.score, state.wins, state.games
+        
+        ui.begin_frame()
+        ui.draw_background()
+        ui.draw_header()
+        if session.current_ball:
+            ui.draw_current_ball(session.current_ball)
+        ui.draw_recently_drawn_balls(session.balls_drawn)
+        ui.draw_caller_board(session.balls_drawn)
+        ui.draw_score_panel()
+        if not client.connected:
+            ui.draw_game_status(f"Waiting for caller at {host}:{port}")
+        elif state.winner is not None:
+            ui.draw_game_status("BINGO!")
+        elif not state.active:
+            ui.draw_game_status("Waiting for the next game")
+        
+        canvas.present()
+        clock.tick(settings['display']['fps'])
+    
+    client.stop()
+    pygame.quit()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Belgian Bingo")
+    parser.add_argument("--display", metavar="HOST:PORT",
+                        help="run as a remote display for a caller's broadcast server")
+    args = parser.parse_args()
+    if args.display:
+        run_display_client(args.display)
+    else:
+        main()
\ No newline at end of file
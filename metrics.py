@@ -0,0 +1,171 @@
+"""
+Metrics Registry
+----------------
+An in-process registry of counters and latency histograms. Values can be dumped
+to a JSON file or served from a local HTTP endpoint (JSON at /metrics.json,
+Prometheus text format at /metrics).
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum, min and max."""
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = list(buckets or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        """Record a single value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Estimate a percentile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        """Return the histogram as a plain dictionary."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {str(b): c for b, c in zip(self.buckets + ["+Inf"], self.counts)},
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe collection of named counters and histograms."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value (usually milliseconds) in a histogram."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict:
+        """Return all metrics as a JSON-serialisable dictionary."""
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 3),
+                "counters": dict(self.counters),
+                "histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = _prometheus_name(name)
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                metric = _prometheus_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                running = 0
+                for bound, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                    running += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {running}')
+                lines.append(f"{metric}_sum {histogram.total}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write a JSON snapshot to path, replacing any previous dump atomically."""
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=4)
+        os.replace(temp_path, path)
+
+    def reset(self) -> None:
+        """Clear every counter and histogram."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+
+def _prometheus_name(name: str) -> str:
+    """Convert a dotted metric name into a Prometheus-safe one."""
+    return "bingo_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def start_http_server(registry: MetricsRegistry, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the registry on a local HTTP port from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = registry.to_prometheus().encode('utf-8')
+                content_type = "text/plain; version=0.0.4"
+            elif self.path in ("/", "/metrics.json"):
+                body = json.dumps(registry.snapshot(), indent=4).encode('utf-8')
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep scrapes out of the console
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# Process-wide registry used by the game
+metrics = MetricsRegistry()
@@ -0,0 +1,310 @@
+"""
+Win Odds
+--------
+The exact probability that a pattern is won within the next k balls, given the
+cards in play and the balls drawn so far, for the caller screen and for
+pricing prizes.
+
+A line needing m more of the R balls left is complete after k more balls with
+the hypergeometric probability C(R - m, k - m) / C(R, k). A pattern is won
+when any line on any card completes, so the odds come from counting the
+k-subsets of the balls left that hold none of the lines' missing numbers.
+Lines that need more than k balls cannot complete and are left out, and lines
+whose missing numbers include another line's are dropped. Every winning
+k-subset is then counted once, under the first line (smallest first) it
+completes: the subsets holding that line's numbers but nothing another
+earlier line still needs, which is the same count over fewer numbers and
+balls. That recursion bottoms out in closed forms for single numbers and
+pairs, so up to five balls it never goes deeper than one level.
+
+Thousands of cards still make for many lines. Once the counting takes more
+than work_limit steps it stops: the odds for fewer balls than the line it
+stopped at are still exact, and the rest are bounded, at least the draws
+already counted as wins (never below the odds for one ball fewer), at most
+that plus each remaining line's own chance.
+
+OddsTracker keeps a count of each line's missing numbers and updates only the
+lines holding the ball just drawn, so the odds after a draw cost little more
+than the counting itself.
+"""
+
+import math
+import time
+from functools import lru_cache
+from typing import Collection, Dict, Iterable, List, Optional, Sequence
+
+import win_patterns
+from metrics import metrics
+
+DEFAULT_HORIZON = 5
+DEFAULT_WORK_LIMIT = 200000   # about 1000 cards stay exact all game
+
+
+@lru_cache(maxsize=8192)
+def completion_probability(remaining: int, balls: int, missing: int) -> float:
+    """Chance that `missing` given numbers are all among the next `balls` of `remaining` balls."""
+    if missing > balls or balls > remaining:
+        return 0.0
+    return math.comb(remaining - missing, balls - missing) / math.comb(remaining, balls)
+
+
+try:
+    _bits = int.bit_count
+except AttributeError:      # Python < 3.10
+    def _bits(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+class _OutOfWork(Exception):
+    pass
+
+
+def _minimal(masks: Iterable[int]) -> List[int]:
+    """The distinct masks that contain no other, smallest first."""
+    kept = set()
+    found = []
+    for mask in sorted(set(masks), key=lambda mask: (_bits(mask), mask)):
+        sub = (mask - 1) & mask
+        while sub and sub not in kept:
+            sub = (sub - 1) & mask
+        if not sub:
+            kept.add(mask)
+            found.append(mask)
+    return found
+
+
+def _split(mask: int) -> List[int]:
+    """One mask per bit of mask."""
+    found = []
+    while mask:
+        bit = mask & -mask
+        found.append(bit)
+        mask ^= bit
+    return found
+
+
+def _avoiding(numbers: int, sets: List[int], balls: int, budget: List[int],
+              unfinished: Optional[List[int]] = None) -> List[int]:
+    """How many r-subsets of `numbers` numbers hold none of sets, for r = 0..balls.
+
+    sets must come from _minimal and hold at most `balls` numbers each.
+    budget[0] is the work left; once it runs out _OutOfWork is raised, unless
+    unfinished is given: then the sets not yet worked through are put in it
+    and each count is only lowered for the subsets whose first set was.
+    """
+    fatal = 0
+    for mask in sets:
+        if mask & (mask - 1):
+            break
+        fatal |= mask
+    if fatal:
+        numbers -= _bits(fatal)
+        sets = [mask for mask in sets if not mask & fatal]
+    counts = [math.comb(numbers, r) for r in range(balls + 1)]
+    index: Dict[tuple, List[int]] = {}  # (G & ~W, |W|) -> masks G, for W in G of up to balls - |G| numbers
+    partners: Dict[int, int] = {}       # bit -> bits paired with it by the pairs so far
+    pairs = 0
+
+    for position, mask in enumerate(sets):
+        size = _bits(mask)
+        spare = balls - size
+        if not spare:
+            counts[size] -= 1
+            continue
+        try:
+            # What the earlier sets still need once mask is drawn, when spare balls or fewer
+            lost = 0
+            edges = set()
+            larger = set()
+            shared = mask
+            while True:
+                for extra in range(1, min(spare, size - _bits(shared)) + 1):
+                    if extra == 2 and not shared and spare <= 2:
+                        continue        # pairs apart from mask are counted from partners below
+                    for earlier in index.get((shared, extra), ()):
+                        if earlier & mask == shared:
+                            if extra == 1:
+                                lost |= earlier ^ shared
+                            elif extra == 2:
+                                edges.add(earlier ^ shared)
+                            else:
+                                larger.add(earlier ^ shared)
+                if not shared:
+                    break
+                shared = (shared - 1) & mask
+            budget[0] -= len(edges) + len(larger) + (spare << size)
+            if budget[0] < 0:
+                raise _OutOfWork
+            if mask & lost:
+                continue        # an earlier set is inside mask
+
+            # Count the r-subsets of the other numbers that hold none of what the earlier sets need
+            if larger or spare > 3:
+                found = _avoiding(numbers - size, _minimal(_split(lost) + list(edges) + list(larger)),
+                                  spare, budget)
+            else:
+                left = numbers - size - _bits(lost)
+                edges = [edge for edge in edges if not edge & lost]
+                if spare <= 2:
+                    # Earlier pairs that share nothing with mask or lost: pairs - touching + within
+                    touching = within = 0
+                    for bit in _split(mask | lost):
+                        others = partners.get(bit, 0)
+                        touching += _bits(others)
+                        within += _bits(others & (mask | lost))
+                    pair_count = len(edges) + pairs - touching + within // 2
+                    found = [1, left, left * (left - 1) // 2 - pair_count][:spare + 1]
+                else:
+                    # Triples holding no edge: all, minus those on an edge, plus those on two, minus triangles
+                    near: Dict[int, int] = {}
+                    for edge in edges:
+                        low = edge & -edge
+                        near[low] = near.get(low, 0) | (edge ^ low)
+                        near[edge ^ low] = near.get(edge ^ low, 0) | low
+                    paths = sum(_bits(bits) * (_bits(bits) - 1) // 2 for bits in near.values())
+                    triangles = sum(_bits(near[edge & -edge] & near[edge ^ (edge & -edge)]) for edge in edges) // 3
+                    found = [1, left, left * (left - 1) // 2 - len(edges),
+                             math.comb(left, 3) - len(edges) * (left - 2) + paths - triangles]
+        except _OutOfWork:
+            if unfinished is None:
+                raise
+            unfinished.extend(sets[position:])
+            return counts
+        for r, count in enumerate(found):
+            counts[size + r] -= count
+
+        if size == 2:
+            low = mask & -mask
+            partners[low] = partners.get(low, 0) | (mask ^ low)
+            partners[mask ^ low] = partners.get(mask ^ low, 0) | low
+            pairs += 1
+        part = mask
+        while part:
+            extra = _bits(part)
+            if extra <= spare:
+                index.setdefault((mask ^ part, extra), []).append(mask)
+            part = (part - 1) & mask
+    return counts
+
+
+def grouped_odds(groups: Sequence[Collection[int]], remaining: int, horizon: int = DEFAULT_HORIZON,
+                 work_limit: int = DEFAULT_WORK_LIMIT) -> List[Dict]:
+    """win_odds for lines already grouped by how many numbers they miss (groups[m], m = 0..horizon)."""
+    horizon = min(horizon, remaining, len(groups) - 1)
+    if groups[0]:
+        return [{"balls": k, "probability": 1.0, "low": 1.0, "high": 1.0, "exact": True}
+                for k in range(1, horizon + 1)]
+
+    # The default horizon first, so that a long one can't use up the work the nearer odds need
+    lows = [0.0] * (horizon + 1)
+    highs = [1.0] * (horizon + 1)
+    exact = [False] * (horizon + 1)
+    budget = [work_limit]
+    for balls in sorted({min(horizon, DEFAULT_HORIZON), horizon}):
+        sets = _minimal(mask for m in range(1, balls + 1) for mask in groups[m])
+        unfinished: List[int] = []
+        counts = _avoiding(remaining, sets, balls, budget, unfinished)
+        left = [0] * (balls + 1)        # sets not worked through, by size
+        for mask in unfinished:
+            left[_bits(mask)] += 1
+        exact_below = _bits(unfinished[0]) if unfinished else balls + 1
+        for k in range(1, balls + 1):
+            if exact[k]:
+                continue
+            # The draws whose first set was worked through are wins, the others may be
+            p = max(0.0, 1.0 - counts[k] / math.comb(remaining, k))
+            exact[k] = k < exact_below
+            lows[k] = max(lows[k], p)
+            highs[k] = p if exact[k] else min(highs[k], p + sum(
+                left[m] * completion_probability(remaining, k, m) for m in range(1, k + 1)))
+    if not all(exact[1:]):
+        metrics.inc("odds.bounded")
+
+    results = []
+    for k in range(1, horizon + 1):
+        if exact[k]:
+            results.append({"balls": k, "probability": lows[k], "low": lows[k], "high": lows[k], "exact": True})
+        else:
+            low = max(lows[k], lows[k - 1])     # never below the odds for one ball fewer
+            lows[k] = low
+            results.append({"balls": k, "probability": None, "low": low, "high": max(low, highs[k]),
+                            "exact": False})
+    return results
+
+
+def win_odds(missing: Iterable[int], remaining: int, horizon: int = DEFAULT_HORIZON,
+             work_limit: int = DEFAULT_WORK_LIMIT) -> List[Dict]:
+    """Odds of any line completing within 1..horizon more balls.
+
+    missing holds one bitmask per line of the numbers it still needs (see
+    win_patterns.line_masks). Returns one dict per k: balls, probability
+    (None if only bounded), low, high and exact. Past work_limit steps the
+    larger k are only bounded.
+    """
+    groups = [[] for _ in range(horizon + 1)]
+    for mask in missing:
+        size = _bits(mask)
+        if size <= horizon:
+            groups[size].append(mask)
+    return grouped_odds(groups, remaining, horizon, work_limit)
+
+
+class OddsTracker:
+    """Missing numbers of every line of a pattern on a set of cards, updated ball by ball."""
+
+    def __init__(self, cards: Sequence, pattern: str, horizon: int = DEFAULT_HORIZON,
+                 max_number: int = 75, work_limit: int = DEFAULT_WORK_LIMIT):
+        self.pattern = pattern
+        self.horizon = horizon
+        self.max_number = max_number
+        self.work_limit = work_limit
+        self.marked = 0             # balls applied so far
+        self.drawn_bits = 0
+        self.masks: List[int] = []  # every number of each line
+        self.counts: List[int] = []  # how many of them are still to be drawn
+        self.index: List[List[int]] = [[] for _ in range(max_number + 1)]
+        # near[m] maps each line missing m numbers (m up to the horizon) to its missing mask
+        self.near: List[Dict[int, int]] = [{} for _ in range(horizon + 1)]
+        self._odds = None
+
+        reachable = (1 << max_number) - 1
+        for card in cards:
+            if hasattr(card, "line_masks"):
+                lines = card.line_masks(pattern)
+            else:
+                lines = win_patterns.line_masks(win_patterns.card_numbers(card), pattern)
+            for _, _, mask, numbers in lines:
+                if mask & ~reachable:
+                    continue        # needs a number this deck doesn't hold
+                line = len(self.masks)
+                self.masks.append(mask)
+                self.counts.append(len(numbers))
+                for number in numbers:
+                    self.index[number].append(line)
+                if len(numbers) <= horizon:
+                    self.near[len(numbers)][line] = mask
+
+    def mark(self, number: int) -> None:
+        """Apply a drawn ball."""
+        self.marked += 1
+        self._odds = None
+        if not 1 <= number <= self.max_number:
+            return
+        self.drawn_bits |= 1 << (number - 1)
+        counts, near, horizon = self.counts, self.near, self.horizon
+        for line in self.index[number]:
+            count = counts[line] - 1
+            counts[line] = count
+            if count <= horizon:
+                if count < horizon:
+                    del near[count + 1][line]
+                near[count][line] = self.masks[line] & ~self.drawn_bits
+
+    def odds(self) -> List[Dict]:
+        """Odds of the pattern being won within 1..horizon more balls (see win_odds)."""
+        if self._odds is None:
+            started = time.perf_counter()
+            self._odds = grouped_odds([group.values() for group in self.near], self.max_number - self.marked,
+                                      self.horizon, self.work_limit)
+            metrics.observe("odds.compute_ms", (time.perf_counter() - started) * 1000)
+        return self._odds
@@ -0,0 +1,300 @@
+"""
+Playfield Stream
+----------------
+Parses the byte stream the Bally/Joop playfield sends through the Uno bridge
+and keeps a live model of which of the 25 numbered pockets hold a ball.
+
+The Mega reports most things as single bytes with no line ending:
+
+    8 9               yellow / red rollover
+    g w v u r         orange, white, blue, green and R buttons
+    a b c d e f       A-F buttons
+    n x ) .           new game, extra ball, credits, lift ball buttons
+    t > <             tilt, rotate right, rotate left
+    Z z               ball in the return pocket, ball through the gate
+    ^                 a button or switch was released (followed by CR LF)
+    A-Y               ball in pocket 1-25 (followed by CR LF)
+    {BingoPlayfield}  identification reply
+
+In ASCII mode the Uno echoes every Mega byte and then adds its own line for
+the interesting ones, so a pocket arrives as "ABALL:A\\r\\n\\r\\n" and the gate as
+"zBALL_RELEASED\\r\\n"; it also sends status lines such as GAME_STARTED. In
+framed mode the same lines arrive without the echoes.
+
+The first byte of every token is looked up in a 256-entry dispatch table for
+the parser's current state (between tokens, inside a line, inside an
+identification reply), so switch codes are handled the moment they arrive;
+the body of a line is scanned in one step. Bytes are never turned into
+strings one at a time.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+POCKET_COUNT = 25
+MAX_LINE = 32               # longer runs without a line ending are noise
+
+# Event kinds returned by PlayfieldParser.feed() as (kind, value) tuples
+POCKET = "pocket"           # value: pocket number 1-25
+GATE = "gate"               # ball through the gate, into play
+RETURN = "return"           # ball in the return pocket
+SWITCH = "switch"           # value: switch name from SWITCH_CODES
+RELEASE = "release"         # the last switch was released
+STATUS = "status"           # value: a bridge status line such as "GAME_STARTED"
+IDENTIFY = "identify"       # value: the name in an identification reply
+
+SWITCH_CODES: Dict[str, str] = {
+    "8": "yellow_rollover",
+    "9": "red_rollover",
+    "g": "orange_button",
+    "w": "white_button",
+    "v": "blue_button",
+    "u": "green_button",
+    "r": "r_button",
+    "a": "a_button",
+    "b": "b_button",
+    "c": "c_button",
+    "d": "d_button",
+    "e": "e_button",
+    "f": "f_button",
+    "n": "new_game_button",
+    "x": "extra_ball_button",
+    ")": "credits_button",
+    ".": "lift_ball_button",
+    "t": "tilt",
+    ">": "rotate_right",
+    "<": "rotate_left",
+}
+
+STATUS_LINES = (
+    "BINGO_BRIDGE_READY",
+    "GAME_STARTED",
+    "GAME_ENDED",
+    "BALL_REQUESTED",
+    "GAME_NOT_ACTIVE",
+)
+
+# Complete lines and the event each stands for
+_LINE_EVENTS: Dict[bytes, Tuple[str, Optional[str]]] = {
+    b"BALL_RELEASED": (GATE, None),
+    b"BALL_RETURNED": (RETURN, None),
+}
+_LINE_EVENTS.update({line.encode("ascii"): (STATUS, line) for line in STATUS_LINES})
+
+_BALL_PREFIX = b"BALL:"
+_FIRST_POCKET = ord("A")
+_LAST_POCKET = ord("Y")
+_LINE_RUN = re.compile(rb"[A-Z_:]*")
+_CR = ord("\r")
+_LF = ord("\n")
+
+
+class PocketModel:
+    """Which pockets hold a ball, in the order they filled."""
+
+    def __init__(self):
+        self.occupied = bytearray(POCKET_COUNT + 1)   # index 1-25
+        self.order: List[int] = []
+        self.in_play = 0                              # balls through the gate not yet in a pocket
+
+    @property
+    def count(self) -> int:
+        return len(self.order)
+
+    def drop(self, pocket: int) -> bool:
+        """Record a ball landing in a pocket. Returns False if it was already full."""
+        if self.in_play:
+            self.in_play -= 1
+        if self.occupied[pocket]:
+            return False
+        self.occupied[pocket] = 1
+        self.order.append(pocket)
+        return True
+
+    def ball_released(self) -> None:
+        self.in_play += 1
+
+    def ball_returned(self) -> None:
+        if self.in_play:
+            self.in_play -= 1
+
+    def clear(self) -> None:
+        """Empty every pocket (the shutter opens at the start of a game)."""
+        for pocket in self.order:
+            self.occupied[pocket] = 0
+        self.order = []
+        self.in_play = 0
+
+
+class PlayfieldParser:
+    """Dispatch-table state machine over the playfield byte stream.
+
+    Each state has a 256-entry table of handlers indexed by the next byte.
+    A handler consumes one token (or as much of it as has arrived) starting
+    at that byte and returns where the next one starts. feed() accepts any
+    chunking of the stream; a partial line is kept until the rest arrives.
+    """
+
+    def __init__(self, pockets: Optional[PocketModel] = None):
+        self.pockets = pockets if pockets is not None else PocketModel()
+        self.noise_bytes = 0            # bytes that fit no token
+        self._partial = bytearray()     # start of a line or reply cut off at the end of a chunk
+        self._events: List[Tuple[str, object]] = []
+        self._echoed: Optional[bytes] = None    # line the Uno will send for a byte just echoed
+
+        self._idle_table = self._build_idle_table()
+        self._line_table = [self._line] * 256
+        self._identify_table = [self._identify] * 256
+        self._table = self._idle_table
+
+    def _build_idle_table(self) -> List[Callable[[bytes, int], int]]:
+        """Handlers for the first byte of a token."""
+        table: List[Callable[[bytes, int], int]] = [self._noise] * 256
+        table[_CR] = table[_LF] = self._skip
+        for byte in range(_FIRST_POCKET, _LAST_POCKET + 1):
+            table[byte] = self._line
+        for code, name in SWITCH_CODES.items():
+            table[ord(code)] = self._make_switch(name)
+        table[ord("Z")] = self._returned
+        table[ord("z")] = self._released
+        table[ord("^")] = self._switch_released
+        table[ord("{")] = self._start_identify
+        return table
+
+    def feed(self, data: bytes) -> List[Tuple[str, object]]:
+        """Parse a chunk of the stream and return the events it completed."""
+        i = 0
+        end = len(data)
+        while i < end:
+            i = self._table[data[i]](data, i)
+        events, self._events = self._events, []
+        return events
+
+    def reset(self) -> None:
+        """Drop any partial token (after a reconnect)."""
+        self._partial.clear()
+        self._echoed = None
+        self._table = self._idle_table
+
+    # -- Single-byte tokens ----------------------------------------------
+
+    def _skip(self, data: bytes, i: int) -> int:
+        return i + 1
+
+    def _noise(self, data: bytes, i: int) -> int:
+        self.noise_bytes += 1
+        return i + 1
+
+    def _make_switch(self, name: str) -> Callable[[bytes, int], int]:
+        event = (SWITCH, name)
+
+        def switch(data: bytes, i: int) -> int:
+            self._echoed = None
+            self._events.append(event)
+            return i + 1
+        return switch
+
+    def _switch_released(self, data: bytes, i: int) -> int:
+        self._echoed = None
+        self._events.append((RELEASE, None))
+        return i + 1
+
+    def _returned(self, data: bytes, i: int) -> int:
+        # Act on the byte straight away; the bridge's own line for it is then a repeat
+        self.pockets.ball_returned()
+        self._events.append((RETURN, None))
+        self._echoed = b"BALL_RETURNED"
+        return i + 1
+
+    def _released(self, data: bytes, i: int) -> int:
+        self.pockets.ball_released()
+        self._events.append((GATE, None))
+        self._echoed = b"BALL_RELEASED"
+        return i + 1
+
+    # -- Lines -------------------------------------------------------------
+
+    def _line(self, data: bytes, i: int) -> int:
+        """Take a line's characters up to its ending in one step."""
+        run_end = _LINE_RUN.match(data, i).end()
+        if run_end == len(data):
+            # The rest of the line is still on the wire
+            self._partial += data[i:run_end]
+            if len(self._partial) > MAX_LINE:
+                self.noise_bytes += len(self._partial)
+                self._partial.clear()
+                self._table = self._idle_table
+            else:
+                self._table = self._line_table
+            return run_end
+
+        line = data[i:run_end]          # one allocation per line, not per byte
+        if self._partial:
+            line = bytes(self._partial + line)
+            self._partial.clear()
+        self._table = self._idle_table
+        self._end_line(line)
+        # A line ending is consumed with the line; anything else starts the next token
+        return run_end + 1 if data[run_end] in (_CR, _LF) else run_end
+
+    def _end_line(self, line: bytes) -> None:
+        """Turn a complete line into its event."""
+        echoed, self._echoed = self._echoed, None
+        if not line:
+            return
+        event = self._resolve(line)
+        if event is None and len(line) > 1 and _FIRST_POCKET <= line[0] <= _LAST_POCKET:
+            # The Uno's echo of a pocket code ahead of its own BALL: line
+            event = self._resolve(line[1:])
+        if event is None:
+            self.noise_bytes += len(line)
+            return
+        if echoed is not None and line == echoed:
+            return
+        kind = event[0]
+        if kind == POCKET:
+            self.pockets.drop(event[1])
+        elif kind == GATE:
+            self.pockets.ball_released()
+        elif kind == RETURN:
+            self.pockets.ball_returned()
+        elif event[1] == "GAME_STARTED":
+            self.pockets.clear()
+        self._events.append(event)
+
+    @staticmethod
+    def _resolve(line: bytes) -> Optional[Tuple[str, object]]:
+        """Return the event a complete line stands for, or None."""
+        event = _LINE_EVENTS.get(line)
+        if event is not None:
+            return event
+        if len(line) == 6 and line.startswith(_BALL_PREFIX) and _FIRST_POCKET <= line[5] <= _LAST_POCKET:
+            return (POCKET, line[5] - _FIRST_POCKET + 1)
+        if len(line) == 1 and _FIRST_POCKET <= line[0] <= _LAST_POCKET:
+            # A pocket code straight from the Mega, without the bridge
+            return (POCKET, line[0] - _FIRST_POCKET + 1)
+        return None
+
+    # -- Identification reply ----------------------------------------------
+
+    def _start_identify(self, data: bytes, i: int) -> int:
+        self._echoed = None
+        return self._identify(data, i + 1)
+
+    def _identify(self, data: bytes, i: int) -> int:
+        """Collect a {...} reply up to its closing brace."""
+        close = data.find(b"}", i)
+        if close < 0:
+            self._partial += data[i:]
+            if len(self._partial) > MAX_LINE:
+                self.noise_bytes += len(self._partial)
+                self._partial.clear()
+                self._table = self._idle_table
+            else:
+                self._table = self._identify_table
+            return len(data)
+        name = (self._partial + data[i:close]).decode("ascii", errors="replace")
+        self._partial.clear()
+        self._table = self._idle_table
+        self._events.append((IDENTIFY, name))
+        return close + 1
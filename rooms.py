@@ -0,0 +1,164 @@
+"""
+Room Server
+-----------
+Runs many independent bingo rooms in one process. Each room is a GameSession
+with its own deck, cards and draw timer, and every room is scheduled on a
+single asyncio event loop: a room waiting for its next draw is only a timer
+entry on the loop, so hundreds of rooms cost little more than one.
+
+Rooms are headless (balls are kept as plain numbers and nothing is drawn).
+Run it standalone to simulate a busy hall and report timer accuracy:
+
+    python rooms.py --rooms 500 --games 3 --interval 0.05
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+from typing import Callable, Dict, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import GameSession
+from card_serials import SerialRegistry
+from metrics import metrics
+
+
+class Room:
+    """One bingo room: a game session driven by its own draw timer."""
+
+    def __init__(self, room_id: str, session: GameSession, draw_interval: float = 1.0,
+                 games: int = 1, pause: float = 0.0):
+        self.room_id = room_id
+        self.session = session
+        self.draw_interval = draw_interval    # seconds between balls
+        self.games = games                    # games to play before the room closes (0 = forever)
+        self.pause = pause                    # seconds between games
+        self.balls = 0
+
+    async def run(self) -> None:
+        """Play the room's games, drawing a ball every draw_interval seconds."""
+        loop = asyncio.get_running_loop()
+        played = 0
+        while not self.games or played < self.games:
+            self.session.new_game()
+            next_draw = loop.time() + self.draw_interval
+            while self.session.active:
+                await asyncio.sleep(max(0.0, next_draw - loop.time()))
+                now = loop.time()
+                metrics.observe("rooms.timer_lateness_ms", (now - next_draw) * 1000)
+                # Keep the cadence, but don't burst to catch up after a stall
+                next_draw = max(next_draw + self.draw_interval, now)
+
+                if self.session.draw() is None:
+                    self.session.end_game(False)
+                    continue
+                self.balls += 1
+                if self.session.check_for_bingo():
+                    self.session.end_game(True)
+            played += 1
+            metrics.inc("rooms.games")
+            if self.pause:
+                await asyncio.sleep(self.pause)
+
+
+class RoomServer:
+    """Hosts many rooms on one event loop."""
+
+    def __init__(self, on_event: Optional[Callable[[str, Dict], None]] = None,
+                 registry: Optional[SerialRegistry] = None):
+        self.rooms: Dict[str, Room] = {}
+        self.on_event = on_event              # called with (room id, event) for every room event
+        self.registry = registry              # shared by every room, so no card is dealt twice
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add_room(self, room_id: str, pattern: str = "any", card_count: int = 1,
+                 draw_interval: float = 1.0, seed: Optional[int] = None,
+                 games: int = 1, pause: float = 0.0) -> Room:
+        """Create a room; it starts playing once the server runs."""
+        if room_id in self.rooms:
+            raise ValueError(f"Room already exists: {room_id}")
+        on_event = None
+        if self.on_event is not None:
+            on_event = lambda event, room_id=room_id: self.on_event(room_id, event)
+        session = GameSession(pattern, seed=seed, card_count=card_count,
+                              ball_factory=int, on_event=on_event, registry=self.registry)
+        room = self.rooms[room_id] = Room(room_id, session, draw_interval, games, pause)
+        # Rooms added while the server is running start straight away
+        try:
+            self._start(room)
+        except RuntimeError:
+            pass
+        return room
+
+    def remove_room(self, room_id: str) -> None:
+        """Stop a room and forget it."""
+        room = self.rooms.pop(room_id, None)
+        task = self._tasks.pop(room_id, None)
+        if task is not None:
+            task.cancel()
+        if room is not None and room.session.active:
+            room.session.end_game(False)
+
+    def _start(self, room: Room) -> None:
+        """Schedule a room on the running loop."""
+        self._tasks[room.room_id] = asyncio.get_running_loop().create_task(room.run())
+
+    async def run(self) -> None:
+        """Run every room until all of them have finished their games."""
+        for room in self.rooms.values():
+            if room.room_id not in self._tasks:
+                self._start(room)
+        while self._tasks:
+            tasks = list(self._tasks.values())
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._tasks = {room_id: task for room_id, task in self._tasks.items() if not task.done()}
+
+
+def main() -> None:
+    """Command line entry point: simulate a hall of rooms and report."""
+    parser = argparse.ArgumentParser(description="Run many headless bingo rooms on one event loop")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="games per room")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between balls in each room")
+    parser.add_argument("--cards", type=int, default=1, help="cards per room")
+    parser.add_argument("--pattern", default="any")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--registry", default=None, help="deal only cards not already in this serial registry")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    registry = SerialRegistry(args.registry) if args.registry else None
+    server = RoomServer(registry=registry)
+    for i in range(args.rooms):
+        server.add_room(f"room{i}", args.pattern, args.cards, args.interval,
+                        None if args.seed is None else args.seed + i * args.games, args.games)
+
+    start = time.perf_counter()
+    asyncio.run(server.run())
+    elapsed = time.perf_counter() - start
+
+    balls = sum(room.balls for room in server.rooms.values())
+    lateness = metrics.snapshot()["histograms"].get("rooms.timer_lateness_ms", {})
+    results = {
+        "rooms": args.rooms,
+        "games": metrics.snapshot()["counters"].get("rooms.games", 0),
+        "wins": sum(room.session.wins for room in server.rooms.values()),
+        "balls": balls,
+        "elapsed_s": round(elapsed, 3),
+        "balls_per_s": round(balls / elapsed, 1) if elapsed else 0.0,
+        "timer_lateness_ms": {k: lateness.get(k) for k in ("p50", "p90", "p99", "max")},
+    }
+    if registry is not None:
+        results["registry_serials"] = registry.count
+        registry.close()
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
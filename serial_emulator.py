@@ -0,0 +1,601 @@
+"""
+Arduino Serial Emulator
+-----------------------
+A pty-based stand-in for the Arduino Uno bridge and the Arduino Mega playfield.
+It speaks the same byte protocol as Arduino_scripts/uno.ino and Mega.ino so the
+game's ArduinoBridge can be exercised without hardware, with configurable
+latency, jitter, byte fragmentation and drop rates on the wire.
+
+Run it standalone to get a port name for settings.json, or with --load-test to
+drive ArduinoBridge and process_arduino_message at high event rates.
+
+In bridge mode the emulator also accepts the framed protocol from
+serial_protocol.py, as the current uno.ino does; pass --legacy to emulate a
+bridge that only speaks ASCII lines.
+"""
+
+import os
+import time
+import random
+import select
+import heapq
+import threading
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from serial_protocol import (
+    EVENT_CODES, FRAME_ACK, FRAME_BALL, FRAME_COMMAND, FRAME_EVENT, FRAME_HELLO,
+    FRAME_HELLO_ACK, FRAME_RAW, FRAME_TEXT, FrameDecoder, SequenceWindow,
+    decode_hello, encode_frame, encode_hello
+)
+
+if os.name == 'posix':
+    import tty
+
+# Same hole-code table as the Mega sketch (slot 0 is unused)
+BALL_CODES = " ABCDEFGHIJKLMNOPQRSTUVWXY"
+
+# Single-byte codes the Mega prints when a playfield button or switch closes
+BUTTON_CODES = "abcdefgwvurtnx.<>)"
+
+
+class ArduinoEmulator:
+    """Emulates the Uno bridge (or a bare Mega) behind a pseudo-terminal."""
+
+    def __init__(self, mode: str = "bridge", latency: float = 0.0, jitter: float = 0.0,
+                 fragment: int = 0, drop_rate: float = 0.0, baudrate: int = 9600,
+                 pace: bool = False, debounce: float = 0.5, return_rate: float = 0.0,
+                 reset_pockets_on_new_game: bool = True, seed: Optional[int] = None,
+                 framed: bool = True, max_baudrate: int = 115200, ack_timeout: float = 0.25,
+                 max_retries: int = 5):
+        if os.name != 'posix':
+            raise RuntimeError("The serial emulator needs a POSIX pseudo-terminal")
+        if mode not in ("bridge", "mega"):
+            raise ValueError(f"Unknown emulator mode: {mode}")
+
+        self.mode = mode                    # "bridge" = Uno in front of the Mega, "mega" = Mega only
+        self.latency = latency              # seconds before a response starts on the wire
+        self.jitter = jitter                # +/- seconds added to each response
+        self.fragment = fragment            # max bytes per write (0 = whole responses)
+        self.drop_rate = drop_rate          # probability of losing each outgoing byte
+        self.baudrate = baudrate
+        self.pace = pace                    # throttle output to the configured baud rate
+        self.debounce = debounce            # Uno's COMMAND_DEBOUNCE_TIME in seconds
+        self.return_rate = return_rate      # probability a shot ball goes to the return pocket
+        self.reset_pockets_on_new_game = reset_pockets_on_new_game
+        self.random = random.Random(seed)
+
+        # Framed protocol support (bridge mode only)
+        self.framed = framed and mode == "bridge"
+        self.max_baudrate = max_baudrate
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.framed_mode = False
+        self.confirm_timeout = 1.0
+        self._confirm_deadline = None       # set while waiting for the host to confirm framing
+        self._decoder = FrameDecoder()
+        self._rx_seen = SequenceWindow()
+        self._tx_seq = 0
+        self._pending: Dict[int, List] = {}
+        self._pending_lock = threading.Lock()
+
+        # Uno state
+        self.game_active = False
+        self.last_command_time = -self.debounce
+
+        # Mega state
+        self.balls_in_pocket = [0] * 26     # slot 0 unused, as on the Mega
+        self.returned = 0
+        self.current_ball = 0
+        self.red_lamp = False
+        self.yellow_lamp = False
+        self.lift_running = False
+
+        # Wire statistics
+        self.stats: Dict[str, int] = {
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "bytes_dropped": 0,
+            "writes": 0,
+            "balls": 0,
+            "returns": 0,
+            "retransmits": 0,
+            "crc_errors": 0,
+        }
+
+        self.master_fd = None
+        self.slave_fd = None
+        self.port = None
+        self._running = False
+        self._threads: List[threading.Thread] = []
+        self._queue: List[Tuple[float, int, bytes]] = []
+        self._queue_seq = 0
+        self._last_due = 0.0
+        self._queue_cond = threading.Condition()
+
+    def start(self) -> str:
+        """Open the pseudo-terminal and start the emulator threads. Returns the port name."""
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.master_fd)
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self._running = True
+
+        for target in (self._reader_loop, self._writer_loop, self._retransmit_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        if self.mode == "bridge":
+            # The Uno announces itself on reset
+            self._send_line("BINGO_BRIDGE_READY")
+        return self.port
+
+    def stop(self) -> None:
+        """Stop the emulator threads and close the pseudo-terminal."""
+        self._running = False
+        with self._queue_cond:
+            self._queue_cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.master_fd = None
+        self.slave_fd = None
+
+    # ------------------------------------------------------------------
+    # Host -> emulator
+    # ------------------------------------------------------------------
+
+    def _reader_loop(self) -> None:
+        """Read command bytes written by the host."""
+        while self._running:
+            try:
+                ready, _, _ = select.select([self.master_fd], [], [], 0.05)
+                if not ready:
+                    continue
+                data = os.read(self.master_fd, 1024)
+            except OSError:
+                # Host side closed the port; keep waiting for a reopen
+                time.sleep(0.05)
+                continue
+
+            self.stats["bytes_in"] += len(data)
+            if self.framed:
+                self._receive_frames(data)
+                continue
+            for ch in data.decode('latin-1'):
+                if self.mode == "bridge":
+                    self._uno_command(ch)
+                else:
+                    self._mega_command(ch)
+
+    def _receive_frames(self, data: bytes) -> None:
+        """Split host bytes into frames and legacy command bytes."""
+        for frame_type, seq, payload in self._decoder.feed(data):
+            if frame_type == FRAME_TEXT:
+                if self.framed_mode:
+                    # A bare command byte means the host is speaking ASCII lines
+                    self._revert_to_ascii()
+                for ch in payload.decode('latin-1'):
+                    self._uno_command(ch)
+                continue
+            if frame_type == FRAME_HELLO:
+                _, requested = decode_hello(payload)
+                agreed = min(requested, self.max_baudrate)
+                self._emit(encode_hello(agreed, FRAME_HELLO_ACK))
+                self.framed_mode = True
+                self.baudrate = agreed
+                self._confirm_deadline = time.monotonic() + self.latency + self.confirm_timeout
+                continue
+            # Any other valid frame confirms the host switched over
+            self._confirm_deadline = None
+            if frame_type == FRAME_ACK:
+                if payload:
+                    with self._pending_lock:
+                        self._pending.pop(payload[0], None)
+            elif frame_type == FRAME_COMMAND:
+                self._emit(encode_frame(FRAME_ACK, 0, bytes((seq,))))
+                if payload and not self._rx_seen.seen(seq):
+                    self._uno_command(chr(payload[0]))
+        self.stats["crc_errors"] = self._decoder.crc_errors
+
+    def _revert_to_ascii(self) -> None:
+        """Fall back to ASCII lines at the power-on baud rate."""
+        self._confirm_deadline = None
+        self.framed_mode = False
+        self.baudrate = 9600
+        with self._pending_lock:
+            self._pending.clear()
+
+    def _uno_command(self, command: str) -> None:
+        """Handle a byte from the computer the way uno.ino does."""
+        # The Uno passes every command through to the Mega
+        self._mega_command(command)
+
+        now = time.monotonic()
+        if now - self.last_command_time < self.debounce:
+            return
+        self.last_command_time = now
+
+        if command == 'N':
+            self.game_active = True
+            if self.reset_pockets_on_new_game:
+                # Stands in for the shutter cycle the backglass would run
+                self._reset_pockets()
+            self._send_line("GAME_STARTED")
+        elif command == 'E':
+            self.game_active = False
+            self._send_line("GAME_ENDED")
+        elif command == 'D':
+            if self.game_active:
+                self._send_line("BALL_REQUESTED")
+                self._mega_command('l')
+            else:
+                self._send_line("GAME_NOT_ACTIVE")
+
+    def _mega_command(self, command: str) -> None:
+        """Handle a byte arriving at the Mega the way Mega.ino does."""
+        if command == '?':
+            self._mega_print("{BingoPlayfield}")
+        elif command == 'h':
+            # Open shutter: all balls drop back into the trough
+            self._reset_pockets()
+        elif command == 'l':
+            self.lift_running = True
+            self._shoot_ball()
+        elif command == '4':
+            self.red_lamp = False
+        elif command == '5':
+            self.red_lamp = True
+        elif command == '6':
+            self.yellow_lamp = False
+        elif command == '7':
+            self.yellow_lamp = True
+
+    # ------------------------------------------------------------------
+    # Playfield simulation
+    # ------------------------------------------------------------------
+
+    def _reset_pockets(self) -> None:
+        """Clear pocket occupancy, as the Mega's reset() does."""
+        self.balls_in_pocket = [0] * 26
+        self.returned = 0
+        self.current_ball = 0
+
+    def _shoot_ball(self) -> None:
+        """Lift a ball, send it through the gate and into a pocket or the return."""
+        self.lift_running = False
+        self.current_ball += 1
+        self._mega_print('z')
+
+        if self.yellow_lamp and self.random.random() < 0.1:
+            self._mega_print('8')
+        if self.red_lamp and self.random.random() < 0.1:
+            self._mega_print('9')
+
+        free = [i for i in range(1, 26) if not self.balls_in_pocket[i]]
+        if not free or self.random.random() < self.return_rate:
+            self.returned += 1
+            self.stats["returns"] += 1
+            self._mega_print('Z')
+            return
+
+        pocket = self.random.choice(free)
+        self.balls_in_pocket[pocket] = 1
+        self.stats["balls"] += 1
+        self._mega_print(BALL_CODES[pocket] + "\r\n")
+
+    def press(self, code: str) -> None:
+        """Simulate a playfield button or switch closing and releasing."""
+        if code not in BUTTON_CODES:
+            raise ValueError(f"Unknown button code: {code}")
+        # waiton() prints '^' with println once the switch is released
+        self._mega_print(code + "^\r\n")
+
+    def drop_ball(self, pocket: Optional[int] = None) -> None:
+        """Put a ball straight into a pocket without a draw command."""
+        if pocket is None:
+            self._shoot_ball()
+            return
+        self.balls_in_pocket[pocket] = 1
+        self.stats["balls"] += 1
+        self._mega_print(BALL_CODES[pocket] + "\r\n")
+
+    # ------------------------------------------------------------------
+    # Emulator -> host
+    # ------------------------------------------------------------------
+
+    def _mega_print(self, text: str) -> None:
+        """Send bytes from the Mega, forwarding them through the Uno in bridge mode."""
+        if self.mode == "mega":
+            self._emit(text.encode('latin-1'))
+            return
+
+        if self.framed_mode:
+            self._frame_mega_print(text)
+            return
+
+        # The Uno forwards each Mega byte raw, then adds its own formatted lines
+        out = bytearray()
+        for ch in text:
+            out += ch.encode('latin-1')
+            if 'A' <= ch <= 'Y':
+                out += f"BALL:{ch}\r\n".encode('latin-1')
+            elif ch == 'z':
+                out += b"BALL_RELEASED\r\n"
+            elif ch == 'Z':
+                out += b"BALL_RETURNED\r\n"
+        self._emit(bytes(out))
+
+    def _frame_mega_print(self, text: str) -> None:
+        """Send Mega bytes as frames: balls reliably, gate events as event codes."""
+        raw = bytearray()
+        for ch in text:
+            if 'A' <= ch <= 'Y':
+                self._send_reliable(FRAME_BALL, ch.encode('latin-1'))
+            elif ch == 'z':
+                self._emit(encode_frame(FRAME_EVENT, 0, bytes((EVENT_CODES["BALL_RELEASED"],))))
+            elif ch == 'Z':
+                self._emit(encode_frame(FRAME_EVENT, 0, bytes((EVENT_CODES["BALL_RETURNED"],))))
+            elif ch not in "\r\n":
+                raw += ch.encode('latin-1')
+        if raw:
+            self._emit(encode_frame(FRAME_RAW, 0, bytes(raw)))
+
+    def _send_reliable(self, frame_type: int, payload: bytes) -> None:
+        """Send a frame that is retransmitted until the host acknowledges it."""
+        with self._pending_lock:
+            self._tx_seq = (self._tx_seq + 1) & 0xFF
+            frame = encode_frame(frame_type, self._tx_seq, payload)
+            self._pending[self._tx_seq] = [frame, time.monotonic() + self.latency, 1]
+        self._emit(frame)
+
+    def _retransmit_loop(self) -> None:
+        """Resend reliable frames the host has not acknowledged in time."""
+        while self._running:
+            time.sleep(self.ack_timeout / 4)
+            now = time.monotonic()
+            if self._confirm_deadline is not None and now > self._confirm_deadline:
+                # The host never confirmed the switch
+                self._revert_to_ascii()
+            with self._pending_lock:
+                for seq, entry in list(self._pending.items()):
+                    frame, sent_at, attempts = entry
+                    if now - sent_at < self.ack_timeout + self.latency + self.jitter:
+                        continue
+                    if attempts > self.max_retries:
+                        del self._pending[seq]
+                        continue
+                    entry[1] = now
+                    entry[2] = attempts + 1
+                    self.stats["retransmits"] += 1
+                    self._emit(frame)
+
+    def _send_line(self, line: str) -> None:
+        """Send a Serial.println() line from the Uno."""
+        if self.framed_mode and line in EVENT_CODES:
+            self._emit(encode_frame(FRAME_EVENT, 0, bytes((EVENT_CODES[line],))))
+            return
+        self._emit((line + "\r\n").encode('latin-1'))
+
+    def _emit(self, data: bytes) -> None:
+        """Queue outgoing bytes with the configured latency, jitter and fragmentation."""
+        now = time.monotonic()
+        due = now + self.latency
+        if self.jitter:
+            due += self.random.uniform(-self.jitter, self.jitter)
+
+        if self.fragment > 0:
+            chunks = []
+            pos = 0
+            while pos < len(data):
+                size = self.random.randint(1, self.fragment)
+                chunks.append(data[pos:pos + size])
+                pos += size
+        else:
+            chunks = [data]
+
+        with self._queue_cond:
+            for chunk in chunks:
+                # Serial lines are FIFO: never let jitter reorder bytes
+                due = max(due, self._last_due)
+                self._last_due = due
+                self._queue_seq += 1
+                heapq.heappush(self._queue, (due, self._queue_seq, chunk))
+            self._queue_cond.notify()
+
+    def _writer_loop(self) -> None:
+        """Write queued bytes to the host when they fall due."""
+        while self._running:
+            with self._queue_cond:
+                while self._running and not self._queue:
+                    self._queue_cond.wait(0.1)
+                if not self._running:
+                    return
+                due, _, chunk = self._queue[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._queue_cond.wait(delay)
+                    continue
+                heapq.heappop(self._queue)
+
+            if self.drop_rate > 0:
+                kept = bytearray()
+                for byte in chunk:
+                    if self.random.random() < self.drop_rate:
+                        self.stats["bytes_dropped"] += 1
+                    else:
+                        kept.append(byte)
+                chunk = bytes(kept)
+            if not chunk:
+                continue
+
+            try:
+                os.write(self.master_fd, chunk)
+            except OSError:
+                continue
+            self.stats["bytes_out"] += len(chunk)
+            self.stats["writes"] += 1
+
+            if self.pace:
+                # 10 bits per byte on an 8N1 line
+                time.sleep(len(chunk) * 10.0 / self.baudrate)
+
+
+def emulator_from_settings(options: Dict) -> ArduinoEmulator:
+    """Build an emulator from the serial.emulator block of settings.json."""
+    return ArduinoEmulator(
+        mode=options.get('mode', "bridge"),
+        latency=options.get('latency', 0.0),
+        jitter=options.get('jitter', 0.0),
+        fragment=options.get('fragment', 0),
+        drop_rate=options.get('drop_rate', 0.0),
+        baudrate=options.get('baudrate', 9600),
+        pace=options.get('pace', False),
+        debounce=options.get('debounce', 0.5),
+        return_rate=options.get('return_rate', 0.0),
+        seed=options.get('seed'),
+        framed=options.get('framed', True),
+    )
+
+
+def run_load_test(emulator: ArduinoEmulator, draws: int, games: int, rate: float,
+                  metrics_file: Optional[str] = None) -> Dict:
+    """Drive ArduinoBridge and process_arduino_message against the emulator."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main
+
+    main.settings = main.load_settings()
+    main.settings['serial']['auto_detect'] = False
+    main.settings['serial']['emulate'] = False
+    main.settings['serial']['negotiate_timeout'] = 0.5
+    main.settings['audio']['enabled'] = False
+    main.sound_manager = main.SoundManager()
+    main.session = main.GameSession()
+    bridge = main.ArduinoBridge(emulator.port, emulator.baudrate, 0)
+    main.arduino_bridge = bridge
+    if not bridge.is_connected():
+        raise RuntimeError(f"Could not open emulator port {emulator.port}")
+    while bridge.protocol == "negotiating":
+        main.process_arduino_message(bridge.read_message())
+        time.sleep(0.001)
+
+    interval = 1.0 / rate if rate > 0 else 0.0
+    settle = 0.5 + emulator.latency + emulator.jitter
+    requested = 0
+    received = 0
+    start = time.perf_counter()
+
+    for _ in range(games):
+        main.session = main.GameSession()
+        main.session.player_cards = [main.BingoCard()]
+        bridge.start_game()
+        deadline = time.monotonic() + settle
+        while not main.session.active and time.monotonic() < deadline:
+            main.process_arduino_message(bridge.read_message())
+            time.sleep(0.001)
+
+        game_requested = 0
+        next_draw = time.monotonic()
+        last_activity = next_draw
+        while len(main.session.balls_drawn) < draws:
+            now = time.monotonic()
+            if game_requested < draws and now >= next_draw:
+                bridge.send_command("D")
+                game_requested += 1
+                next_draw = now + interval
+            message = bridge.read_message()
+            if message:
+                main.process_arduino_message(message)
+                last_activity = now
+            elif game_requested >= draws and now - last_activity > settle:
+                # Everything still outstanding was lost on the wire
+                break
+            time.sleep(0.0005)
+
+        requested += game_requested
+        received += len(main.session.balls_drawn)
+        bridge.end_game()
+
+    elapsed = time.perf_counter() - start
+    bridge.close()
+    if metrics_file:
+        main.metrics.dump(metrics_file)
+    round_trip = main.metrics.snapshot()["histograms"].get("serial.draw_round_trip_ms", {})
+    return {
+        "games": games,
+        "draws_requested": requested,
+        "balls_received": received,
+        "elapsed_s": round(elapsed, 3),
+        "balls_per_s": round(received / elapsed, 1) if elapsed else 0.0,
+        "protocol": bridge.protocol,
+        "draw_round_trip_ms": {k: round_trip.get(k) for k in ("p50", "p90", "p99", "max")},
+        "wire": dict(emulator.stats),
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Emulate the bingo Uno/Mega serial protocol on a pty")
+    parser.add_argument("--mode", choices=["bridge", "mega"], default="bridge")
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter in seconds")
+    parser.add_argument("--fragment", type=int, default=0, help="max bytes per write (0 = unfragmented)")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability of dropping each byte")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--pace", action="store_true", help="throttle output to the baud rate")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Uno command debounce in seconds")
+    parser.add_argument("--return-rate", type=float, default=0.0, help="probability of a returned ball")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--legacy", action="store_true", help="only speak the ASCII line protocol")
+    parser.add_argument("--load-test", type=int, default=0, metavar="DRAWS",
+                        help="draw this many balls per game through ArduinoBridge and report")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=0.0, help="draw commands per second (0 = flat out)")
+    parser.add_argument("--metrics-file", default=None, help="dump the bridge metrics registry here")
+    args = parser.parse_args()
+
+    emulator = ArduinoEmulator(
+        mode=args.mode,
+        latency=args.latency,
+        jitter=args.jitter,
+        fragment=args.fragment,
+        drop_rate=args.drop,
+        baudrate=args.baudrate,
+        pace=args.pace,
+        debounce=args.debounce,
+        return_rate=args.return_rate,
+        seed=args.seed,
+        framed=not args.legacy,
+    )
+    port = emulator.start()
+
+    if args.load_test:
+        try:
+            results = run_load_test(emulator, args.load_test, args.games, args.rate, args.metrics_file)
+        finally:
+            emulator.stop()
+        for key, value in results.items():
+            print(f"{key}: {value}")
+        return
+
+    print(f"Emulating Arduino {args.mode} on {port}")
+    print("Set serial.port to this path in settings.json. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
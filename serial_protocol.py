@@ -0,0 +1,183 @@
+"""
+Framed Serial Protocol
+----------------------
+Version 1 of the compact binary frame format spoken between the game and the
+Arduino Uno bridge, shared by main.py and serial_emulator.py.
+
+Frame layout (all multi-byte fields big-endian):
+
+    SOF (0xA5) | VERSION | TYPE | SEQ | LEN | PAYLOAD[LEN] | CRC16
+
+The CRC is CRC-16/CCITT-FALSE over VERSION..PAYLOAD. Legacy ASCII lines never
+contain 0xA5, so framed and legacy traffic can share a stream while the two
+ends negotiate.
+"""
+
+import struct
+from typing import Dict, List, Optional, Tuple
+
+FRAME_SOF = 0xA5
+FRAME_VERSION = 1
+FRAME_HEADER_SIZE = 5       # SOF, version, type, seq, length
+FRAME_CRC_SIZE = 2
+FRAME_MAX_PAYLOAD = 64
+
+# Frame types (FRAME_TEXT never goes on the wire; it marks legacy bytes in decoder output)
+FRAME_TEXT = 0x00
+FRAME_HELLO = 0x01          # host -> bridge: version, requested baud rate (u32)
+FRAME_HELLO_ACK = 0x02      # bridge -> host: version, agreed baud rate (u32)
+FRAME_ACK = 0x03            # either way: sequence number being acknowledged
+FRAME_COMMAND = 0x10        # host -> bridge: one legacy command byte (reliable)
+FRAME_BALL = 0x20           # bridge -> host: Mega ball code 'A'-'Y' (reliable)
+FRAME_EVENT = 0x21          # bridge -> host: one event code from FRAME_EVENTS
+FRAME_RAW = 0x22            # bridge -> host: other bytes printed by the Mega
+
+# Frames the receiver must acknowledge; the sender retransmits until it does
+RELIABLE_FRAMES = (FRAME_COMMAND, FRAME_BALL)
+
+# Event codes carried by FRAME_EVENT and the legacy lines they replace
+FRAME_EVENTS: Dict[int, str] = {
+    1: "BINGO_BRIDGE_READY",
+    2: "GAME_STARTED",
+    3: "GAME_ENDED",
+    4: "BALL_REQUESTED",
+    5: "GAME_NOT_ACTIVE",
+    6: "BALL_RELEASED",
+    7: "BALL_RETURNED",
+}
+EVENT_CODES: Dict[str, int] = {line: code for code, line in FRAME_EVENTS.items()}
+
+# Bytes the legacy sketches act on when they arrive outside a frame: uno.ino
+# handles N/E/D and forwards every byte to Mega.ino, which handles the rest
+LEGACY_COMMAND_BYTES = frozenset(b"NED?hil4567")
+
+
+def _make_crc_table() -> List[int]:
+    """Build the lookup table for CRC-16/CCITT-FALSE (polynomial 0x1021)."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """Compute the CRC-16/CCITT-FALSE of data."""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+def encode_frame(frame_type: int, seq: int, payload: bytes = b"") -> bytes:
+    """Encode a single frame."""
+    if len(payload) > FRAME_MAX_PAYLOAD:
+        raise ValueError(f"Frame payload too long: {len(payload)} bytes")
+    body = bytes((FRAME_VERSION, frame_type, seq & 0xFF, len(payload))) + payload
+    return bytes((FRAME_SOF,)) + body + struct.pack(">H", crc16(body))
+
+
+def encode_hello(baudrate: int, frame_type: int = FRAME_HELLO) -> bytes:
+    """Encode a HELLO (or HELLO_ACK) frame announcing a baud rate.
+
+    A HELLO reaches bridges running legacy firmware too, so a baud rate whose
+    frame holds one of LEGACY_COMMAND_BYTES (9600 does: its CRC has a '5',
+    the Mega's red lamp command) raises ValueError.
+    """
+    frame = encode_frame(frame_type, 0, struct.pack(">BI", FRAME_VERSION, baudrate))
+    unsafe = sorted(set(frame) & LEGACY_COMMAND_BYTES)
+    if frame_type == FRAME_HELLO and unsafe:
+        raise ValueError(f"a HELLO for {baudrate} baud contains {bytes(unsafe)!r}, which legacy sketches act on")
+    return frame
+
+
+def decode_hello(payload: bytes) -> Tuple[int, int]:
+    """Return (version, baudrate) from a HELLO or HELLO_ACK payload."""
+    return struct.unpack(">BI", payload[:5])
+
+
+class FrameDecoder:
+    """Splits a byte stream into frames and the legacy bytes between them."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.crc_errors = 0
+        self.version_errors = 0
+
+    def feed(self, data: bytes) -> List[Tuple[int, int, bytes]]:
+        """Add received bytes and return complete (type, seq, payload) items in stream order.
+
+        Bytes outside any frame are returned as FRAME_TEXT items.
+        """
+        self.buffer += data
+        frames = []
+
+        while self.buffer:
+            sof = self.buffer.find(FRAME_SOF)
+            if sof < 0:
+                frames.append((FRAME_TEXT, 0, bytes(self.buffer)))
+                self.buffer.clear()
+                break
+            if sof:
+                frames.append((FRAME_TEXT, 0, bytes(self.buffer[:sof])))
+                del self.buffer[:sof]
+
+            if len(self.buffer) < FRAME_HEADER_SIZE:
+                break
+            length = self.buffer[4]
+            total = FRAME_HEADER_SIZE + length + FRAME_CRC_SIZE
+            if length > FRAME_MAX_PAYLOAD:
+                # Can't be a real frame: drop the SOF and resynchronise
+                self.crc_errors += 1
+                del self.buffer[0]
+                continue
+            if len(self.buffer) < total:
+                break
+
+            body = bytes(self.buffer[1:FRAME_HEADER_SIZE + length])
+            (received_crc,) = struct.unpack(">H", self.buffer[FRAME_HEADER_SIZE + length:total])
+            if crc16(body) != received_crc:
+                self.crc_errors += 1
+                del self.buffer[0]
+                continue
+            del self.buffer[:total]
+
+            if body[0] != FRAME_VERSION:
+                self.version_errors += 1
+                continue
+            frames.append((body[1], body[2], body[4:]))
+
+        return frames
+
+
+class SequenceWindow:
+    """Remembers recently seen sequence numbers so retransmissions are ignored."""
+
+    def __init__(self, size: int = 32):
+        self.size = size
+        self.recent: List[int] = []
+
+    def seen(self, seq: int) -> bool:
+        """Record seq and return True if it was already seen."""
+        if seq in self.recent:
+            return True
+        self.recent.append(seq)
+        if len(self.recent) > self.size:
+            self.recent.pop(0)
+        return False
+
+
+def frame_to_line(frame_type: int, payload: bytes) -> Optional[str]:
+    """Translate a bridge frame into the legacy text it replaces."""
+    if frame_type in (FRAME_TEXT, FRAME_RAW):
+        return payload.decode('latin-1')
+    if frame_type == FRAME_BALL and payload:
+        return f"BALL:{chr(payload[0])}\n"
+    if frame_type == FRAME_EVENT and payload:
+        line = FRAME_EVENTS.get(payload[0])
+        return f"{line}\n" if line else None
+    return None
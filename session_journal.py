@@ -0,0 +1,247 @@
+"""
+Session Journal
+---------------
+An append-only binary log of game state transitions (new game, drawn ball,
+win, end of game) used to restore an in-progress game after a crash or power
+loss.
+
+Records are written by a background thread that fsyncs once per batch, so
+the game loop only enqueues. The file is restarted at every new game; the
+journal only has to cover the game in progress. A restarted journal is
+written to a temporary file that replaces the old one once it is fsynced,
+so a crash leaves either the old journal or the new one on disk, never
+neither.
+
+File layout: MAGIC, then records of
+
+    TYPE (u8) | LENGTH (u16) | PAYLOAD[LENGTH] | CRC32 (u32)
+
+all little-endian, the CRC covering TYPE..PAYLOAD. Replay stops at the first
+truncated or corrupt record, which is where a crash interrupted a write.
+"""
+
+import os
+import time
+import queue
+import struct
+import zlib
+import threading
+from typing import Dict, Optional, Sequence
+
+from metrics import metrics
+from win_patterns import PATTERNS as PATTERN_CODES
+
+MAGIC = b"BJNL\x01"
+
+RECORD_NEW_GAME = 1     # game id (16 bytes), pattern, card count, draw order, cards
+RECORD_BALL = 2         # drawn number
+RECORD_WIN = 3          # card index, pattern
+RECORD_END_GAME = 4     # won flag
+
+_HEADER = struct.Struct("<BH")
+_CRC = struct.Struct("<I")
+
+
+def encode_record(record_type: int, payload: bytes) -> bytes:
+    """Encode one journal record."""
+    body = _HEADER.pack(record_type, len(payload)) + payload
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def encode_new_game(game_id: Optional[str], pattern: str, draw_order: Sequence[int],
+                    cards: Sequence[Sequence[int]]) -> bytes:
+    """Encode a NEW_GAME record from the deck's planned order and each card's 25 numbers."""
+    game_bytes = bytes.fromhex(game_id) if game_id else bytes(16)
+    payload = bytearray(game_bytes)
+    payload.append(PATTERN_CODES.index(pattern) if pattern in PATTERN_CODES else 255)
+    payload.append(len(cards))
+    payload.append(len(draw_order))
+    payload += bytes(draw_order)
+    for numbers in cards:
+        payload += bytes(numbers)
+    return encode_record(RECORD_NEW_GAME, bytes(payload))
+
+
+def _decode_new_game(payload: bytes) -> Dict:
+    """Decode a NEW_GAME payload."""
+    game_bytes = payload[:16]
+    pattern_code, card_count, order_length = payload[16], payload[17], payload[18]
+    offset = 19 + order_length
+    cards = [list(payload[offset + i * 25:offset + (i + 1) * 25]) for i in range(card_count)]
+    return {
+        "game_id": game_bytes.hex() if any(game_bytes) else None,
+        "pattern": PATTERN_CODES[pattern_code] if pattern_code < len(PATTERN_CODES) else None,
+        "draw_order": list(payload[19:offset]),
+        "cards": cards,
+        "draws": [],
+        "wins": [],
+        "ended": False,
+        "won": False,
+    }
+
+
+def read_journal(path: str) -> Optional[Dict]:
+    """Replay a journal file and return the last game it describes, or None."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if not data.startswith(MAGIC):
+        return None
+
+    game = None
+    offset = len(MAGIC)
+    while offset + _HEADER.size <= len(data):
+        record_type, length = _HEADER.unpack_from(data, offset)
+        end = offset + _HEADER.size + length
+        if end + _CRC.size > len(data):
+            break
+        (crc,) = _CRC.unpack_from(data, end)
+        if zlib.crc32(data[offset:end]) != crc:
+            metrics.inc("journal.corrupt_records")
+            break
+        payload = data[offset + _HEADER.size:end]
+        offset = end + _CRC.size
+
+        if record_type == RECORD_NEW_GAME:
+            game = _decode_new_game(payload)
+        elif game is None:
+            continue
+        elif record_type == RECORD_BALL:
+            game["draws"].append(payload[0])
+        elif record_type == RECORD_WIN:
+            game["wins"].append((payload[0], PATTERN_CODES[payload[1]] if payload[1] < len(PATTERN_CODES) else None))
+        elif record_type == RECORD_END_GAME:
+            game["ended"] = True
+            game["won"] = bool(payload[0])
+    return game
+
+
+class SessionJournal:
+    """Appends journal records from a background thread with batched fsync."""
+
+    def __init__(self, path: str, sync_interval: float = 0.05):
+        self.path = path
+        self.sync_interval = sync_interval    # seconds to gather records into one fsync
+        self._queue = queue.Queue()
+        self._stop = object()
+        self._file = None
+        self._replacing = False     # self._file is the temporary file of a restarted journal
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def new_game(self, game_id: Optional[str], pattern: str, draw_order: Sequence[int],
+                 cards: Sequence[Sequence[int]], draws: Sequence[int] = ()) -> None:
+        """Start a fresh journal for a new game, with the balls already drawn when restoring one."""
+        record = encode_new_game(game_id, pattern, draw_order, cards)
+        record += b"".join(encode_record(RECORD_BALL, bytes((number,))) for number in draws)
+        self._queue.put((True, record))
+
+    def ball(self, number: int) -> None:
+        """Log a drawn ball."""
+        self._queue.put((False, encode_record(RECORD_BALL, bytes((number,)))))
+
+    def win(self, card_index: int, pattern: str) -> None:
+        """Log a winning card."""
+        code = PATTERN_CODES.index(pattern) if pattern in PATTERN_CODES else 255
+        self._queue.put((False, encode_record(RECORD_WIN, bytes((card_index, code)))))
+
+    def end_game(self, won: bool) -> None:
+        """Log the end of the game."""
+        self._queue.put((False, encode_record(RECORD_END_GAME, bytes((int(won),)))))
+
+    def _open(self, truncate: bool) -> None:
+        """Open the journal file, or a temporary file to replace it when truncate is set."""
+        if self._file is not None:
+            self._file.close()
+        if truncate or not os.path.exists(self.path):
+            self._file = open(self.path + ".tmp", 'wb')
+            self._file.write(MAGIC)
+            self._replacing = True
+        else:
+            self._file = open(self.path, 'ab')
+            self._replacing = False
+
+    def _replace(self) -> None:
+        """Move the synced temporary journal over the old one and keep appending to it."""
+        temp_path = self.path + ".tmp"
+        # Windows can't rename a file that is still open
+        self._file.close()
+        self._file = None
+        self._replacing = False
+        try:
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            # Rather than retrying every batch, fall back to rewriting the journal in place
+            metrics.inc("journal.errors")
+            print(f"Could not replace session journal ({e}) - rewriting it in place")
+            with open(temp_path, 'rb') as f:
+                data = f.read()
+            with open(self.path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            if os.name != 'nt':
+                # Make the rename itself durable
+                directory = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+                try:
+                    os.fsync(directory)
+                finally:
+                    os.close(directory)
+        self._file = open(self.path, 'ab')
+
+    def _write_loop(self) -> None:
+        """Write queued records, fsyncing once per batch."""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.sync_interval
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            markers = [item for item in batch if isinstance(item, threading.Event)]
+            if self._stop in batch:
+                running = False
+            records = [item for item in batch if isinstance(item, tuple)]
+
+            if records:
+                started = time.perf_counter()
+                try:
+                    for restart, record in records:
+                        if restart or self._file is None:
+                            self._open(restart)
+                        self._file.write(record)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    if self._replacing:
+                        self._replace()
+                    metrics.inc("journal.syncs")
+                    metrics.inc("journal.records", len(records))
+                    metrics.observe("journal.sync_ms", (time.perf_counter() - started) * 1000)
+                except OSError as e:
+                    metrics.inc("journal.errors")
+                    print(f"Error writing session journal: {e}")
+            for marker in markers:
+                marker.set()
+
+        if self._file is not None:
+            self._file.close()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is on disk."""
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self) -> None:
+        """Write pending records and stop the writer thread."""
+        self._queue.put(self._stop)
+        self._writer.join(timeout=10.0)
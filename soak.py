@@ -0,0 +1,234 @@
+"""
+Soak Test
+---------
+Runs the game's main loop headless, at accelerated time, through thousands of
+new game / draw / end game cycles and checks that memory stays flat.
+
+    python soak.py --games 2000 --speed 500
+    python soak.py --games 500 --emulate
+
+The menu is driven with the same key presses a player would use. After every
+--sample-every games the soak records RSS, tracemalloc's traced memory, the
+number of live pygame surfaces and the frame times since the last sample.
+Samples taken after --warmup games (once caches have filled) are compared: if
+memory or the surface count keeps growing from one game to the next the run
+fails with exit code 1 and the allocators that grew the most are listed.
+
+Statistics and the session journal go to a temporary directory, audio is off
+and the game's own console output is hidden unless --verbose is given.
+"""
+
+import os
+import sys
+import gc
+import time
+import argparse
+import tempfile
+import statistics
+import contextlib
+import tracemalloc
+from typing import Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+import pygame
+import main
+
+
+def rss_kb() -> int:
+    """Resident set size of this process in KB (the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return 0
+
+
+def count_surfaces() -> int:
+    """Count the pygame surfaces referenced from Python objects.
+
+    Surfaces are not tracked by the garbage collector themselves, so look for
+    them among the referents of every object that is.
+    """
+    seen = set()
+    for obj in gc.get_objects():
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, pygame.Surface):
+                seen.add(id(referent))
+    return len(seen)
+
+
+def growth(samples: List[Dict], key: str) -> float:
+    """Change in a sampled value between the first and last thirds of the samples (medians)."""
+    third = max(1, len(samples) // 3)
+    return (statistics.median(s[key] for s in samples[-third:])
+            - statistics.median(s[key] for s in samples[:third]))
+
+
+class SoakMonitor:
+    """Frame hook for main(): starts games from the menu and samples memory between them."""
+
+    def __init__(self, games: int, sample_every: int, warmup: int, out=sys.stdout):
+        self.games = games
+        self.sample_every = sample_every
+        self.warmup = warmup
+        self.out = out
+        self.games_done = 0
+        self.frames = 0
+        self.samples: List[Dict] = []
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.final: Optional[tracemalloc.Snapshot] = None
+        self.started = time.perf_counter()
+        self._playing = False
+        self._waiting = False       # a key press is posted and has not taken effect yet
+        self._frame_started = self.started
+        self._frame_times: List[float] = []
+
+    def __call__(self, in_menu: bool) -> None:
+        now = time.perf_counter()
+        self._frame_times.append((now - self._frame_started) * 1000)
+        self._frame_started = now
+        self.frames += 1
+
+        if in_menu:
+            if self._playing:
+                self._playing = False
+                self._waiting = False
+                self.games_done += 1
+                if self.games_done % self.sample_every == 0 or self.games_done == self.games:
+                    self.sample()
+            if self.games_done >= self.games:
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
+            elif not self._waiting:
+                # "New Game" is the selected menu option
+                self._press(pygame.K_RETURN)
+        else:
+            if not self._playing:
+                self._playing = True
+                self._waiting = False
+            if not main.session.active and not self._waiting:
+                # Every ball drawn without a win: leave the game over screen
+                self._press(pygame.K_ESCAPE)
+
+    def _press(self, key: int) -> None:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+        self._waiting = True
+
+    def sample(self) -> None:
+        """Record memory, surfaces and frame times at the end of a game."""
+        gc.collect()
+        frame_times = sorted(self._frame_times) or [0.0]
+        self._frame_times = []
+        sample = {
+            "games": self.games_done,
+            "rss_kb": rss_kb(),
+            "traced_kb": tracemalloc.get_traced_memory()[0] / 1024 if tracemalloc.is_tracing() else 0.0,
+            "surfaces": count_surfaces(),
+            "frame_ms_median": statistics.median(frame_times),
+            "frame_ms_max": frame_times[-1],
+        }
+        self.samples.append(sample)
+        if tracemalloc.is_tracing():
+            if self.baseline is None and self.games_done >= self.warmup:
+                self.baseline = tracemalloc.take_snapshot()
+            self.final = tracemalloc.take_snapshot()
+        print(f"games {sample['games']:6}  rss {sample['rss_kb']:8} KB  traced {sample['traced_kb']:9.1f} KB  "
+              f"surfaces {sample['surfaces']:5}  frame {sample['frame_ms_median']:.2f} ms "
+              f"(max {sample['frame_ms_max']:.2f})", file=self.out, flush=True)
+        # Sampling is not part of the next frame
+        self._frame_started = time.perf_counter()
+
+    def top_allocators(self, limit: int = 10) -> List[str]:
+        """The source lines whose allocations grew the most since the warmup."""
+        if self.baseline is None or self.final is None or self.final is self.baseline:
+            return []
+        stats = self.final.compare_to(self.baseline, "lineno")
+        return [str(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+
+def soak_settings(directory: str, emulate: bool) -> Dict:
+    """Settings that keep a soak run away from the cabinet's data, sound and hardware."""
+    return {
+        "serial": {"auto_detect": False, "emulate": emulate, "emulator": {"debounce": 0.0},
+                   "port": os.path.join(directory, "no-arduino")},
+        "display": {"fullscreen": False},
+        "audio": {"enabled": False},
+        "stats": {"database": os.path.join(directory, "stats.db")},
+        "journal": {"path": os.path.join(directory, "session.journal")},
+        "broadcast": {"enabled": False},
+        "metrics": {"http_port": 0, "dump_file": ""},
+    }
+
+
+def main_cli() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Soak test the game loop at accelerated time")
+    parser.add_argument("--games", type=int, default=1000, help="games to play")
+    parser.add_argument("--speed", type=float, default=1000.0, help="game time per real time")
+    parser.add_argument("--emulate", action="store_true",
+                        help="play through the serial emulator instead of the fallback mode")
+    parser.add_argument("--sample-every", type=int, default=50, help="games between samples")
+    parser.add_argument("--warmup", type=int, default=50, help="games before growth is measured")
+    parser.add_argument("--max-rss-growth", type=float, default=8192, help="KB of RSS growth allowed")
+    parser.add_argument("--max-traced-growth", type=float, default=256,
+                        help="KB of tracemalloc growth allowed")
+    parser.add_argument("--max-surface-growth", type=int, default=16, help="extra live surfaces allowed")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip tracemalloc (runs faster)")
+    parser.add_argument("--verbose", action="store_true", help="show the game's own output")
+    args = parser.parse_args()
+
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    monitor = SoakMonitor(args.games, args.sample_every, args.warmup)
+    with tempfile.TemporaryDirectory(prefix="bingo-soak-") as directory:
+        quiet = open(os.devnull, "w") if not args.verbose else None
+        try:
+            with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+                main.main(overrides=soak_settings(directory, args.emulate), speed=args.speed, frame_hook=monitor)
+        except SystemExit:
+            pass
+        finally:
+            if quiet:
+                quiet.close()
+
+    measured = [sample for sample in monitor.samples if sample["games"] >= args.warmup]
+    results = {
+        "games": monitor.games_done,
+        "frames": monitor.frames,
+        "elapsed_s": round(time.perf_counter() - monitor.started, 1),
+        "samples": len(measured),
+    }
+    failures = []
+    if len(measured) >= 2:
+        for key, limit in (("rss_kb", args.max_rss_growth), ("traced_kb", args.max_traced_growth),
+                           ("surfaces", args.max_surface_growth)):
+            results[f"{key}_growth"] = round(growth(measured, key), 1)
+            if results[f"{key}_growth"] > limit:
+                failures.append(f"{key} grew by {results[f'{key}_growth']} (limit {limit})")
+    else:
+        failures.append("too few samples after the warmup to measure growth")
+    if monitor.samples:
+        results["frame_ms_median"] = round(statistics.median(s["frame_ms_median"] for s in monitor.samples), 2)
+        results["frame_ms_max"] = round(max(s["frame_ms_max"] for s in monitor.samples), 2)
+
+    print()
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        for line in monitor.top_allocators():
+            print(f"  {line}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
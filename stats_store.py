@@ -0,0 +1,229 @@
+"""
+Statistics Store
+----------------
+Persistent player and cabinet statistics, game outcomes and draw histories in
+an embedded SQLite database (WAL mode).
+
+Writes are queued and applied by a background thread that groups everything
+queued within a short window into one transaction, so the game loop never
+waits on disk I/O. Reads use their own connection; WAL lets them run while the
+writer is committing.
+"""
+
+import time
+import uuid
+import queue
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    score INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_players_score ON players (score DESC);
+CREATE INDEX IF NOT EXISTS idx_players_wins ON players (wins DESC);
+CREATE INDEX IF NOT EXISTS idx_players_games ON players (games_played DESC);
+
+CREATE TABLE IF NOT EXISTS cabinets (
+    cabinet_id TEXT PRIMARY KEY,
+    wins INTEGER NOT NULL DEFAULT 0,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    balls_drawn INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    player_id TEXT NOT NULL,
+    cabinet_id TEXT NOT NULL,
+    pattern TEXT,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    won INTEGER,
+    score_delta INTEGER NOT NULL DEFAULT 0,
+    balls_drawn INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_games_player ON games (player_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_games_cabinet ON games (cabinet_id, started_at);
+
+CREATE TABLE IF NOT EXISTS draws (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    drawn_at REAL NOT NULL,
+    PRIMARY KEY (game_id, seq)
+) WITHOUT ROWID;
+"""
+
+LEADERBOARD_COLUMNS = ("score", "wins", "games_played")
+
+
+class StatsStore:
+    """SQLite statistics database with a group-committing write-behind queue."""
+
+    def __init__(self, path: str, commit_interval: float = 0.25, max_batch: int = 500):
+        self.path = path
+        self.commit_interval = commit_interval    # seconds to gather writes into one transaction
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stop = object()
+
+        # Create the schema before the writer starts so readers never see a missing table
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        connection.close()
+
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name="stats-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode."""
+        connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # Writes (queued)
+
+    def start_game(self, player_id: str, cabinet_id: str, pattern: str) -> str:
+        """Record the start of a game and return its id."""
+        game_id = uuid.uuid4().hex
+        now = time.time()
+        self._queue.put([
+            ("INSERT INTO games (game_id, player_id, cabinet_id, pattern, started_at) VALUES (?, ?, ?, ?, ?)",
+             (game_id, player_id, cabinet_id, pattern, now)),
+            ("INSERT INTO players (player_id, games_played, updated_at) VALUES (?, 1, ?) "
+             "ON CONFLICT (player_id) DO UPDATE SET games_played = games_played + 1, updated_at = excluded.updated_at",
+             (player_id, now)),
+            ("INSERT INTO cabinets (cabinet_id, games_played, updated_at) VALUES (?, 1, ?) "
+             "ON CONFLICT (cabinet_id) DO UPDATE SET games_played = games_played + 1, updated_at = excluded.updated_at",
+             (cabinet_id, now)),
+        ])
+        return game_id
+
+    def record_draw(self, game_id: str, seq: int, number: int) -> None:
+        """Record a drawn ball."""
+        self._queue.put([
+            ("INSERT OR IGNORE INTO draws (game_id, seq, number, drawn_at) VALUES (?, ?, ?, ?)",
+             (game_id, seq, number, time.time())),
+        ])
+
+    def end_game(self, game_id: str, player_id: str, cabinet_id: str, won: bool,
+                 score_delta: int, balls_drawn: int) -> None:
+        """Record a game's outcome and add it to the player and cabinet totals."""
+        now = time.time()
+        self._queue.put([
+            ("UPDATE games SET ended_at = ?, won = ?, score_delta = ?, balls_drawn = ? WHERE game_id = ?",
+             (now, int(won), score_delta, balls_drawn, game_id)),
+            ("UPDATE players SET score = score + ?, wins = wins + ?, updated_at = ? WHERE player_id = ?",
+             (score_delta, int(won), now, player_id)),
+            ("UPDATE cabinets SET wins = wins + ?, balls_drawn = balls_drawn + ?, updated_at = ? "
+             "WHERE cabinet_id = ?",
+             (int(won), balls_drawn, now, cabinet_id)),
+        ])
+
+    def _write_loop(self) -> None:
+        """Apply queued writes, committing each group in a single transaction."""
+        connection = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Flush markers are set once everything queued before them is committed
+            markers = [item for item in batch if isinstance(item, threading.Event)]
+            if self._stop in batch:
+                running = False
+            batch = [item for item in batch if isinstance(item, list) and item]
+
+            if batch:
+                started = time.perf_counter()
+                try:
+                    with connection:
+                        for statements in batch:
+                            for sql, params in statements:
+                                connection.execute(sql, params)
+                    metrics.inc("stats.commits")
+                    metrics.inc("stats.writes", len(batch))
+                    metrics.observe("stats.commit_ms", (time.perf_counter() - started) * 1000)
+                except sqlite3.Error as e:
+                    metrics.inc("stats.errors")
+                    print(f"Error writing statistics: {e}")
+            for marker in markers:
+                marker.set()
+        connection.close()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been committed."""
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self) -> None:
+        """Commit pending writes and stop the writer thread."""
+        self._queue.put(self._stop)
+        self._writer.join(timeout=10.0)
+        self._reader.close()
+
+    # Reads
+
+    def player_stats(self, player_id: str) -> Dict:
+        """Return a player's totals (zero for unknown players)."""
+        row = self._reader.execute(
+            "SELECT score, wins, games_played FROM players WHERE player_id = ?", (player_id,)
+        ).fetchone()
+        score, wins, games_played = row or (0, 0, 0)
+        return {"player_id": player_id, "score": score, "wins": wins, "games_played": games_played}
+
+    def leaderboard(self, order_by: str = "score", limit: int = 10) -> List[Dict]:
+        """Return the top players by score, wins or games played."""
+        if order_by not in LEADERBOARD_COLUMNS:
+            raise ValueError(f"Unknown leaderboard column: {order_by}")
+        rows = self._reader.execute(
+            f"SELECT player_id, score, wins, games_played FROM players ORDER BY {order_by} DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(zip(("player_id", "score", "wins", "games_played"), row)) for row in rows]
+
+    def recent_games(self, player_id: str, limit: int = 10) -> List[Dict]:
+        """Return a player's most recent games, newest first."""
+        rows = self._reader.execute(
+            "SELECT game_id, cabinet_id, pattern, started_at, ended_at, won, score_delta, balls_drawn "
+            "FROM games WHERE player_id = ? ORDER BY started_at DESC LIMIT ?",
+            (player_id, limit)
+        ).fetchall()
+        keys = ("game_id", "cabinet_id", "pattern", "started_at", "ended_at", "won", "score_delta", "balls_drawn")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def draw_history(self, game_id: str) -> List[int]:
+        """Return the numbers drawn in a game, in order."""
+        rows = self._reader.execute(
+            "SELECT number FROM draws WHERE game_id = ? ORDER BY seq", (game_id,)
+        ).fetchall()
+        return [number for (number,) in rows]
+
+    def cabinet_stats(self, cabinet_id: str) -> Optional[Dict]:
+        """Return a cabinet's totals, or None if it has not played yet."""
+        row = self._reader.execute(
+            "SELECT wins, games_played, balls_drawn FROM cabinets WHERE cabinet_id = ?", (cabinet_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"cabinet_id": cabinet_id, "wins": row[0], "games_played": row[1], "balls_drawn": row[2]}
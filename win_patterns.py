@@ -0,0 +1,166 @@
+"""
+Win Patterns
+------------
+Winning line definitions shared by the game and by offline tools, plus a
+resolver that works out when every card wins from a draw order known up front
+(electronic halls, replays, simulations) without stepping through the draws.
+
+Cards are 5x5 grids indexed [col][row], as in BingoCard. Cell 0 is the FREE
+space and counts as marked before the first ball.
+
+numpy is used when it is installed; otherwise the same computation runs in
+plain Python.
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GRID_SIZE = 5
+FREE = 0
+
+# Cells of each winning line as flat indices (col * 5 + row)
+WIN_LINES: Dict[str, List[List[int]]] = {
+    "horizontal": [[col * GRID_SIZE + row for col in range(GRID_SIZE)] for row in range(GRID_SIZE)],
+    "vertical": [[col * GRID_SIZE + row for row in range(GRID_SIZE)] for col in range(GRID_SIZE)],
+    "diagonal": [
+        [i * GRID_SIZE + i for i in range(GRID_SIZE)],
+        [i * GRID_SIZE + (GRID_SIZE - 1 - i) for i in range(GRID_SIZE)],
+    ],
+    "four_corners": [[0, GRID_SIZE - 1, (GRID_SIZE - 1) * GRID_SIZE, GRID_SIZE * GRID_SIZE - 1]],
+    "full_card": [list(range(GRID_SIZE * GRID_SIZE))],
+}
+
+# Patterns that "any" accepts (full card is a separate game)
+ANY_PATTERNS = ["horizontal", "vertical", "diagonal", "four_corners"]
+
+PATTERNS = list(WIN_LINES) + ["any"]
+
+
+def random_card_numbers(rng=random) -> List[int]:
+    """Deal a card's 25 numbers in [col][row] order following Belgian bingo rules.
+
+    Column c holds 5 distinct numbers from 15c+1..15c+15 (B 1-15 ... O 61-75),
+    with the FREE space in the middle of the N column.
+    """
+    numbers = []
+    for col in range(GRID_SIZE):
+        start = col * 15 + 1
+        column_numbers = rng.sample(range(start, start + 15), GRID_SIZE)
+        if col == 2:
+            column_numbers[2] = FREE
+        numbers.extend(column_numbers)
+    return numbers
+
+
+def card_numbers(card) -> List[int]:
+    """Flatten a card into 25 numbers in [col][row] order.
+
+    Accepts a BingoCard (anything with a grid of cells that have .number),
+    a plain 5x5 list of numbers or an already flat list of 25.
+    """
+    grid = getattr(card, "grid", card)
+    if grid and isinstance(grid[0], int):
+        return list(grid)
+    return [getattr(cell, "number", cell) for column in grid for cell in column]
+
+
+def pattern_lines(pattern: str) -> List[tuple]:
+    """Return (pattern, line index, cells) for every line a pattern accepts."""
+    names = ANY_PATTERNS if pattern == "any" else [pattern]
+    return [(name, i, cells) for name in names for i, cells in enumerate(WIN_LINES[name])]
+
+
+def line_masks(numbers: Sequence[int], pattern: str) -> List[tuple]:
+    """Build (pattern, line index, bitmask, numbers) for each line of a pattern on a card.
+
+    Bit (n - 1) of the mask is set for every number n on the line; the FREE
+    space is left out, so a line is complete when mask & drawn_bits == mask.
+    """
+    masks = []
+    for name, i, cells in pattern_lines(pattern):
+        line_numbers = [numbers[cell] for cell in cells if numbers[cell] != FREE]
+        mask = 0
+        for number in line_numbers:
+            mask |= 1 << (number - 1)
+        masks.append((name, i, mask, line_numbers))
+    return masks
+
+
+def draw_ranks(draw_order: Sequence[int], max_number: int = 75) -> List[int]:
+    """Map each number to the index it was drawn at.
+
+    The FREE space ranks -1 and numbers that are never drawn rank len(draw_order).
+    """
+    never = len(draw_order)
+    ranks = [never] * (max_number + 1)
+    for index, number in enumerate(draw_order):
+        ranks[number] = index
+    ranks[FREE] = -1
+    return ranks
+
+
+def resolve_winners(draw_order: Sequence[int], cards: Sequence,
+                    patterns: Optional[Sequence[str]] = None,
+                    max_number: int = 75) -> List[Dict[str, Optional[int]]]:
+    """Find the ball index at which each card first completes each pattern.
+
+    A line completes on the latest-drawn of its numbers and a pattern on the
+    earliest of its lines. Returns one {pattern: ball index} dict per card,
+    with None where the pattern is never completed.
+    """
+    patterns = list(patterns or PATTERNS)
+    never = len(draw_order)
+    ranks = draw_ranks(draw_order, max_number)
+    numbers = [card_numbers(card) for card in cards]
+
+    needed = set()
+    for pattern in patterns:
+        needed.update(ANY_PATTERNS if pattern == "any" else [pattern])
+
+    if np is not None and numbers:
+        rank_table = np.asarray(ranks)
+        card_ranks = rank_table[np.asarray(numbers)]                # (cards, 25)
+        by_pattern = {}
+        for pattern in needed:
+            lines = np.asarray(WIN_LINES[pattern])                 # (lines, cells)
+            by_pattern[pattern] = card_ranks[:, lines].max(axis=2).min(axis=1)
+        if "any" in patterns:
+            by_pattern["any"] = np.min([by_pattern[p] for p in ANY_PATTERNS], axis=0)
+        columns = {p: by_pattern[p].tolist() for p in patterns}
+    else:
+        columns = {p: [] for p in needed}
+        for card in numbers:
+            card_ranks = [ranks[number] for number in card]
+            for pattern in needed:
+                columns[pattern].append(min(
+                    max(card_ranks[cell] for cell in line) for line in WIN_LINES[pattern]
+                ))
+        if "any" in patterns:
+            columns["any"] = [min(values) for values in zip(*(columns[p] for p in ANY_PATTERNS))]
+
+    results = []
+    for i in range(len(numbers)):
+        results.append({
+            p: (columns[p][i] if columns[p][i] < never else None) for p in patterns
+        })
+    return results
+
+
+def first_winners(draw_order: Sequence[int], cards: Sequence, pattern: str,
+                  max_number: int = 75) -> Dict:
+    """Return the ball index of the first win for a pattern and the cards that win on it."""
+    results = resolve_winners(draw_order, cards, [pattern], max_number)
+    indices = [r[pattern] for r in results if r[pattern] is not None]
+    if not indices:
+        return {"ball_index": None, "ball": None, "cards": []}
+    first = max(min(indices), 0)
+    return {
+        "ball_index": first,
+        "ball": draw_order[first],
+        "cards": [i for i, r in enumerate(results) if r[pattern] is not None and r[pattern] <= first],
+    }